@@ -6,16 +6,17 @@ interface CreatorSelectorProps {
   onCreatorChange: (creator: string | null) => void;
 }
 
-interface ReelData {
+interface Creator {
   username: string;
 }
 
 export default function CreatorSelector({ selectedCreator, onCreatorChange }: CreatorSelectorProps) {
-  const { data: reels = [] } = useQuery<ReelData[]>({
-    queryKey: ['/api/reels'],
+  // Listed from the metrics file names, no reels are loaded
+  const { data: creatorList = [] } = useQuery<Creator[]>({
+    queryKey: ['/api/creators'],
   });
 
-  const uniqueCreators = Array.from(new Set(reels.map(r => r.username).filter(Boolean)));
+  const uniqueCreators = creatorList.map(c => c.username);
   
   const creators = [
     { username: "All Creators", value: "all" },
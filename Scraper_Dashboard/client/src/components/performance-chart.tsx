@@ -1,51 +1,20 @@
 import { Select, SelectContent, SelectItem, SelectTrigger, SelectValue } from "@/components/ui/select";
 import { useState } from "react";
-import { useQuery } from "@tanstack/react-query";
+import { useAnalyticsSummary, type HashtagMetrics } from "@/hooks/use-analytics-summary";
 
 interface PerformanceChartProps {
   timeFilter: string;
   selectedCreator?: string | null;
 }
 
-interface ReelData {
-  username: string;
-  hashtags: string;
-  views: number;
-  likes: number;
-  comments: number;
-}
-
 export default function PerformanceChart({ timeFilter, selectedCreator }: PerformanceChartProps) {
   const [metric, setMetric] = useState("engagement");
 
-  const { data: allReels = [] } = useQuery<ReelData[]>({
-    queryKey: ['/api/reels'],
-  });
-
-  const reels = selectedCreator 
-    ? allReels.filter(r => r.username === selectedCreator)
-    : allReels;
-
-  const hashtagMetrics = reels
-    .flatMap(r => (r.hashtags || '').split(',').map(h => ({
-      tag: h.trim(),
-      views: r.views || 0,
-      likes: r.likes || 0,
-      comments: r.comments || 0,
-    })))
-    .filter(item => item.tag.length > 0)
-    .reduce((acc, item) => {
-      if (!acc[item.tag]) {
-        acc[item.tag] = { count: 0, views: 0, likes: 0, comments: 0 };
-      }
-      acc[item.tag].count += 1;
-      acc[item.tag].views += item.views;
-      acc[item.tag].likes += item.likes;
-      acc[item.tag].comments += item.comments;
-      return acc;
-    }, {} as Record<string, { count: number; views: number; likes: number; comments: number }>);
+  // Hashtag totals over all time come precomputed with the analytics summary
+  const { data: summary } = useAnalyticsSummary(selectedCreator);
+  const hashtagMetrics = summary?.hashtagMetrics ?? {};
 
-  const getMetricValue = (stats: { count: number; views: number; likes: number; comments: number }) => {
+  const getMetricValue = (stats: HashtagMetrics) => {
     if (metric === "views") return stats.views;
     if (metric === "likes") return stats.likes;
     return stats.views > 0 ? ((stats.likes + stats.comments) / stats.views * 100) : 0;
@@ -63,7 +32,7 @@ export default function PerformanceChart({ timeFilter, selectedCreator }: Perfor
     .map(([name, stats], index) => ({
       name: `#${name}`,
       value: getMetricValue(stats),
-      count: stats.count,
+      count: stats.reels,
       color: chartColors[index % chartColors.length],
     }))
     .sort((a, b) => b.value - a.value)
@@ -1,8 +1,7 @@
-import { useState } from "react";
-import { useQuery } from "@tanstack/react-query";
+import { useEffect, useState } from "react";
+import { useQuery, keepPreviousData } from "@tanstack/react-query";
 import { Select, SelectContent, SelectItem, SelectTrigger, SelectValue } from "@/components/ui/select";
 import { Button } from "@/components/ui/button";
-import { filterReelsByDate } from "@/lib/dateFilter";
 
 interface ReelsTableProps {
   timeFilter: string;
@@ -16,28 +15,45 @@ interface Reel {
   comments: number;
   views: number;
   caption: string;
-  hashtags: string;
-  mentions: string;
-  videoUrl: string;
-  datePosted: string;
 }
 
+interface ReelPage {
+  items: Reel[];
+  total: number;
+  nextCursor: string | null;
+}
+
+// Only the columns the table shows are fetched
+const TABLE_FIELDS = "username,url,likes,comments,views,caption";
+
 export default function ReelsTable({ timeFilter, selectedCreator }: ReelsTableProps) {
-  const [videoType, setVideoType] = useState("all");
-  const [currentPage, setCurrentPage] = useState(1);
+  const [sortBy, setSortBy] = useState("date");
+  // Cursor of every page visited so far; page N is fetched with cursors[N - 1]
+  const [cursors, setCursors] = useState<(string | null)[]>([null]);
+  const currentPage = cursors.length;
   const itemsPerPage = 20;
 
-  const { data: apiReels = [], isLoading } = useQuery<Reel[]>({
-    queryKey: ['/api/reels'],
-  });
+  // Sorting, filtering and paging happen on the server, one page at a time
+  useEffect(() => {
+    setCursors([null]);
+  }, [timeFilter, selectedCreator, sortBy]);
 
-  // Filter by date first
-  let reels = filterReelsByDate(apiReels, timeFilter);
+  const params = new URLSearchParams({
+    period: timeFilter,
+    sort: sortBy,
+    fields: TABLE_FIELDS,
+    limit: String(itemsPerPage),
+  });
+  if (selectedCreator) params.set('creator', selectedCreator);
+  const cursor = cursors[cursors.length - 1];
+  if (cursor) params.set('cursor', cursor);
 
-  // Filter by creator if selected
-  if (selectedCreator) {
-    reels = reels.filter(r => r.username === selectedCreator);
-  }
+  const { data, isLoading } = useQuery<ReelPage>({
+    queryKey: [`/api/reels?${params}`],
+    placeholderData: keepPreviousData,
+  });
+  const reels = data?.items ?? [];
+  const total = data?.total ?? 0;
 
   const formatNumber = (num: number) => {
     if (num >= 1000000) return `${(num / 1000000).toFixed(1)}M`;
@@ -55,8 +71,7 @@ export default function ReelsTable({ timeFilter, selectedCreator }: ReelsTablePr
     return `${(((likes + comments) / views) * 100).toFixed(1)}%`;
   };
 
-  const totalPages = Math.ceil(reels.length / itemsPerPage);
-  const paginatedReels = reels.slice((currentPage - 1) * itemsPerPage, currentPage * itemsPerPage);
+  const totalPages = Math.max(1, Math.ceil(total / itemsPerPage));
 
   if (isLoading) {
     return <div className="text-center py-8">Loading reels...</div>;
@@ -66,7 +81,17 @@ export default function ReelsTable({ timeFilter, selectedCreator }: ReelsTablePr
     <div className="bg-card rounded-lg border border-border" data-testid="reels-table">
       <div className="p-6 border-b border-border">
         <div className="flex items-center justify-between">
-          <h3 className="text-lg font-semibold">Recent Reels ({reels.length} total)</h3>
+          <h3 className="text-lg font-semibold">Recent Reels ({total} total)</h3>
+          <Select value={sortBy} onValueChange={setSortBy}>
+            <SelectTrigger className="w-40" data-testid="select-reel-sort">
+              <SelectValue />
+            </SelectTrigger>
+            <SelectContent>
+              <SelectItem value="date">Newest first</SelectItem>
+              <SelectItem value="views">Most views</SelectItem>
+              <SelectItem value="likes">Most likes</SelectItem>
+            </SelectContent>
+          </Select>
         </div>
       </div>
       <div className="overflow-x-auto">
@@ -83,7 +108,7 @@ export default function ReelsTable({ timeFilter, selectedCreator }: ReelsTablePr
             </tr>
           </thead>
           <tbody>
-            {paginatedReels.map((reel, idx) => (
+            {reels.map((reel, idx) => (
               <tr key={idx} className="border-b border-border hover:bg-muted/30 transition-colors">
                 <td className="p-4">
                   <div className="flex items-center gap-3">
@@ -120,13 +145,13 @@ export default function ReelsTable({ timeFilter, selectedCreator }: ReelsTablePr
       {totalPages > 1 && (
         <div className="p-4 border-t border-border flex items-center justify-between">
           <p className="text-sm text-muted-foreground">
-            Showing {((currentPage - 1) * itemsPerPage) + 1} - {Math.min(currentPage * itemsPerPage, reels.length)} of {reels.length} reels
+            Showing {((currentPage - 1) * itemsPerPage) + 1} - {Math.min(currentPage * itemsPerPage, total)} of {total} reels
           </p>
           <div className="flex items-center gap-2">
             <Button
               variant="outline"
               size="sm"
-              onClick={() => setCurrentPage(p => Math.max(1, p - 1))}
+              onClick={() => setCursors(c => c.length > 1 ? c.slice(0, -1) : c)}
               disabled={currentPage === 1}
             >
               Previous
@@ -135,8 +160,11 @@ export default function ReelsTable({ timeFilter, selectedCreator }: ReelsTablePr
             <Button
               variant="outline"
               size="sm"
-              onClick={() => setCurrentPage(p => Math.min(totalPages, p + 1))}
-              disabled={currentPage === totalPages}
+              onClick={() => {
+                const next = data?.nextCursor;
+                if (next) setCursors(c => [...c, next]);
+              }}
+              disabled={!data?.nextCursor}
             >
               Next
             </Button>
@@ -0,0 +1,54 @@
+import { useQuery } from "@tanstack/react-query";
+
+export interface HashtagMetrics {
+  reels: number;
+  views: number;
+  likes: number;
+  comments: number;
+}
+
+export interface SummaryStats {
+  reels: number;
+  totals: { views: number; likes: number; comments: number };
+  // (likes + comments) / views in percent, null without views
+  rateByViews: number | null;
+  hashtagMetrics: Record<string, HashtagMetrics>;
+}
+
+interface SummaryPart {
+  reels: number;
+  totals: SummaryStats["totals"];
+  hashtag_metrics?: Record<string, HashtagMetrics>;
+}
+
+interface OverallResponse {
+  overall: SummaryPart & { rate_by_views: number | null };
+}
+
+interface CreatorResponse extends SummaryPart {
+  engagement: { rate_by_views: number | null };
+}
+
+/**
+ * All-time statistics of one creator, or of every creator, from the summary
+ * part_2 precomputes (data/analytics_summary.json). Undefined until it loads
+ * or when no run has written a summary yet.
+ */
+export function useAnalyticsSummary(creator?: string | null) {
+  const url = creator
+    ? `/api/analytics/summary?creator=${encodeURIComponent(creator)}`
+    : "/api/analytics/summary";
+
+  return useQuery<OverallResponse | CreatorResponse, Error, SummaryStats>({
+    queryKey: [url],
+    select: (data) => {
+      const part = "overall" in data ? data.overall : data;
+      return {
+        reels: part.reels,
+        totals: part.totals,
+        rateByViews: "overall" in data ? data.overall.rate_by_views : data.engagement.rate_by_views,
+        hashtagMetrics: part.hashtag_metrics ?? {},
+      };
+    },
+  });
+}
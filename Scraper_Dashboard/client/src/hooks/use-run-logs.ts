@@ -0,0 +1,28 @@
+import { useEffect, useState } from "react";
+
+// Lines kept on the page; the full log of every run is under data/run_logs/
+const MAX_LINES = 200;
+
+/**
+ * Follow the log of a scraper run over server-sent events. Only new lines
+ * are sent, and a dropped connection resumes after the last line received.
+ */
+export function useRunLogs(runId: string | undefined): string[] {
+  const [lines, setLines] = useState<string[]>([]);
+
+  useEffect(() => {
+    setLines([]);
+    if (!runId) return;
+
+    const source = new EventSource("/api/scrape/logs/stream");
+    source.addEventListener("log", (event) => {
+      const line = JSON.parse((event as MessageEvent).data) as string;
+      setLines(prev => [...prev, line].slice(-MAX_LINES));
+    });
+    source.addEventListener("end", () => source.close());
+
+    return () => source.close();
+  }, [runId]);
+
+  return lines;
+}
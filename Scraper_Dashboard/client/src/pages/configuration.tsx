@@ -126,10 +126,10 @@ export default function Configuration() {
       return;
     }
 
-    if (usernameList.length > 10) {
+    if (usernameList.length > 200) {
       toast({
         title: "Error",
-        description: "Maximum 10 usernames allowed",
+        description: "Maximum 200 usernames allowed",
         variant: "destructive",
       });
       return;
@@ -8,14 +8,12 @@ import ScraperStatus from "@/components/scraper-status";
 import CreatorSelector from "@/components/creator-selector";
 import ThemeToggle from "@/components/theme-toggle";
 import { useQuery } from "@tanstack/react-query";
-import { filterReelsByDate } from "@/lib/dateFilter";
+import { useAnalyticsSummary } from "@/hooks/use-analytics-summary";
 
 interface ReelData {
-  username: string;
   likes: number;
   comments: number;
   views: number;
-  datePosted: string;
 }
 
 interface FollowerData {
@@ -29,8 +27,17 @@ export default function Dashboard() {
   const [timeFilter, setTimeFilter] = useState("all");
   const [selectedCreator, setSelectedCreator] = useState<string | null>(null);
 
-  const { data: reels = [] } = useQuery<ReelData[]>({
-    queryKey: ['/api/reels'],
+  // All-time stats come precomputed with the analytics summary; the reels are
+  // only fetched for a shorter period or before the first summary is written
+  const { data: summary, isError: noSummary } = useAnalyticsSummary(selectedCreator);
+  const fromSummary = timeFilter === "all" && !noSummary;
+
+  // The server filters by period and creator, the stat cards only sum the counts
+  const reelParams = new URLSearchParams({ period: timeFilter, fields: 'likes,comments,views' });
+  if (selectedCreator) reelParams.set('creator', selectedCreator);
+  const { data: filteredReels = [] } = useQuery<ReelData[]>({
+    queryKey: [`/api/reels?${reelParams}`],
+    enabled: !fromSummary,
   });
 
   const { data: followerData = [] } = useQuery<FollowerData[]>({
@@ -56,20 +63,21 @@ export default function Dashboard() {
     { label: "All", value: "all" },
   ];
 
-  let filteredReels = filterReelsByDate(reels, timeFilter);
-  
-  if (selectedCreator) {
-    filteredReels = filteredReels.filter(r => r.username === selectedCreator);
+  let totalReels: number;
+  let avgEngagement: string;
+  if (fromSummary) {
+    totalReels = summary?.reels ?? 0;
+    avgEngagement = (summary?.rateByViews ?? 0).toFixed(1);
+  } else {
+    totalReels = filteredReels.length;
+    const totalLikes = filteredReels.reduce((sum, r) => sum + (r.likes > 0 ? r.likes : 0), 0);
+    const totalComments = filteredReels.reduce((sum, r) => sum + r.comments, 0);
+    const totalViews = filteredReels.reduce((sum, r) => sum + r.views, 0);
+    avgEngagement = totalViews > 0
+      ? ((totalLikes + totalComments) / totalViews * 100).toFixed(1)
+      : '0.0';
   }
 
-  const totalReels = filteredReels.length;
-  const totalLikes = filteredReels.reduce((sum, r) => sum + (r.likes > 0 ? r.likes : 0), 0);
-  const totalComments = filteredReels.reduce((sum, r) => sum + r.comments, 0);
-  const totalViews = filteredReels.reduce((sum, r) => sum + r.views, 0);
-  const avgEngagement = totalViews > 0 
-    ? ((totalLikes + totalComments) / totalViews * 100).toFixed(1)
-    : '0.0';
-
   const totalFollowers = followerData.reduce((sum, creator) => sum + creator.followers, 0);
   const selectedCreatorData = selectedCreator 
     ? followerData.find(c => c.username === selectedCreator)
@@ -146,7 +154,7 @@ export default function Dashboard() {
 
   const mockStats = {
     followers: { current: displayFollowers, change: followerChange.change, changeType: followerChange.changeType },
-    totalReels: { current: totalReels.toString(), change: `${filteredReels.length} in selected period`, changeType: "neutral" as const },
+    totalReels: { current: totalReels.toString(), change: `${totalReels} in selected period`, changeType: "neutral" as const },
     avgEngagement: { current: `${avgEngagement}%`, change: "Likes + Comments / Views", changeType: "neutral" as const },
     lastRun: { current: lastRunTime, change: runStatus, changeType: runStatusType },
   };
@@ -5,11 +5,13 @@ import FollowersChart from "@/components/followers-chart";
 import CreatorSelector from "@/components/creator-selector";
 import ThemeToggle from "@/components/theme-toggle";
 import { useQuery } from "@tanstack/react-query";
-import { filterReelsByDate } from "@/lib/dateFilter";
 
-interface ReelData {
+interface Creator {
   username: string;
-  datePosted: string;
+}
+
+interface ReelPage {
+  total: number;
 }
 
 interface FollowerData {
@@ -23,8 +25,15 @@ export default function Followers() {
   const [timeFilter, setTimeFilter] = useState("all");
   const [selectedCreator, setSelectedCreator] = useState<string | null>(null);
 
-  const { data: reels = [] } = useQuery<ReelData[]>({
-    queryKey: ['/api/reels'],
+  const { data: creators = [] } = useQuery<Creator[]>({
+    queryKey: ['/api/creators'],
+  });
+
+  // The server filters by period and creator; a one-reel page is enough for the count
+  const reelParams = new URLSearchParams({ period: timeFilter, fields: 'username', limit: '1' });
+  if (selectedCreator) reelParams.set('creator', selectedCreator);
+  const { data: reelPage } = useQuery<ReelPage>({
+    queryKey: [`/api/reels?${reelParams}`],
   });
 
   const { data: followerData = [] } = useQuery<FollowerData[]>({
@@ -38,15 +47,8 @@ export default function Followers() {
     { label: "All", value: "all" },
   ];
 
-  let filteredReels = filterReelsByDate(reels, timeFilter);
-  
-  if (selectedCreator) {
-    filteredReels = filteredReels.filter(r => r.username === selectedCreator);
-  }
-
-  const creators = Array.from(new Set(reels.map(r => r.username).filter(Boolean)));
   const creatorCount = creators.length;
-  const totalReels = filteredReels.length;
+  const totalReels = reelPage?.total ?? 0;
   
   const totalFollowers = followerData.reduce((sum, creator) => sum + creator.followers, 0);
   const selectedCreatorData = selectedCreator 
@@ -8,14 +8,12 @@ import CreatorSelector from "@/components/creator-selector";
 import Sidebar from "@/components/sidebar";
 import ThemeToggle from "@/components/theme-toggle";
 import { useQuery } from "@tanstack/react-query";
-import { filterReelsByDate } from "@/lib/dateFilter";
 
 interface ReelData {
   username: string;
   views: number;
   likes: number;
   comments: number;
-  datePosted: string;
   hashtags?: string;
   manual_tags?: string;
 }
@@ -25,26 +23,29 @@ export default function ReelAnalytics() {
   const [selectedCreator, setSelectedCreator] = useState<string | null>(null);
   const [selectedVideoType, setSelectedVideoType] = useState<string>("all");
 
+  // The server filters by period and creator; the video type is picked here
+  const reelParams = new URLSearchParams({
+    period: timeFilter.toLowerCase(),
+    fields: 'username,views,likes,comments,hashtags,manual_tags',
+  });
+  if (selectedCreator) reelParams.set('creator', selectedCreator);
   const { data: reels = [] } = useQuery<ReelData[]>({
-    queryKey: ['/api/reels'],
+    queryKey: [`/api/reels?${reelParams}`],
   });
 
-  // Extract unique video types from manual_tags
+  // Video types (manual_tags) used in the period, keeping the selected one listed
   const videoTypes = Array.from(
     new Set(
       reels
         .map(r => r.manual_tags)
         .filter((tag): tag is string => Boolean(tag))
         .flatMap((tag: string) => tag.split(',').map(t => t.trim()))
+        .concat(selectedVideoType !== "all" ? [selectedVideoType] : [])
         .filter(Boolean)
     )
   ).sort();
 
-  let filteredReels = filterReelsByDate(reels, timeFilter);
-  
-  if (selectedCreator) {
-    filteredReels = filteredReels.filter(r => r.username === selectedCreator);
-  }
+  let filteredReels = reels;
 
   if (selectedVideoType && selectedVideoType !== "all") {
     filteredReels = filteredReels.filter(r => 
@@ -60,7 +61,7 @@ export default function ReelAnalytics() {
   const avgEngagement = totalViews > 0 
     ? ((totalLikes + totalComments) / totalViews * 100).toFixed(1)
     : '0.0';
-  const topReel = filteredReels.sort((a, b) => b.views - a.views)[0];
+  const topReel = [...filteredReels].sort((a, b) => b.views - a.views)[0];
   const formatNumber = (num: number) => {
     if (num >= 1000000) return `${(num / 1000000).toFixed(1)}M`;
     if (num >= 1000) return `${(num / 1000).toFixed(1)}K`;
@@ -6,10 +6,14 @@ import Sidebar from "@/components/sidebar";
 import ThemeToggle from "@/components/theme-toggle";
 import { useQuery } from "@tanstack/react-query";
 
-interface ReelData {
+interface Creator {
   username: string;
 }
 
+interface ReelPage {
+  total: number;
+}
+
 interface HistoryEntry {
   username: string;
   followers: number;
@@ -20,8 +24,13 @@ interface HistoryEntry {
 export default function RunHistory() {
   const [expandedRun, setExpandedRun] = useState<string | null>(null);
 
-  const { data: reels = [] } = useQuery<ReelData[]>({
-    queryKey: ['/api/reels'],
+  const { data: creators = [] } = useQuery<Creator[]>({
+    queryKey: ['/api/creators'],
+  });
+
+  // A one-reel page is enough, only its total is shown
+  const { data: reelPage } = useQuery<ReelPage>({
+    queryKey: ['/api/reels?fields=username&limit=1'],
   });
 
   const { data: historyData = [] } = useQuery<HistoryEntry[]>({
@@ -32,8 +41,7 @@ export default function RunHistory() {
     queryKey: ['/api/scrape/status'],
   });
 
-  const totalReels = reels.length;
-  const creators = Array.from(new Set(reels.map(r => r.username).filter(Boolean)));
+  const totalReels = reelPage?.total ?? 0;
 
   // Group history by timestamp
   const historyByTimestamp = historyData.reduce((acc, entry) => {
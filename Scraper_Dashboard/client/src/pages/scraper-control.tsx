@@ -8,10 +8,13 @@ import { Input } from "@/components/ui/input";
 import { Label } from "@/components/ui/label";
 import Sidebar from "@/components/sidebar";
 import ThemeToggle from "@/components/theme-toggle";
+import { useRunLogs } from "@/hooks/use-run-logs";
 
 interface ScraperStatus {
   status: 'idle' | 'queued' | 'running' | 'fetching_metrics' | 'ingesting' | 'completed' | 'failed';
+  runId?: string;
   logs: string[];
+  lastSeq: number;
   error?: string;
   reelsScraped?: number;
 }
@@ -29,6 +32,8 @@ export default function ScraperControl() {
     },
   });
 
+  const logLines = useRunLogs(status?.runId);
+
   const handleRunScraper = async () => {
     const usernameList = usernames.split(',').map(u => u.trim()).filter(u => u.length > 0);
     
@@ -37,11 +42,6 @@ export default function ScraperControl() {
       return;
     }
 
-    if (usernameList.length > 10) {
-      alert("Maximum 10 usernames allowed");
-      return;
-    }
-
     try {
       const response = await fetch("/api/scrape/run", {
         method: "POST",
@@ -114,7 +114,7 @@ export default function ScraperControl() {
           </CardHeader>
           <CardContent className="space-y-3">
             <div>
-              <Label htmlFor="usernames">Instagram Usernames (comma-separated, max 10)</Label>
+              <Label htmlFor="usernames">Instagram Usernames (comma-separated)</Label>
               <Input
                 id="usernames"
                 value={usernames}
@@ -123,7 +123,8 @@ export default function ScraperControl() {
                 disabled={!!isRunning}
               />
               <p className="text-xs text-muted-foreground mt-1">
-                Enter usernames separated by commas (e.g., she_is_ada_,_olasubomi_,5thkind_)
+                Enter usernames separated by commas (e.g., she_is_ada_,_olasubomi_,5thkind_).
+                More than 10 are split across the Instagram accounts in accounts.json.
               </p>
             </div>
           </CardContent>
@@ -162,11 +163,11 @@ export default function ScraperControl() {
               </div>
             )}
 
-            {status?.logs && status.logs.length > 0 && (
+            {logLines.length > 0 && (
               <div className="mt-4">
                 <Label>Logs</Label>
                 <div className="mt-2 bg-muted rounded-lg p-3 max-h-48 overflow-y-auto">
-                  {status.logs.slice(-10).map((log, idx) => (
+                  {logLines.map((log, idx) => (
                     <div key={idx} className="text-xs font-mono mb-1">{log}</div>
                   ))}
                 </div>
@@ -26,6 +26,7 @@ interface ReelData {
   caption: string;
   videoUrl: string;
   datePosted: string;
+  instagramId: string;
   manual_tags?: string;
 }
 
@@ -65,19 +66,21 @@ export default function VideoTagging() {
     
     setIsSaving(true);
     try {
-      // Use videoUrl (CDN URL) as unique identifier instead of the reconstructed url
+      // The reel shortcode identifies the reel; videoUrl (CDN URL) is kept for older files
       const encodedVideoUrl = encodeURIComponent(selectedReel.videoUrl);
       const response = await fetch(`/api/reels/${encodedVideoUrl}/tag`, {
         method: 'PATCH',
         headers: { 'Content-Type': 'application/json' },
-        body: JSON.stringify({ tag: videoType })
+        body: JSON.stringify({ tag: videoType, instagramId: selectedReel.instagramId })
       });
       
       const data = await response.json();
       
       if (response.ok) {
         // Invalidate and wait for refetch to complete
-        await queryClient.invalidateQueries({ queryKey: ['/api/reels'] });
+        // Every /api/reels query (any fields, page or sort) may show the tag
+        const isReelsQuery = (query: { queryKey: readonly unknown[] }) => String(query.queryKey[0]).startsWith('/api/reels');
+        await queryClient.invalidateQueries({ predicate: isReelsQuery });
         await queryClient.refetchQueries({ queryKey: ['/api/reels'] });
         
         toast({
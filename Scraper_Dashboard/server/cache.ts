@@ -6,9 +6,17 @@ interface CacheEntry<T> {
   fileStats?: Map<string, number>; // file path -> mtime
 }
 
+export interface CacheStats {
+  entries: number;
+  hits: number;
+  misses: number;
+}
+
 class DataCache {
   private cache: Map<string, CacheEntry<any>> = new Map();
   private ttl: number = 5 * 60 * 1000; // 5 minutes default TTL
+  private hits = 0;
+  private misses = 0;
 
   async get<T>(
     key: string,
@@ -26,14 +34,17 @@ class DataCache {
         // Check if any files have been modified
         const filesModified = await this.checkFilesModified(filePaths, cached.fileStats);
         if (!filesModified) {
+          this.hits++;
           return cached.data as T;
         }
       } else if (!isExpired && !filePaths) {
+        this.hits++;
         return cached.data as T;
       }
     }
 
     // Cache miss or expired - fetch fresh data
+    this.misses++;
     const data = await fetchFn();
     
     // Store file stats if file paths are provided
@@ -94,6 +105,60 @@ class DataCache {
   setTTL(ms: number): void {
     this.ttl = ms;
   }
+
+  stats(): CacheStats {
+    return { entries: this.cache.size, hits: this.hits, misses: this.misses };
+  }
+}
+
+interface FileEntry<T> {
+  data: T;
+  mtimeMs: number;
+  size: number;
+}
+
+/**
+ * Parsed contents of individual files, keyed by path and validated by mtime + size.
+ * Only files that changed since they were last parsed are read again.
+ */
+class FileCache {
+  private files: Map<string, FileEntry<any>> = new Map();
+  private hits = 0;
+  private misses = 0;
+
+  async get<T>(filePath: string, parseFn: (filePath: string) => Promise<T>): Promise<T> {
+    const stats = await fs.stat(filePath);
+    const cached = this.files.get(filePath);
+
+    if (cached && cached.mtimeMs === stats.mtimeMs && cached.size === stats.size) {
+      this.hits++;
+      return cached.data as T;
+    }
+
+    this.misses++;
+    const data = await parseFn(filePath);
+    this.files.set(filePath, { data, mtimeMs: stats.mtimeMs, size: stats.size });
+    return data;
+  }
+
+  invalidate(filePath: string): void {
+    this.files.delete(filePath);
+  }
+
+  // Forget files that are no longer on disk
+  retain(filePaths: string[]): void {
+    const keep = new Set(filePaths);
+    this.files.forEach((_, filePath) => {
+      if (!keep.has(filePath)) {
+        this.files.delete(filePath);
+      }
+    });
+  }
+
+  stats(): CacheStats {
+    return { entries: this.files.size, hits: this.hits, misses: this.misses };
+  }
 }
 
 export const dataCache = new DataCache();
+export const fileCache = new FileCache();
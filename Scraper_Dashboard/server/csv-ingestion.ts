@@ -46,7 +46,8 @@ export async function parseCSV(filePath: string): Promise<ReelMetricData[]> {
       });
 
       const videoUrl = row['video_url'] || row['url'] || '';
-      const instagramId = extractInstagramId(videoUrl);
+      // Newer metrics files carry the reel shortcode; older ones only have the CDN URL
+      const instagramId = row['shortcode'] || extractInstagramId(videoUrl);
       
       data.push({
         username: username,
@@ -141,6 +142,21 @@ export async function findCSVFiles(): Promise<string[]> {
   }
 }
 
+/**
+ * Map each creator to their metrics file, from the file names alone
+ * (data/{username}_reels_metrics.csv), so creator lookups never parse a CSV.
+ */
+export async function getCreatorFileIndex(): Promise<Map<string, string>> {
+  const index = new Map<string, string>();
+  for (const file of await findCSVFiles()) {
+    const match = path.basename(file).match(/^(.+?)_reels_metrics\.csv$/);
+    if (match) {
+      index.set(match[1], file);
+    }
+  }
+  return index;
+}
+
 export function extractInstagramId(url: string): string {
   const match = url.match(/\/reel\/([A-Za-z0-9_-]+)/);
   return match ? match[1] : '';
@@ -153,7 +169,12 @@ function escapeCSVField(field: string): string {
   return field;
 }
 
-export async function updateCSVTag(filePath: string, videoUrl: string, tag: string): Promise<boolean> {
+export async function updateCSVTag(
+  filePath: string,
+  videoUrl: string,
+  tag: string,
+  instagramId?: string
+): Promise<boolean> {
   const content = await fs.readFile(filePath, 'utf-8');
   const rows = parseCSVContent(content);
   
@@ -171,12 +192,16 @@ export async function updateCSVTag(filePath: string, videoUrl: string, tag: stri
 
   let updated = false;
   const videoUrlIndex = headers.findIndex(h => h.toLowerCase().trim() === 'video_url');
+  const shortcodeIndex = headers.findIndex(h => h.toLowerCase().trim() === 'shortcode');
 
-  // Find and update the row by matching the unique video_url (CDN URL)
+  // Find and update the row by its shortcode, falling back to the video_url (CDN URL)
+  // for files written before shortcodes were recorded
   for (let i = 1; i < rows.length; i++) {
     const row = rows[i];
+    const matchesShortcode = Boolean(instagramId) && shortcodeIndex !== -1 && row[shortcodeIndex] === instagramId;
+    const matchesVideoUrl = videoUrlIndex !== -1 && row[videoUrlIndex] === videoUrl;
     
-    if (videoUrlIndex !== -1 && row[videoUrlIndex] === videoUrl) {
+    if (matchesShortcode || matchesVideoUrl) {
       // Ensure row has enough columns
       while (row.length < headers.length) {
         row.push('');
@@ -259,3 +284,58 @@ export async function parseLatestFollowerData(): Promise<FollowerData[]> {
 
   return Array.from(latestByCreator.values());
 }
+
+export interface HashtagMetrics {
+  reels: number;
+  views: number;
+  likes: number;
+  comments: number;
+}
+
+export interface CreatorSummary {
+  reels: number;
+  followers: number | null;
+  totals: { views: number; likes: number; comments: number };
+  medians: { views: number; likes: number; comments: number };
+  engagement: {
+    median_rate_by_followers: number | null;
+    mean_rate_by_followers: number | null;
+    rate_by_views: number | null;
+  };
+  top_reels: { shortcode: string; date: string; views: number; likes: number; comments: number; caption: string }[];
+  hashtags: [string, number][];
+  hashtag_metrics: Record<string, HashtagMetrics>;
+  posting: { weekdays: Record<string, number>; hours_utc: number[]; months: Record<string, number> };
+}
+
+export interface AnalyticsSummary {
+  generated_at: string;
+  overall: {
+    creators: number;
+    reels: number;
+    totals: { views: number; likes: number; comments: number };
+    rate_by_views: number | null;
+    hashtags: [string, number][];
+    hashtag_metrics: Record<string, HashtagMetrics>;
+    weekdays: Record<string, number>;
+  };
+  creators: Record<string, CreatorSummary>;
+}
+
+export function getAnalyticsSummaryPath(): string {
+  const projectRoot = path.resolve(__dirname, '..', '..');
+  return path.join(projectRoot, 'data', 'analytics_summary.json');
+}
+
+/**
+ * Read the summary precomputed by part_2 (analytics_summary.py).
+ * Returns null when no run has written one yet.
+ */
+export async function readAnalyticsSummary(): Promise<AnalyticsSummary | null> {
+  try {
+    const content = await fs.readFile(getAnalyticsSummaryPath(), 'utf-8');
+    return JSON.parse(content) as AnalyticsSummary;
+  } catch (error) {
+    return null;
+  }
+}
@@ -0,0 +1,137 @@
+import { test } from 'node:test';
+import assert from 'node:assert/strict';
+import fs from 'fs/promises';
+import os from 'os';
+import path from 'path';
+import {
+  SORT_KEYS, loadCreatorIndex, queryReels, decodeCursor, encodeCursor, parseReelDate, reelsETag,
+  type CreatorIndex, type ReelQuery,
+} from './reel-index';
+import type { ReelMetricData } from './csv-ingestion';
+
+const HEADER = 'shortcode,date,likes,views,comments,hashtags,caption';
+
+interface Row {
+  shortcode: string;
+  date: string;
+  likes: number;
+  views: number;
+  comments: number;
+}
+
+// Dates from 2025-01-01 on, a few undated, with repeated counts so ties are broken by id
+function makeRows(prefix: string, count: number): Row[] {
+  return Array.from({ length: count }, (_, i) => ({
+    shortcode: `${prefix}${i}`,
+    date: i % 9 === 8 ? '' : new Date(Date.UTC(2025, 0, 1 + ((i * 7) % 60))).toISOString().slice(0, 10),
+    likes: (i * 13) % 17,
+    views: (i * 31) % 23,
+    comments: i % 3,
+  }));
+}
+
+async function writeMetrics(dir: string, creator: string, rows: Row[]): Promise<string> {
+  const file = path.join(dir, `${creator}_reels_metrics.csv`);
+  const lines = rows.map(r => `${r.shortcode},${r.date},${r.likes},${r.views},${r.comments},,caption`);
+  await fs.writeFile(file, [HEADER, ...lines].join('\n') + '\n');
+  return file;
+}
+
+async function setup() {
+  const dir = await fs.mkdtemp(path.join(os.tmpdir(), 'reel-index-'));
+  const files = [
+    await writeMetrics(dir, 'alice', makeRows('a', 40)),
+    await writeMetrics(dir, 'bob', makeRows('b', 25)),
+    await writeMetrics(dir, 'carol', []),
+  ];
+  const indexes = await Promise.all(files.map(file => loadCreatorIndex(file)));
+  return { dir, files, indexes };
+}
+
+function sortValue(reel: ReelMetricData, sort: ReelQuery['sort']): number {
+  return sort === 'date' ? parseReelDate(reel.datePosted) : reel[sort];
+}
+
+// Every page of a query, following nextCursor until it runs out
+function allPages(indexes: CreatorIndex[], query: Omit<ReelQuery, 'cursor'>) {
+  const items: ReelMetricData[] = [];
+  let cursor: ReelQuery['cursor'];
+  let total = -1;
+  for (let pages = 0; pages < 1000; pages++) {
+    const page = queryReels(indexes, { ...query, cursor });
+    items.push(...page.items);
+    total = page.total;
+    if (!page.nextCursor) break;
+    assert.equal(page.items.length, query.limit);
+    cursor = decodeCursor(page.nextCursor)!;
+  }
+  return { items, total };
+}
+
+test('cursor pages cover every reel once, in order, for every sort and date range', async () => {
+  const { indexes } = await setup();
+  const reels = indexes.flatMap(index => index.reels);
+  const ranges: [number | undefined, number | undefined][] = [
+    [undefined, undefined],
+    [parseReelDate('2025-01-10'), parseReelDate('2025-01-20')],
+    [parseReelDate('2024-01-01'), parseReelDate('2026-01-01')],
+    [parseReelDate('2025-02-01'), undefined],
+  ];
+
+  for (const sort of SORT_KEYS) {
+    for (const order of ['asc', 'desc'] as const) {
+      for (const [from, to] of ranges) {
+        for (const limit of [1, 4, 500]) {
+          const { items, total } = allPages(indexes, { sort, order, from, to, limit });
+          const expected = reels.filter(reel => {
+            const date = parseReelDate(reel.datePosted);
+            return (from === undefined || date > from) && (to === undefined || date <= to);
+          });
+          const label = `${sort} ${order} ${from}-${to} limit ${limit}`;
+          assert.equal(total, expected.length, label);
+          assert.equal(items.length, expected.length, label);
+          assert.equal(new Set(items).size, items.length, label);
+          for (let i = 1; i < items.length; i++) {
+            const [previous, current] = [sortValue(items[i - 1], sort), sortValue(items[i], sort)];
+            assert.ok(order === 'desc' ? previous >= current : previous <= current, label);
+          }
+        }
+      }
+    }
+  }
+});
+
+test('a cursor resumes after its reel when newer reels arrive between pages', async () => {
+  const { dir, indexes } = await setup();
+  const first = queryReels(indexes, { sort: 'date', order: 'desc', limit: 5 });
+  assert.ok(first.nextCursor);
+
+  // A scrape adds a reel newer than everything on the first page
+  const rows = makeRows('a', 40);
+  rows.push({ shortcode: 'new', date: '2026-01-01', likes: 1, views: 1, comments: 0 });
+  const updated = [await loadCreatorIndex(await writeMetrics(dir, 'alice', rows)), indexes[1], indexes[2]];
+
+  const second = queryReels(updated, { sort: 'date', order: 'desc', limit: 5, cursor: decodeCursor(first.nextCursor)! });
+  const expected = queryReels(updated, { sort: 'date', order: 'desc', limit: 11 }).items.slice(6);
+  assert.deepEqual(second.items, expected);
+  assert.equal(second.total, 66);
+});
+
+test('cursors round-trip undated reels and reject garbage', () => {
+  assert.deepEqual(decodeCursor(encodeCursor({ value: -Infinity, id: 'alice/a8' })), { value: -Infinity, id: 'alice/a8' });
+  assert.deepEqual(decodeCursor(encodeCursor({ value: 42, id: 'bob/b1' })), { value: 42, id: 'bob/b1' });
+  assert.equal(decodeCursor('not a cursor'), null);
+  assert.equal(decodeCursor(Buffer.from('{"value":1}').toString('base64url')), null);
+});
+
+test('the ETag changes with the query and the files, not between identical requests', async () => {
+  const { dir, files } = await setup();
+  const etag = await reelsETag(files, '/api/reels?sort=likes');
+  assert.match(etag, /^W\/".+"$/);
+  assert.equal(await reelsETag(files, '/api/reels?sort=likes'), etag);
+  assert.notEqual(await reelsETag(files, '/api/reels?sort=views'), etag);
+  assert.notEqual(await reelsETag(files.slice(0, 1), '/api/reels?sort=likes'), etag);
+
+  await writeMetrics(dir, 'bob', makeRows('b', 26));
+  assert.notEqual(await reelsETag(files, '/api/reels?sort=likes'), etag);
+});
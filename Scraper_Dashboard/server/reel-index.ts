@@ -0,0 +1,285 @@
+import crypto from 'crypto';
+import fs from 'fs/promises';
+import { fileCache } from './cache';
+import { getCreatorFileIndex, parseCSV, type ReelMetricData } from './csv-ingestion';
+
+export const SORT_KEYS = ['date', 'likes', 'views', 'comments'] as const;
+export type SortKey = typeof SORT_KEYS[number];
+export type SortOrder = 'asc' | 'desc';
+
+export const REEL_FIELDS: (keyof ReelMetricData)[] = [
+  'username', 'url', 'likes', 'comments', 'views', 'caption', 'hashtags',
+  'mentions', 'videoUrl', 'datePosted', 'instagramId', 'manual_tags',
+];
+
+/**
+ * One creator's reels with their positions pre-sorted by every sort key,
+ * built once per version of the creator's metrics file.
+ */
+export interface CreatorIndex {
+  reels: ReelMetricData[];
+  // Unique across creators, breaks ties between equal sort values
+  ids: string[];
+  // datePosted in ms; -Infinity when missing, so undated reels sort last
+  dates: number[];
+  // Reel positions in descending order of each key
+  orders: Record<SortKey, Int32Array>;
+}
+
+export interface ReelCursor {
+  value: number;
+  id: string;
+}
+
+export interface ReelQuery {
+  sort: SortKey;
+  order: SortOrder;
+  // Reels posted after `from` and on or before `to` (ms)
+  from?: number;
+  to?: number;
+  limit: number;
+  cursor?: ReelCursor;
+}
+
+export interface ReelPage {
+  items: ReelMetricData[];
+  total: number;
+  nextCursor: string | null;
+}
+
+// Dates in the CSVs are YYYY-MM-DD; read them as local midnight like the client's date filter
+export function parseReelDate(value: string): number {
+  const match = value.match(/^(\d{4})-(\d{2})-(\d{2})$/);
+  const time = match
+    ? new Date(Number(match[1]), Number(match[2]) - 1, Number(match[3])).getTime()
+    : Date.parse(value);
+  return Number.isNaN(time) ? -Infinity : time;
+}
+
+function sortValue(index: CreatorIndex, key: SortKey, position: number): number {
+  return key === 'date' ? index.dates[position] : index.reels[position][key];
+}
+
+function compareDesc(valueA: number, idA: string, valueB: number, idB: string): number {
+  if (valueA !== valueB) return valueA > valueB ? -1 : 1;
+  return idA < idB ? -1 : idA > idB ? 1 : 0;
+}
+
+function compare(order: SortOrder, valueA: number, idA: string, valueB: number, idB: string): number {
+  const result = compareDesc(valueA, idA, valueB, idB);
+  return order === 'desc' ? result : -result;
+}
+
+async function buildCreatorIndex(filePath: string): Promise<CreatorIndex> {
+  const reels = await parseCSV(filePath);
+  const ids = reels.map((reel, position) => `${reel.username}/${reel.instagramId || position}`);
+  const dates = reels.map(reel => parseReelDate(reel.datePosted));
+  const index = { reels, ids, dates, orders: {} as Record<SortKey, Int32Array> };
+
+  for (const key of SORT_KEYS) {
+    const positions = Array.from(reels.keys());
+    positions.sort((a, b) => compareDesc(sortValue(index, key, a), ids[a], sortValue(index, key, b), ids[b]));
+    index.orders[key] = Int32Array.from(positions);
+  }
+  return index;
+}
+
+/** The index of one metrics file, rebuilt only when the file changed. */
+export async function loadCreatorIndex(filePath: string): Promise<CreatorIndex> {
+  return await fileCache.get(filePath, buildCreatorIndex);
+}
+
+/** Reels of one creator (only their file is read) or of every creator. */
+export async function loadReels(creator?: string): Promise<ReelMetricData[]> {
+  const files = await getReelFiles(creator);
+  const reels: ReelMetricData[] = [];
+  for (const file of files) {
+    reels.push(...(await loadCreatorIndex(file)).reels);
+  }
+  return reels;
+}
+
+/** Metrics files a query covers: the creator's file, or every file. */
+export async function getReelFiles(creator?: string): Promise<string[]> {
+  const index = await getCreatorFileIndex();
+  if (creator) {
+    const file = index.get(creator);
+    return file ? [file] : [];
+  }
+  const files = Array.from(index.values());
+  fileCache.retain(files);
+  return files;
+}
+
+/** Version of a set of files (path, mtime and size), for ETags. */
+export async function filesSignature(files: string[]): Promise<string> {
+  const parts = await Promise.all(files.map(async (file) => {
+    const stats = await fs.stat(file);
+    return `${file}:${stats.mtimeMs}:${stats.size}`;
+  }));
+  return parts.join('|');
+}
+
+/**
+ * Weak ETag of a reels query: the version of its files, the query string and
+ * the day, since periods like 7d move with the date. A request can be answered
+ * with a 304 before any file is parsed.
+ */
+export async function reelsETag(files: string[], query: string): Promise<string> {
+  return `W/"${crypto.createHash('sha1')
+    .update(await filesSignature(files))
+    .update(query)
+    .update(new Date().toDateString())
+    .digest('base64url')}"`;
+}
+
+export function encodeCursor(cursor: ReelCursor): string {
+  // JSON has no -Infinity, undated reels carry null
+  const value = Number.isFinite(cursor.value) ? cursor.value : null;
+  return Buffer.from(JSON.stringify([value, cursor.id])).toString('base64url');
+}
+
+export function decodeCursor(cursor: string): ReelCursor | null {
+  try {
+    const [value, id] = JSON.parse(Buffer.from(cursor, 'base64url').toString('utf-8'));
+    if ((typeof value !== 'number' && value !== null) || typeof id !== 'string') return null;
+    return { value: value ?? -Infinity, id };
+  } catch (error) {
+    return null;
+  }
+}
+
+/**
+ * Span [start, end) of the date order holding the reels with from < date <= to,
+ * found with two binary searches.
+ */
+function dateSpan(index: CreatorIndex, from?: number, to?: number): [number, number] {
+  const byDate = index.orders.date;
+  // Number of reels whose date is greater than bound (the order is descending)
+  const countAfter = (bound: number) => {
+    let low = 0;
+    let high = byDate.length;
+    while (low < high) {
+      const middle = (low + high) >> 1;
+      if (index.dates[byDate[middle]] > bound) low = middle + 1;
+      else high = middle;
+    }
+    return low;
+  };
+  const start = to === undefined ? 0 : countAfter(to);
+  const end = from === undefined ? byDate.length : countAfter(from);
+  return [start, Math.max(start, end)];
+}
+
+/**
+ * Positions a query walks for one creator, in descending order of the sort
+ * key, and whether reels outside the date range still have to be skipped.
+ *
+ * Without a date filter this is the pre-sorted order. A date-sorted query
+ * takes the span of the date order that is in range. A query sorted by
+ * another key would otherwise skip every out-of-range reel on every page,
+ * O(N) for a short period, so when the range holds few reels compared with
+ * that walk, only those reels are sorted (O(k log k) per request; the sorted
+ * span is not cached because `from` moves with the current time). For wide
+ * ranges the walk stays cheaper and is kept.
+ */
+function walkOrder(index: CreatorIndex, sort: SortKey, from: number | undefined, to: number | undefined,
+                   limit: number): { positions: Int32Array; filtered: boolean } {
+  const positions = index.orders[sort];
+  if (from === undefined && to === undefined) return { positions, filtered: false };
+
+  const [start, end] = dateSpan(index, from, to);
+  const inRange = index.orders.date.subarray(start, end);
+  if (sort === 'date') return { positions: inRange, filtered: false };
+
+  // Expected steps of the walk: limit matches, one every N / k positions
+  const walkCost = Math.min(positions.length, limit * positions.length / Math.max(1, inRange.length));
+  if (inRange.length * Math.log2(inRange.length + 1) > walkCost) return { positions, filtered: true };
+
+  const sorted = Int32Array.from(inRange);
+  sorted.sort((a, b) => compareDesc(sortValue(index, sort, a), index.ids[a], sortValue(index, sort, b), index.ids[b]));
+  return { positions: sorted, filtered: false };
+}
+
+/**
+ * One page of reels across the given creators, sorted and date-filtered.
+ * Each creator's pre-sorted order is entered at the cursor with a binary
+ * search and the orders are merged, so a page costs about `limit` steps
+ * rather than a pass over every reel (see walkOrder for date filters).
+ */
+export function queryReels(indexes: CreatorIndex[], query: ReelQuery): ReelPage {
+  const { sort, order, from, to, limit, cursor } = query;
+  const inRange = (index: CreatorIndex, position: number) =>
+    (from === undefined || index.dates[position] > from) && (to === undefined || index.dates[position] <= to);
+
+  const walks = indexes.map(index => walkOrder(index, sort, from, to, limit));
+
+  // Position p of creator i's directed order: walk the descending order backwards for ascending
+  const at = (i: number, p: number) => {
+    const positions = walks[i].positions;
+    return order === 'desc' ? positions[p] : positions[positions.length - 1 - p];
+  };
+
+  const heads = indexes.map((index, i) => {
+    let low = 0;
+    let high = walks[i].positions.length;
+    if (cursor) {
+      // First position that sorts after the cursor
+      while (low < high) {
+        const middle = (low + high) >> 1;
+        const position = at(i, middle);
+        if (compare(order, sortValue(index, sort, position), index.ids[position], cursor.value, cursor.id) <= 0) {
+          low = middle + 1;
+        } else {
+          high = middle;
+        }
+      }
+      return low;
+    }
+    return 0;
+  });
+
+  const items: ReelMetricData[] = [];
+  let last: ReelCursor | null = null;
+  while (items.length < limit) {
+    let best = -1;
+    for (let i = 0; i < indexes.length; i++) {
+      const index = indexes[i];
+      const length = walks[i].positions.length;
+      // Skip reels outside the date range
+      while (walks[i].filtered && heads[i] < length && !inRange(index, at(i, heads[i]))) {
+        heads[i]++;
+      }
+      if (heads[i] >= length) continue;
+      if (best === -1) {
+        best = i;
+        continue;
+      }
+      const position = at(i, heads[i]);
+      const bestIndex = indexes[best];
+      const bestPosition = at(best, heads[best]);
+      if (compare(order, sortValue(index, sort, position), index.ids[position],
+                  sortValue(bestIndex, sort, bestPosition), bestIndex.ids[bestPosition]) < 0) {
+        best = i;
+      }
+    }
+    if (best === -1) break;
+
+    const index = indexes[best];
+    const position = at(best, heads[best]);
+    items.push(index.reels[position]);
+    last = { value: sortValue(index, sort, position), id: index.ids[position] };
+    heads[best]++;
+  }
+
+  const total = indexes.reduce((sum, index) => {
+    const [start, end] = dateSpan(index, from, to);
+    return sum + end - start;
+  }, 0);
+  const more = walks.some((walk, i) => heads[i] < walk.positions.length);
+  return {
+    items,
+    total,
+    nextCursor: items.length === limit && more && last ? encodeCursor(last) : null,
+  };
+}
@@ -1,23 +1,75 @@
 import type { Express } from "express";
 import { createServer, type Server } from "http";
 import { storage } from "./storage";
-import { runScraper, getScraperStatus } from "./scraper";
-import { findCSVFiles, parseCSV, extractInstagramId, parseFollowerData, parseLatestFollowerData, updateCSVTag } from "./csv-ingestion";
-import { dataCache } from "./cache";
+import { runScraper, getScraperStatus, getRunLog } from "./scraper";
+import { RUN_LOGS_DIR, type LogLine } from "./run-log";
+import { findCSVFiles, extractInstagramId, parseFollowerData, parseLatestFollowerData, updateCSVTag, readAnalyticsSummary, getAnalyticsSummaryPath, getCreatorFileIndex } from "./csv-ingestion";
+import { dataCache, fileCache } from "./cache";
+import { SORT_KEYS, REEL_FIELDS, type SortKey, type SortOrder, loadReels, loadCreatorIndex, getReelFiles, reelsETag, queryReels, decodeCursor, parseReelDate } from "./reel-index";
 import { z } from "zod";
 import { scraperConfigSchema, instagramCredentialsSchema } from "@shared/schema";
 import path from "path";
+import fs from "fs/promises";
+import zlib from "zlib";
+import { promisify } from "util";
+import type { Request, Response } from "express";
 import { fileURLToPath } from "url";
 import { updateSchedule } from "./scheduler";
 
 const __filename = fileURLToPath(import.meta.url);
 const __dirname = path.dirname(__filename);
 
+const gzip = promisify(zlib.gzip);
+
+// Largest page /api/reels returns; without `limit` the whole (filtered) list is returned
+const MAX_PAGE_SIZE = 500;
+// Responses smaller than this are not worth compressing
+const GZIP_MIN_BYTES = 1024;
+
+// Start of the dashboard's time filters (7d, 30d, ytd, ...), as in client/src/lib/dateFilter.ts
+function periodStart(period: string): number | undefined {
+  period = period.toLowerCase();
+  const now = new Date();
+  const days: Record<string, number> = { '7d': 7, '14d': 14, '30d': 30, '90d': 90, '180d': 180 };
+  if (period in days) {
+    return now.getTime() - days[period] * 24 * 60 * 60 * 1000;
+  }
+  if (period === 'ytd') {
+    return new Date(now.getFullYear(), 0, 1).getTime();
+  }
+  return undefined;
+}
+
+/**
+ * Send JSON with an ETag (304 when the client already has it) and gzip
+ * when the client accepts it.
+ */
+async function sendJson(req: Request, res: Response, body: unknown, etag?: string) {
+  if (etag) {
+    // Let the browser keep the response but revalidate it with the ETag every time
+    res.setHeader('Cache-Control', 'no-cache');
+    res.setHeader('ETag', etag);
+    if (req.headers['if-none-match'] === etag) {
+      return res.status(304).end();
+    }
+  }
+
+  const json = Buffer.from(JSON.stringify(body));
+  res.setHeader('Content-Type', 'application/json; charset=utf-8');
+  res.setHeader('Vary', 'Accept-Encoding');
+  if (json.length >= GZIP_MIN_BYTES && /\bgzip\b/.test(req.headers['accept-encoding'] || '')) {
+    res.setHeader('Content-Encoding', 'gzip');
+    return res.end(await gzip(json));
+  }
+  res.end(json);
+}
+
 export async function registerRoutes(app: Express): Promise<Server> {
   app.post("/api/scrape/run", async (req, res) => {
     try {
+      // No upper bound: lists longer than part_1's run size are sharded across accounts.json
       const schema = z.object({
-        usernames: z.array(z.string()).min(1).max(10)
+        usernames: z.array(z.string()).min(1)
       });
       
       const { usernames } = schema.parse(req.body);
@@ -27,7 +79,7 @@ export async function registerRoutes(app: Express): Promise<Server> {
       res.json({ 
         success: true, 
         message: "Scraper started",
-        runId: Date.now().toString()
+        runId: getScraperStatus()?.runId
       });
     } catch (error) {
       res.status(400).json({ 
@@ -39,36 +91,142 @@ export async function registerRoutes(app: Express): Promise<Server> {
 
   app.get("/api/scrape/status", async (req, res) => {
     const status = getScraperStatus();
-    res.json(status || { status: 'idle', logs: [] });
+    res.json(status || { status: 'idle', logs: [], lastSeq: 0 });
+  });
+
+  // Lines of the current run after sequence number `since`, so polls only ship new output
+  app.get("/api/scrape/logs", async (req, res) => {
+    const runLog = getRunLog();
+    if (!runLog) {
+      return res.json({ runId: null, lines: [], lastSeq: 0, truncated: false });
+    }
+
+    const since = parseInt(req.query.since as string || '0', 10) || 0;
+    res.json(runLog.since(since));
+  });
+
+  // Server-sent events: one `log` event per line of the current run, resuming after Last-Event-ID
+  app.get("/api/scrape/logs/stream", async (req, res) => {
+    const runLog = getRunLog();
+    if (!runLog) {
+      return res.status(404).json({ error: "No scraper run yet" });
+    }
+
+    res.writeHead(200, {
+      'Content-Type': 'text/event-stream',
+      'Cache-Control': 'no-cache',
+      'Connection': 'keep-alive',
+    });
+
+    const sendLine = (entry: LogLine) => {
+      res.write(`id: ${entry.seq}\nevent: log\ndata: ${JSON.stringify(entry.line)}\n\n`);
+    };
+    const sendEnd = () => {
+      res.write(`event: end\ndata: ${JSON.stringify(getScraperStatus()?.status)}\n\n`);
+      res.end();
+    };
+
+    const since = parseInt((req.headers['last-event-id'] as string) || (req.query.since as string) || '0', 10) || 0;
+    runLog.since(since).lines.forEach(sendLine);
+
+    const status = getScraperStatus()?.status;
+    if (status === 'completed' || status === 'failed') {
+      return sendEnd();
+    }
+
+    runLog.on('line', sendLine);
+    runLog.once('close', sendEnd);
+    req.on('close', () => {
+      runLog.off('line', sendLine);
+      runLog.off('close', sendEnd);
+    });
+  });
+
+  // Past runs, each with its full log in data/run_logs/{runId}.log
+  app.get("/api/scrape/runs", async (req, res) => {
+    try {
+      const files = await fs.readdir(RUN_LOGS_DIR).catch(() => [] as string[]);
+      const runs = files
+        .filter(file => file.endsWith('.log'))
+        .map(file => ({ runId: file.slice(0, -'.log'.length) }))
+        .sort((a, b) => b.runId.localeCompare(a.runId));
+      res.json(runs);
+    } catch (error) {
+      res.status(500).json({ 
+        error: error instanceof Error ? error.message : "Failed to list scraper runs" 
+      });
+    }
   });
 
+  app.get("/api/scrape/runs/:runId/log", async (req, res) => {
+    const { runId } = req.params;
+    if (!/^[\w-]+$/.test(runId)) {
+      return res.status(400).json({ error: "Invalid run id" });
+    }
+
+    res.type('text/plain');
+    res.sendFile(path.join(RUN_LOGS_DIR, `${runId}.log`), (error) => {
+      if (error && !res.headersSent) {
+        res.status(404).json({ error: `No log for run ${runId}` });
+      }
+    });
+  });
+
+  // Query: creator, sort (date|likes|views|comments), order (asc|desc), period (7d|...|ytd|all) or
+  // from/to (dates), fields (comma-separated projection), limit and cursor for pagination.
+  // With limit or cursor the response is { items, total, nextCursor }, otherwise a plain array.
   app.get("/api/reels", async (req, res) => {
     try {
       const creator = req.query.creator as string | undefined;
-      const cacheKey = creator ? `reels:${creator}` : 'reels:all';
-      
-      const allReels = await dataCache.get(
-        cacheKey,
-        async () => {
-          const csvFiles = await findCSVFiles();
-          const reels: any[] = [];
-
-          for (const file of csvFiles) {
-            const fileReels = await parseCSV(file);
-            reels.push(...fileReels);
-          }
+      const sort = (req.query.sort as string | undefined) || 'date';
+      const order = (req.query.order as string | undefined) || 'desc';
+      if (!SORT_KEYS.includes(sort as SortKey) || (order !== 'asc' && order !== 'desc')) {
+        return res.status(400).json({ error: `sort must be one of ${SORT_KEYS.join(', ')} and order asc or desc` });
+      }
 
-          return reels;
-        },
-        await findCSVFiles()
-      );
+      const fields = req.query.fields ? (req.query.fields as string).split(',').map(field => field.trim()) : null;
+      const unknownFields = fields?.filter(field => !REEL_FIELDS.includes(field as any)) ?? [];
+      if (unknownFields.length > 0) {
+        return res.status(400).json({ error: `Unknown fields: ${unknownFields.join(', ')}` });
+      }
 
-      // Filter by creator if specified
-      const filteredReels = creator 
-        ? allReels.filter((reel: any) => reel.username === creator)
-        : allReels;
+      const paginate = req.query.limit !== undefined || req.query.cursor !== undefined;
+      const limit = paginate
+        ? Math.min(MAX_PAGE_SIZE, Math.max(1, parseInt(req.query.limit as string, 10) || 50))
+        : Infinity;
+      const cursor = req.query.cursor ? decodeCursor(req.query.cursor as string) : undefined;
+      if (cursor === null) {
+        return res.status(400).json({ error: "Invalid cursor" });
+      }
+
+      const from = req.query.from ? parseReelDate(req.query.from as string) : periodStart((req.query.period as string) || 'all');
+      const to = req.query.to ? parseReelDate(req.query.to as string) : undefined;
+
+      // The ETag only depends on the files' versions and the query, so a 304 needs no parsing
+      const files = await getReelFiles(creator);
+      const etag = await reelsETag(files, req.originalUrl);
+      if (req.headers['if-none-match'] === etag) {
+        res.setHeader('Cache-Control', 'no-cache');
+        res.setHeader('ETag', etag);
+        return res.status(304).end();
+      }
 
-      res.json(filteredReels);
+      // Only files changed since the last request are indexed again; a creator query reads one file
+      const indexes = await Promise.all(files.map(file => loadCreatorIndex(file)));
+      const page = queryReels(indexes, {
+        sort: sort as SortKey,
+        order: order as SortOrder,
+        from,
+        to,
+        limit,
+        cursor,
+      });
+
+      const items = fields
+        ? page.items.map(reel => Object.fromEntries(fields.map(field => [field, reel[field as keyof typeof reel]])))
+        : page.items;
+
+      await sendJson(req, res, paginate ? { ...page, items } : items, etag);
     } catch (error) {
       res.status(500).json({ 
         error: error instanceof Error ? error.message : "Failed to fetch reels" 
@@ -78,25 +236,9 @@ export async function registerRoutes(app: Express): Promise<Server> {
 
   app.get("/api/creators", async (req, res) => {
     try {
-      const creators = await dataCache.get(
-        'creators:all',
-        async () => {
-          const csvFiles = await findCSVFiles();
-          const creatorSet = new Set<string>();
-
-          for (const file of csvFiles) {
-            const reels = await parseCSV(file);
-            reels.forEach(reel => {
-              if (reel.username) {
-                creatorSet.add(reel.username);
-              }
-            });
-          }
-
-          return Array.from(creatorSet).map(username => ({ username }));
-        },
-        await findCSVFiles()
-      );
+      // Creators come from the metrics file names, no CSV is parsed
+      const index = await getCreatorFileIndex();
+      const creators = Array.from(index.keys()).map(username => ({ username }));
 
       res.json(creators);
     } catch (error) {
@@ -106,6 +248,44 @@ export async function registerRoutes(app: Express): Promise<Server> {
     }
   });
 
+  app.get("/api/analytics/summary", async (req, res) => {
+    try {
+      const creator = req.query.creator as string | undefined;
+      const summaryPath = getAnalyticsSummaryPath();
+
+      const summary = await dataCache.get(
+        'analytics:summary',
+        async () => await readAnalyticsSummary(),
+        [summaryPath]
+      );
+
+      if (!summary) {
+        return res.status(404).json({ error: "No analytics summary yet, it is written at the end of part_2_get_metrics.py" });
+      }
+
+      if (creator) {
+        const creatorSummary = summary.creators[creator];
+        if (!creatorSummary) {
+          return res.status(404).json({ error: `No analytics summary for ${creator}` });
+        }
+        return res.json({ generated_at: summary.generated_at, username: creator, ...creatorSummary });
+      }
+
+      res.json(summary);
+    } catch (error) {
+      res.status(500).json({ 
+        error: error instanceof Error ? error.message : "Failed to fetch analytics summary" 
+      });
+    }
+  });
+
+  app.get("/api/cache/stats", async (req, res) => {
+    res.json({
+      files: fileCache.stats(),
+      data: dataCache.stats()
+    });
+  });
+
   app.get("/api/followers", async (req, res) => {
     try {
       const creator = req.query.creator as string | undefined;
@@ -226,7 +406,7 @@ export async function registerRoutes(app: Express): Promise<Server> {
   app.patch("/api/reels/:videoUrl(*)/tag", async (req, res) => {
     try {
       const { videoUrl } = req.params;
-      const { tag } = req.body;
+      const { tag, instagramId } = req.body;
       
       if (!tag) {
         return res.status(400).json({ error: "Tag is required" });
@@ -244,21 +424,21 @@ export async function registerRoutes(app: Express): Promise<Server> {
       let foundReel = false;
 
       for (const file of csvFiles) {
-        const reels = await parseCSV(file);
-        const matchingReel = reels.find(r => r.videoUrl === decodedVideoUrl);
+        const { reels } = await loadCreatorIndex(file);
+        const matchingReel = reels.find(r =>
+          (instagramId && r.instagramId === instagramId) || r.videoUrl === decodedVideoUrl
+        );
         
         if (matchingReel) {
           foundReel = true;
           console.log('Found reel in file:', file);
-          // Update the CSV file with the new tag using video_url as identifier
-          updated = await updateCSVTag(file, decodedVideoUrl, tag);
+          // Update the CSV file with the new tag using the shortcode (or video_url) as identifier
+          updated = await updateCSVTag(file, decodedVideoUrl, tag, instagramId);
           
           if (updated) {
             console.log('Tag updated successfully');
-            // Invalidate cache immediately
-            dataCache.invalidateAll();
-            // Small delay to ensure file system updates modification time
-            await new Promise(resolve => setTimeout(resolve, 10));
+            // Only the rewritten file has to be parsed again
+            fileCache.invalidate(file);
             break;
           }
         }
@@ -288,22 +468,11 @@ export async function registerRoutes(app: Express): Promise<Server> {
       const startDate = req.query.startDate as string | undefined;
       const endDate = req.query.endDate as string | undefined;
       
-      // Fetch reels and follower data
-      const csvFiles = await findCSVFiles();
-      let reels: any[] = [];
-      
-      for (const file of csvFiles) {
-        const fileReels = await parseCSV(file);
-        reels.push(...fileReels);
-      }
+      // Fetch reels (only the creator's file when one is given) and follower data
+      let reels = await loadReels(creator);
       
       const followerData = await parseFollowerData();
       
-      // Filter by creator if specified
-      if (creator) {
-        reels = reels.filter(r => r.username === creator);
-      }
-      
       // Filter by date range if specified
       if (startDate || endDate) {
         reels = reels.filter(r => {
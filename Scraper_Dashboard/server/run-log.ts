@@ -0,0 +1,102 @@
+import fs from 'fs';
+import path from 'path';
+import { EventEmitter } from 'events';
+import { fileURLToPath } from 'url';
+
+const __filename = fileURLToPath(import.meta.url);
+const __dirname = path.dirname(__filename);
+
+// Lines kept in memory per run; the full log is in data/run_logs/{runId}.log
+const LOG_BUFFER_SIZE = 1000;
+
+export const RUN_LOGS_DIR = path.join(path.resolve(__dirname, '..', '..'), 'data', 'run_logs');
+
+export interface LogLine {
+  seq: number;
+  line: string;
+}
+
+export interface LogPage {
+  runId: string;
+  lines: LogLine[];
+  lastSeq: number;
+  // True when lines after `since` already fell out of the buffer
+  truncated: boolean;
+}
+
+/**
+ * Log of one scraper run: a fixed-size ring buffer of numbered lines,
+ * mirrored to a per-run file on disk. Clients ask for the lines after the
+ * last sequence number they saw, or subscribe to new lines as they arrive.
+ */
+export class RunLog extends EventEmitter {
+  readonly runId: string;
+  readonly filePath: string;
+  private buffer: (LogLine | undefined)[] = new Array(LOG_BUFFER_SIZE);
+  private seq = 0;
+  private file: fs.WriteStream;
+
+  constructor(runId: string) {
+    super();
+    // One listener per open log stream
+    this.setMaxListeners(0);
+    this.runId = runId;
+    fs.mkdirSync(RUN_LOGS_DIR, { recursive: true });
+    this.filePath = path.join(RUN_LOGS_DIR, `${runId}.log`);
+    this.file = fs.createWriteStream(this.filePath, { flags: 'a' });
+    this.file.on('error', (error) => console.error(`Could not write run log ${this.filePath}:`, error));
+  }
+
+  get lastSeq(): number {
+    return this.seq;
+  }
+
+  append(text: string): void {
+    for (const line of text.split('\n')) {
+      if (!line.trim()) continue;
+      const entry = { seq: ++this.seq, line };
+      this.buffer[entry.seq % LOG_BUFFER_SIZE] = entry;
+      this.file.write(`${new Date().toISOString()} ${line}\n`);
+      this.emit('line', entry);
+    }
+  }
+
+  since(since: number = 0): LogPage {
+    const firstSeq = Math.max(1, this.seq - LOG_BUFFER_SIZE + 1);
+    const start = Math.max(since + 1, firstSeq);
+    const lines: LogLine[] = [];
+    for (let seq = start; seq <= this.seq; seq++) {
+      lines.push(this.buffer[seq % LOG_BUFFER_SIZE]!);
+    }
+    return { runId: this.runId, lines, lastSeq: this.seq, truncated: since + 1 < firstSeq };
+  }
+
+  tail(count: number): string[] {
+    return this.since(Math.max(0, this.seq - count)).lines.map(entry => entry.line);
+  }
+
+  close(): void {
+    this.file.end();
+    this.emit('close');
+  }
+}
+
+/**
+ * Split a child process stream into whole lines, holding back a partial
+ * line until the rest of it arrives.
+ */
+export function lineSplitter(onLine: (line: string) => void) {
+  let pending = '';
+  return {
+    write(chunk: string) {
+      pending += chunk;
+      const lines = pending.split('\n');
+      pending = lines.pop() ?? '';
+      lines.forEach(line => onLine(line.replace(/\r$/, '')));
+    },
+    flush() {
+      if (pending) onLine(pending);
+      pending = '';
+    },
+  };
+}
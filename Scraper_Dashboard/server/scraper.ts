@@ -1,20 +1,40 @@
 import { spawn } from 'child_process';
+import net from 'net';
 import path from 'path';
 import { fileURLToPath } from 'url';
-import { dataCache } from './cache';
 import { storage } from './storage';
+import { RunLog, lineSplitter } from './run-log';
 
 const __filename = fileURLToPath(import.meta.url);
 const __dirname = path.dirname(__filename);
 
+// Warm browser worker started with `python3 browser_worker.py` (optional)
+const WORKER_HOST = '127.0.0.1';
+const WORKER_PORT = Number(process.env.SCRAPER_WORKER_PORT || 8765);
+
+// part_1 scrapes at most this many creators per run; longer lists go through sharded_runner.py
+const MAX_USERS_PER_RUN = 10;
+
+// Log lines included in /api/scrape/status; clients follow the rest through /api/scrape/logs
+const STATUS_LOG_TAIL = 10;
+
 export interface ScraperProgress {
   status: 'queued' | 'running' | 'fetching_metrics' | 'ingesting' | 'completed' | 'failed';
+  runId: string;
   logs: string[];
+  lastSeq: number;
+  error?: string;
+  reelsScraped?: number;
+}
+
+interface ScraperRun {
+  status: ScraperProgress['status'];
+  log: RunLog;
   error?: string;
   reelsScraped?: number;
 }
 
-let currentRun: ScraperProgress | null = null;
+let currentRun: ScraperRun | null = null;
 
 export async function runScraper(usernames: string[]): Promise<void> {
   if (currentRun && (currentRun.status === 'running' || currentRun.status === 'fetching_metrics')) {
@@ -23,64 +43,159 @@ export async function runScraper(usernames: string[]): Promise<void> {
 
   currentRun = {
     status: 'queued',
-    logs: [],
+    log: new RunLog(new Date().toISOString().replace(/[:.]/g, '-')),
   };
+  const run = currentRun;
 
   const projectRoot = path.resolve(__dirname, '..', '..');
 
   try {
-    currentRun.status = 'running';
-    currentRun.logs.push('Starting URL scraper...');
+    run.status = 'running';
+    run.log.append('Starting URL scraper...');
 
-    await runPythonScript(
-      path.join(projectRoot, 'part_1_scrape_urls.py'),
-      usernames,
-      (data) => {
-        if (currentRun) {
-          currentRun.logs.push(data);
-        }
+    const onUrlData = (data: string) => run.log.append(data);
+
+    if (usernames.length > MAX_USERS_PER_RUN) {
+      // Split long lists across the account pool in accounts.json
+      await runPythonScript(
+        path.join(projectRoot, 'sharded_runner.py'),
+        usernames,
+        onUrlData,
+        ['--urls-only']
+      );
+    } else {
+      // Reuse the warm browser when a worker is running, otherwise start a fresh one
+      const ranOnWorker = await runOnBrowserWorker(usernames, onUrlData);
+      if (!ranOnWorker) {
+        await runPythonScript(
+          path.join(projectRoot, 'part_1_scrape_urls.py'),
+          usernames,
+          onUrlData
+        );
       }
-    );
+    }
 
-    currentRun.status = 'fetching_metrics';
-    currentRun.logs.push('Starting metrics scraper...');
+    run.status = 'fetching_metrics';
+    run.log.append('Starting metrics scraper...');
 
     await runPythonScript(
       path.join(projectRoot, 'part_2_get_metrics.py'),
-      [],
-      (data) => {
-        if (currentRun) {
-          currentRun.logs.push(data);
-        }
-      }
+      usernames,
+      (data) => run.log.append(data)
     );
 
-    currentRun.status = 'completed';
-    currentRun.logs.push('Scraping completed successfully');
-    
-    // Invalidate cache to force fresh data on next request
-    dataCache.invalidateAll();
+    run.status = 'completed';
+    run.log.append('Scraping completed successfully');
   } catch (error) {
-    if (currentRun) {
-      currentRun.status = 'failed';
-      currentRun.error = error instanceof Error ? error.message : String(error);
-      currentRun.logs.push(`Error: ${currentRun.error}`);
-    }
+    run.status = 'failed';
+    run.error = error instanceof Error ? error.message : String(error);
+    run.log.append(`Error: ${run.error}`);
     throw error;
+  } finally {
+    run.log.close();
   }
 }
 
+/**
+ * Send the URL scrape to the browser worker as one JSON-lines job.
+ * Resolves to false when no worker is listening, it sends an unreadable line or it is
+ * logged in as another account than the saved credentials, so the caller can spawn part_1 instead.
+ */
+async function runOnBrowserWorker(
+  usernames: string[],
+  onData: (data: string) => void
+): Promise<boolean> {
+  // Only the username is sent; a worker logged in as someone else refuses the job
+  const account = (await storage.getCredentials())?.instagramUsername;
+
+  return new Promise((resolve, reject) => {
+    const socket = net.createConnection({ host: WORKER_HOST, port: WORKER_PORT });
+    let connected = false;
+    let finished = false;
+    let buffer = '';
+
+    socket.setEncoding('utf8');
+
+    socket.on('connect', () => {
+      connected = true;
+      onData('Using warm browser worker');
+      socket.write(JSON.stringify({ usernames, account }) + '\n');
+    });
+
+    socket.on('data', (chunk: string) => {
+      buffer += chunk;
+      let newline = buffer.indexOf('\n');
+      while (newline >= 0) {
+        const line = buffer.slice(0, newline);
+        buffer = buffer.slice(newline + 1);
+        newline = buffer.indexOf('\n');
+        if (!line.trim()) continue;
+
+        let message;
+        try {
+          message = JSON.parse(line);
+        } catch (error) {
+          console.error(`[Worker] Unreadable message from browser worker: ${line}`);
+          if (!finished) {
+            finished = true;
+            onData('Browser worker sent an unreadable message, starting a fresh browser');
+            resolve(false);
+          }
+          socket.destroy();
+          return;
+        }
+        if (message.type === 'log') {
+          const output = String(message.line).trim();
+          if (output) {
+            onData(output);
+            console.log(`[Worker] ${output}`);
+          }
+        } else {
+          finished = true;
+          socket.end();
+          if (message.wrong_account) {
+            onData(`Browser worker skipped: ${message.error}`);
+            resolve(false);
+          } else if (message.ok) {
+            resolve(true);
+          } else {
+            reject(new Error(`Browser worker job failed: ${message.error}`));
+          }
+        }
+      }
+    });
+
+    socket.on('error', (error) => {
+      if (!connected) {
+        resolve(false);
+      } else if (!finished) {
+        finished = true;
+        reject(error);
+      }
+    });
+
+    socket.on('close', () => {
+      if (connected && !finished) {
+        finished = true;
+        reject(new Error('Browser worker closed the connection before the job finished'));
+      }
+    });
+  });
+}
+
 async function runPythonScript(
   scriptPath: string,
   usernames: string[],
-  onData: (data: string) => void
+  onData: (data: string) => void,
+  extraArgs: string[] = []
 ): Promise<void> {
   return new Promise(async (resolve, reject) => {
-    const args = usernames.length > 0 ? ['--users', ...usernames] : [];
+    const args = usernames.length > 0 ? ['--users', ...usernames, ...extraArgs] : extraArgs;
     
     // Get credentials from storage and set as environment variables
     const credentials = await storage.getCredentials();
-    const env = { ...process.env };
+    // Unbuffered so print() output reaches the run log as it happens, not when the pipe buffer fills
+    const env = { ...process.env, PYTHONUNBUFFERED: '1' };
     
     if (credentials) {
       env.INSTAGRAM_USERNAME = credentials.instagramUsername;
@@ -101,23 +216,29 @@ async function runPythonScript(
       cwd: projectRoot  // Set working directory to project root
     });
 
-    pythonProcess.stdout.on('data', (data) => {
-      const output = data.toString().trim();
+    const stdout = lineSplitter((line) => {
+      const output = line.trim();
       if (output) {
         onData(output);
         console.log(`[Python] ${output}`);
       }
     });
-
-    pythonProcess.stderr.on('data', (data) => {
-      const output = data.toString().trim();
+    const stderr = lineSplitter((line) => {
+      const output = line.trim();
       if (output) {
         onData(`[ERROR] ${output}`);
         console.error(`[Python Error] ${output}`);
       }
     });
 
+    pythonProcess.stdout.setEncoding('utf8');
+    pythonProcess.stderr.setEncoding('utf8');
+    pythonProcess.stdout.on('data', (data: string) => stdout.write(data));
+    pythonProcess.stderr.on('data', (data: string) => stderr.write(data));
+
     pythonProcess.on('close', (code) => {
+      stdout.flush();
+      stderr.flush();
       if (code === 0) {
         resolve();
       } else {
@@ -132,5 +253,19 @@ async function runPythonScript(
 }
 
 export function getScraperStatus(): ScraperProgress | null {
-  return currentRun;
+  if (!currentRun) {
+    return null;
+  }
+  return {
+    status: currentRun.status,
+    runId: currentRun.log.runId,
+    logs: currentRun.log.tail(STATUS_LOG_TAIL),
+    lastSeq: currentRun.log.lastSeq,
+    error: currentRun.error,
+    reelsScraped: currentRun.reelsScraped,
+  };
+}
+
+export function getRunLog(): RunLog | null {
+  return currentRun?.log ?? null;
 }
@@ -0,0 +1,276 @@
+#!/usr/bin/env python3
+"""
+Analytics summary - per-creator statistics precomputed for the dashboard.
+
+part_2 calls update_summary() at the end of every run. For each creator it
+reads data/{creator}_reels_metrics.csv once and stores totals, medians,
+engagement rates normalised by the latest follower count in
+scrape_history.csv, the top reels, the top hashtags with their views, likes
+and comments, and posting-time histograms in data/analytics_summary.json.
+
+A creator is only recomputed when the content of its metrics file or its
+follower count changed since the last summary, so a run only pays for the
+creators whose reels actually changed.
+"""
+
+import argparse
+import csv
+import glob
+import hashlib
+import heapq
+import json
+import os
+import statistics
+from collections import Counter
+from datetime import datetime, timezone
+
+import run_journal
+from metrics_store import METRICS_DB, MetricsStore
+
+SUMMARY_FILE = "data/analytics_summary.json"
+HISTORY_FILE = "data/scrape_history.csv"
+METRICS_FILE_PATTERN = "data/*_reels_metrics.csv"
+
+# Bump when the layout of a creator summary changes, so every creator is recomputed
+SUMMARY_VERSION = 2
+
+TOP_REELS = 10
+TOP_HASHTAGS = 25
+CAPTION_PREVIEW = 120
+WEEKDAYS = ['Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat', 'Sun']
+
+
+def get_username_from_metrics_file(metrics_file):
+    return os.path.basename(metrics_file)[:-len('_reels_metrics.csv')]
+
+
+def to_int(value):
+    try:
+        return int(float(value))
+    except (TypeError, ValueError):
+        return 0
+
+
+def load_latest_followers(history_file=HISTORY_FILE):
+    """Return username -> follower count of the most recent history row (None when unknown)."""
+    latest = {}
+    if not os.path.exists(history_file):
+        return {}
+    with open(history_file, 'r', newline='', encoding='utf-8') as f:
+        for row in csv.DictReader(f):
+            username = row.get('username')
+            if not username:
+                continue
+            if username not in latest or row.get('timestamp', '') >= latest[username][0]:
+                followers = row.get('followers', '')
+                latest[username] = (row.get('timestamp', ''), int(followers) if followers.isdigit() else None)
+    return {username: followers for username, (_, followers) in latest.items()}
+
+
+def file_digest(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def fingerprint(metrics_file, followers, cached=None):
+    """What a creator summary was computed from; a different fingerprint means it is stale.
+
+    part_2 re-exports a creator's CSV on every run, so the file's mtime changes
+    even when its rows do not. The content hash decides; it is only computed
+    again when the mtime or size differs from the cached fingerprint.
+    """
+    stat = os.stat(metrics_file)
+    source = {
+        'version': SUMMARY_VERSION,
+        'mtime_ns': stat.st_mtime_ns,
+        'size': stat.st_size,
+        'followers': followers,
+    }
+    cached = cached or {}
+    if cached.get('sha256') and all(cached.get(key) == source[key] for key in ('version', 'mtime_ns', 'size')):
+        source['sha256'] = cached['sha256']
+    else:
+        source['sha256'] = file_digest(metrics_file)
+    return source
+
+
+def same_content(source, cached):
+    return all(cached.get(key) == source[key] for key in ('version', 'size', 'sha256', 'followers'))
+
+
+def median(values):
+    return statistics.median(values) if values else 0
+
+
+def summarize_creator(metrics_file, followers, store=None):
+    """Compute one creator's summary in a single pass over its metrics CSV."""
+    views = []
+    likes = []
+    comments = []
+    follower_rates = []
+    shortcodes = []
+    top = []
+    hashtags = Counter()
+    hashtag_totals = {}
+    weekdays = Counter()
+    months = Counter()
+
+    with open(metrics_file, 'r', newline='', encoding='utf-8') as f:
+        for index, row in enumerate(csv.DictReader(f)):
+            reel_views = to_int(row.get('views'))
+            reel_likes = max(0, to_int(row.get('likes')))
+            reel_comments = to_int(row.get('comments'))
+            views.append(reel_views)
+            likes.append(reel_likes)
+            comments.append(reel_comments)
+            if followers:
+                follower_rates.append((reel_likes + reel_comments) / followers * 100)
+            if row.get('shortcode'):
+                shortcodes.append(row['shortcode'])
+
+            reel = {
+                'shortcode': row.get('shortcode', ''),
+                'date': row.get('date', ''),
+                'views': reel_views,
+                'likes': reel_likes,
+                'comments': reel_comments,
+                'caption': (row.get('caption') or '')[:CAPTION_PREVIEW],
+            }
+            # index breaks ties so dicts are never compared
+            entry = (reel_views, -index, reel)
+            if len(top) < TOP_REELS:
+                heapq.heappush(top, entry)
+            else:
+                heapq.heappushpop(top, entry)
+
+            for tag in (row.get('hashtags') or '').split(','):
+                tag = tag.strip().lstrip('#').lower()
+                if tag:
+                    hashtags[tag] += 1
+                    tag_totals = hashtag_totals.setdefault(tag, Counter())
+                    tag_totals.update(views=reel_views, likes=reel_likes, comments=reel_comments)
+
+            try:
+                posted = datetime.strptime(row.get('date', ''), '%Y-%m-%d')
+            except ValueError:
+                continue
+            weekdays[WEEKDAYS[posted.weekday()]] += 1
+            months[posted.strftime('%Y-%m')] += 1
+
+    # Post times (with the hour) are only kept in the metrics store
+    hours = [0] * 24
+    if store is not None and shortcodes:
+        for entry in store.get_refresh_times(shortcodes).values():
+            posted_at = entry.get('posted_at')
+            try:
+                hours[datetime.fromisoformat(posted_at.replace('Z', '+00:00')).astimezone(timezone.utc).hour] += 1
+            except (AttributeError, ValueError):
+                continue
+
+    top_hashtags = hashtags.most_common(TOP_HASHTAGS)
+    total_views = sum(views)
+    total_interactions = sum(likes) + sum(comments)
+    return {
+        'reels': len(views),
+        'followers': followers,
+        'totals': {'views': total_views, 'likes': sum(likes), 'comments': sum(comments)},
+        'medians': {'views': median(views), 'likes': median(likes), 'comments': median(comments)},
+        'engagement': {
+            # (likes + comments) per reel as a share of followers, and of views
+            'median_rate_by_followers': round(median(follower_rates), 4) if follower_rates else None,
+            'mean_rate_by_followers': round(statistics.fmean(follower_rates), 4) if follower_rates else None,
+            'rate_by_views': round(total_interactions / total_views * 100, 4) if total_views else None,
+        },
+        'top_reels': [reel for _, _, reel in sorted(top, key=lambda entry: (entry[0], entry[1]), reverse=True)],
+        'hashtags': top_hashtags,
+        # Views, likes and comments of the reels using each of the top hashtags
+        'hashtag_metrics': {tag: {'reels': count, **hashtag_totals[tag]} for tag, count in top_hashtags},
+        'posting': {
+            'weekdays': {day: weekdays.get(day, 0) for day in WEEKDAYS},
+            'hours_utc': hours,
+            'months': dict(sorted(months.items())),
+        },
+    }
+
+
+def summarize_overall(creators):
+    """Totals across creators, built from the creator summaries only."""
+    totals = Counter()
+    hashtags = Counter()
+    hashtag_metrics = {}
+    weekdays = Counter()
+    reels = 0
+    for creator in creators.values():
+        totals.update(creator['totals'])
+        hashtags.update(dict(creator['hashtags']))
+        for tag, metrics in creator['hashtag_metrics'].items():
+            hashtag_metrics.setdefault(tag, Counter()).update(metrics)
+        weekdays.update(creator['posting']['weekdays'])
+        reels += creator['reels']
+    interactions = totals['likes'] + totals['comments']
+    top_hashtags = hashtags.most_common(TOP_HASHTAGS)
+    return {
+        'creators': len(creators),
+        'reels': reels,
+        'totals': dict(totals),
+        'rate_by_views': round(interactions / totals['views'] * 100, 4) if totals['views'] else None,
+        'hashtags': top_hashtags,
+        'hashtag_metrics': {tag: dict(hashtag_metrics[tag]) for tag, _ in top_hashtags},
+        'weekdays': {day: weekdays.get(day, 0) for day in WEEKDAYS},
+    }
+
+
+def load_summary(summary_file=SUMMARY_FILE):
+    if not os.path.exists(summary_file):
+        return {'creators': {}}
+    try:
+        with open(summary_file, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except ValueError:
+        return {'creators': {}}
+
+
+def update_summary(store=None, rebuild=False, summary_file=SUMMARY_FILE):
+    """Bring the summary up to date and write it. Returns the creators that were recomputed."""
+    summary = load_summary(summary_file)
+    previous = summary.get('creators', {})
+    followers = load_latest_followers()
+
+    creators = {}
+    recomputed = []
+    touched = False
+    for metrics_file in sorted(glob.glob(METRICS_FILE_PATTERN)):
+        username = get_username_from_metrics_file(metrics_file)
+        cached = previous.get(username)
+        cached_source = (cached or {}).get('source', {})
+        source = fingerprint(metrics_file, followers.get(username), cached_source)
+        if not rebuild and cached and same_content(source, cached_source):
+            # Rewritten with the same rows: keep the summary, remember the new mtime
+            touched = touched or source != cached_source
+            creators[username] = {**cached, 'source': source}
+            continue
+        creators[username] = {'source': source, **summarize_creator(metrics_file, source['followers'], store)}
+        recomputed.append(username)
+
+    if not recomputed and not touched and set(creators) == set(previous) and os.path.exists(summary_file):
+        return recomputed
+
+    run_journal.write_json_atomic(summary_file, {
+        'generated_at': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'overall': summarize_overall(creators),
+        'creators': creators,
+    })
+    print(f"📊 Analytics summary: recomputed {len(recomputed)} of {len(creators)} creator(s) -> {summary_file}")
+    return recomputed
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Precompute the dashboard analytics summary')
+    parser.add_argument('--rebuild', action='store_true', help='Recompute every creator, not only changed ones')
+    args = parser.parse_args()
+
+    store = MetricsStore(METRICS_DB) if os.path.exists(METRICS_DB) else None
+    update_summary(store, rebuild=args.rebuild)
@@ -0,0 +1,194 @@
+"""
+Fake Apify - local stand-in for the Apify API calls part_2_get_metrics.py makes.
+
+Implements actor runs, run polling and paginated dataset items, answering every
+reel URL in the run input with a synthetic instagram-reel-scraper item.
+"""
+
+import gzip
+import itertools
+import json
+import re
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+# Signed CDN links in real items are long, keep the payload size in the same ballpark
+VIDEO_URL_PADDING = 'x' * 900
+DEFAULT_CDN_URL = 'https://cdn.example.com'
+# Signed links carry their expiry as a hex Unix timestamp in `oe`
+VIDEO_URL_LIFETIME = timedelta(days=3)
+
+
+def make_item(url, owner, index, cdn_url=DEFAULT_CDN_URL):
+    """Synthetic dataset item for one reel URL."""
+    match = re.search(r"/reel/([A-Za-z0-9_-]+)", url)
+    shortcode = match.group(1) if match else f"FAKE{index}"
+    posted = datetime.now(timezone.utc) - timedelta(hours=index)
+    expires = format(int((datetime.now(timezone.utc) + VIDEO_URL_LIFETIME).timestamp()), 'X')
+    return {
+        'shortCode': shortcode,
+        'url': url,
+        'ownerUsername': owner,
+        'likesCount': 1000 + index % 500,
+        'commentsCount': index % 80,
+        'videoViewCount': 20_000 + index,
+        'caption': f"Benchmark reel {index} #bench @{owner}",
+        'hashtags': ['bench'],
+        'mentions': [owner],
+        'videoUrl': f"{cdn_url}/{shortcode}.mp4?i={index}&oe={expires}&sig={VIDEO_URL_PADDING}",
+        'timestamp': posted.isoformat().replace('+00:00', 'Z'),
+    }
+
+
+class FakeApify:
+    """Fake Apify API server running on a background thread."""
+
+    def __init__(self, run_latency=0.0, cdn_url=DEFAULT_CDN_URL, host='127.0.0.1', port=0):
+        self.run_latency = run_latency
+        self.cdn_url = cdn_url
+        self.runs = {}
+        self.datasets = {}
+        self.ids = itertools.count(1)
+        self.lock = threading.Lock()
+        self.counters = {'runs': 0, 'item_pages': 0, 'items_served': 0}
+        self.server = ThreadingHTTPServer((host, port), self._make_handler())
+        self.server.daemon_threads = True
+        self.thread = None
+
+    @property
+    def api_url(self):
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def start_run(self, run_input):
+        """Create a run whose dataset holds one item per requested reel URL."""
+        owners = run_input.get('username') or ['unknown']
+        urls = run_input.get('postUrls') or []
+        # Batched runs pass several creators, use the owner from the URL path when it has one
+        items = []
+        for index, url in enumerate(urls):
+            match = re.search(r"//[^/]+/([^/]+)/reel/", url)
+            owner = match.group(1) if match else owners[0]
+            items.append(make_item(url, owner, index, self.cdn_url))
+
+        with self.lock:
+            run_id = f"run{next(self.ids)}"
+            dataset_id = f"dataset{run_id[3:]}"
+            self.datasets[dataset_id] = items
+            self.runs[run_id] = {
+                'id': run_id,
+                'status': 'RUNNING',
+                'defaultDatasetId': dataset_id,
+                'finishes_at': time.monotonic() + self.run_latency,
+            }
+            self.counters['runs'] += 1
+        return self.run_info(run_id)
+
+    def run_info(self, run_id, wait=0.0):
+        run = self.runs.get(run_id)
+        if run is None:
+            return None
+        remaining = run['finishes_at'] - time.monotonic()
+        if remaining > 0 and wait:
+            time.sleep(min(remaining, wait))
+        if time.monotonic() >= run['finishes_at']:
+            run['status'] = 'SUCCEEDED'
+        return {key: value for key, value in run.items() if key != 'finishes_at'}
+
+    def _make_handler(self):
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, format, *args):
+                pass
+
+            def send_json(self, status, payload, headers=None):
+                body = json.dumps(payload).encode('utf-8')
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                for name, value in (headers or {}).items():
+                    self.send_header(name, str(value))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def not_found(self):
+                self.send_json(404, {'error': {'type': 'record-not-found', 'message': self.path}})
+
+            def do_POST(self):
+                url = urlparse(self.path)
+                length = int(self.headers.get('Content-Length', 0))
+                body = self.rfile.read(length) if length else b'{}'
+                # The Apify client gzips request bodies
+                if self.headers.get('Content-Encoding') == 'gzip':
+                    body = gzip.decompress(body)
+                if re.fullmatch(r"/v2/acts/[^/]+/runs", url.path):
+                    run = fake.start_run(json.loads(body or b'{}'))
+                    self.send_json(201, {'data': run})
+                else:
+                    self.not_found()
+
+            def do_GET(self):
+                url = urlparse(self.path)
+                query = parse_qs(url.query)
+
+                run_match = re.fullmatch(r"/v2/actor-runs/([^/]+)", url.path)
+                items_match = re.fullmatch(r"/v2/datasets/([^/]+)/items", url.path)
+
+                if run_match:
+                    wait = min(float(query.get('waitForFinish', ['0'])[0]), 5.0)
+                    run = fake.run_info(run_match.group(1), wait)
+                    if run is None:
+                        self.not_found()
+                    else:
+                        self.send_json(200, {'data': run})
+                elif items_match:
+                    items = fake.datasets.get(items_match.group(1))
+                    if items is None:
+                        self.not_found()
+                        return
+                    offset = int(query.get('offset', ['0'])[0])
+                    limit = int(query.get('limit', [str(len(items))])[0] or len(items))
+                    page = items[offset:offset + limit]
+                    fields = [field for field in query.get('fields', [''])[0].split(',') if field]
+                    if fields:
+                        page = [{field: item[field] for field in fields if field in item} for item in page]
+                    with fake.lock:
+                        fake.counters['item_pages'] += 1
+                        fake.counters['items_served'] += len(page)
+                    self.send_json(200, page, {
+                        'x-apify-pagination-total': len(items),
+                        'x-apify-pagination-offset': offset,
+                        'x-apify-pagination-limit': limit,
+                        'x-apify-pagination-desc': 'false',
+                    })
+                else:
+                    self.not_found()
+
+        return Handler
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Run a fake Apify API server')
+    parser.add_argument('--port', type=int, default=8200)
+    parser.add_argument('--run-latency', type=float, default=0.0, help='Seconds each actor run takes')
+    parser.add_argument('--cdn-url', default=DEFAULT_CDN_URL, help='Base URL of the video links in the items')
+    args = parser.parse_args()
+
+    fake = FakeApify(args.run_latency, cdn_url=args.cdn_url, port=args.port)
+    print(f"🤖 Fake Apify serving on {fake.api_url}")
+    fake.server.serve_forever()
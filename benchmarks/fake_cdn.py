@@ -0,0 +1,154 @@
+"""
+Fake CDN - local static file server for the reel videos media_archive.py downloads.
+
+Serves /{shortcode}.mp4?i={index} (the links fake_apify hands out) with
+deterministic content of a fixed size and honours single-range
+`Range: bytes=N-` requests. Every `duplicate_every`-th reel has the same
+bytes as the one before it (a repost, for deduplication), and with
+`drop_first` the first response for every video is cut off halfway so
+downloads have to resume. `latency` delays every response, like the time to
+first byte of a real CDN.
+"""
+
+import hashlib
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+CHUNK_SIZE = 64 * 1024
+
+
+class CDNServer(ThreadingHTTPServer):
+    # The default backlog of 5 makes concurrent downloaders wait for SYN retransmits
+    request_queue_size = 128
+    daemon_threads = True
+
+
+class FakeCDN:
+    """Fake video CDN running on a background thread."""
+
+    def __init__(self, video_size=1024 * 1024, duplicate_every=0, drop_first=False, latency=0.0,
+                 host='127.0.0.1', port=0):
+        self.video_size = video_size
+        self.latency = latency
+        self.duplicate_every = duplicate_every
+        self.drop_first = drop_first
+        self.lock = threading.Lock()
+        self.requested = set()
+        self.counters = {'requests': 0, 'range_requests': 0, 'bytes_served': 0, 'dropped': 0}
+        self.server = CDNServer((host, port), self._make_handler())
+        self.thread = None
+
+    @property
+    def base_url(self):
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def content_key(self, shortcode, index):
+        """Reels at multiples of duplicate_every repeat the previous reel's video."""
+        if index is None:
+            return shortcode
+        if self.duplicate_every and index and index % self.duplicate_every == 0:
+            return str(index - 1)
+        return str(index)
+
+    def video_bytes(self, key, start, end):
+        """Bytes start..end (exclusive) of the video for key, the same on every request."""
+        seed = hashlib.sha256(key.encode('utf-8')).digest()
+        block = seed * (CHUNK_SIZE // len(seed))
+        data = bytearray()
+        position = start
+        while position < end:
+            offset = position % len(block)
+            piece = block[offset:offset + (end - position)]
+            data += piece
+            position += len(piece)
+        return bytes(data)
+
+    def _make_handler(self):
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def log_message(self, format, *args):
+                pass
+
+            def do_GET(self):
+                url = urlparse(self.path)
+                match = re.fullmatch(r"/([A-Za-z0-9_-]+)\.mp4", url.path)
+                if not match:
+                    self.send_response(404)
+                    self.send_header('Content-Length', '0')
+                    self.end_headers()
+                    return
+                shortcode = match.group(1)
+                index = parse_qs(url.query).get('i', [None])[0]
+                key = fake.content_key(shortcode, int(index) if index is not None else None)
+
+                start = 0
+                range_match = re.fullmatch(r"bytes=(\d+)-", self.headers.get('Range', ''))
+                if range_match:
+                    start = int(range_match.group(1))
+                    if start >= fake.video_size:
+                        self.send_response(416)
+                        self.send_header('Content-Range', f"bytes */{fake.video_size}")
+                        self.send_header('Content-Length', '0')
+                        self.end_headers()
+                        return
+
+                if fake.latency:
+                    time.sleep(fake.latency)
+                with fake.lock:
+                    fake.counters['requests'] += 1
+                    fake.counters['range_requests'] += 1 if range_match else 0
+                    drop = fake.drop_first and shortcode not in fake.requested
+                    fake.requested.add(shortcode)
+
+                self.send_response(206 if range_match else 200)
+                self.send_header('Content-Type', 'video/mp4')
+                self.send_header('Accept-Ranges', 'bytes')
+                self.send_header('Content-Length', str(fake.video_size - start))
+                if range_match:
+                    self.send_header('Content-Range', f"bytes {start}-{fake.video_size - 1}/{fake.video_size}")
+                self.end_headers()
+
+                end = start + (fake.video_size - start) // 2 if drop else fake.video_size
+                position = start
+                while position < end:
+                    chunk = fake.video_bytes(key, position, min(end, position + CHUNK_SIZE))
+                    self.wfile.write(chunk)
+                    position += len(chunk)
+                with fake.lock:
+                    fake.counters['bytes_served'] += position - start
+                    fake.counters['dropped'] += 1 if drop else 0
+                if drop:
+                    self.close_connection = True
+
+        return Handler
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Run a fake video CDN')
+    parser.add_argument('--port', type=int, default=8300)
+    parser.add_argument('--video-size', type=int, default=1024 * 1024, help='Bytes per video')
+    parser.add_argument('--latency', type=float, default=0.0, help='Seconds before every response')
+    parser.add_argument('--drop-first', action='store_true', help='Cut the first response for every video off halfway')
+    args = parser.parse_args()
+
+    fake = FakeCDN(args.video_size, drop_first=args.drop_first, latency=args.latency, port=args.port)
+    print(f"🎞️ Fake CDN serving on {fake.base_url}")
+    fake.server.serve_forever()
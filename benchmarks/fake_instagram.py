@@ -0,0 +1,234 @@
+"""
+Fake Instagram - local stand-in for the pages part_1_scrape_urls.py drives.
+
+Serves a homepage with the logged-in search icon, the login and 2FA forms that
+login_with_2fa fills in, and an infinite-scroll Reels grid fed from a
+clips JSON endpoint, with configurable reel count, latency and page weight.
+"""
+
+import hashlib
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+SESSION_COOKIE = 'sessionid=bench-session'
+VERIFICATION_CODE = '123456'
+
+SEARCH_ICON = '<svg aria-label="Search" width="24" height="24" viewBox="0 0 24 24"><circle cx="10" cy="10" r="7"/></svg>'
+
+HOME_PAGE = """<!DOCTYPE html>
+<html><head><title>Instagram</title></head>
+<body><nav>{nav}</nav><section><main><div>Home</div></main></section></body></html>"""
+
+LOGIN_PAGE = """<!DOCTYPE html>
+<html><head><title>Login</title></head>
+<body><form method="post" action="/accounts/login/">
+<input name="username" type="text"><input name="password" type="password">
+<button type="submit">Log in</button>
+</form></body></html>"""
+
+TWO_FACTOR_PAGE = """<!DOCTYPE html>
+<html><head><title>Two-factor authentication</title></head>
+<body><form method="post" action="/accounts/login/two_factor/">
+<input name="verificationCode" type="text">
+<button type="submit">Confirm</button>
+</form></body></html>"""
+
+REELS_PAGE = """<!DOCTYPE html>
+<html><head><title>{username} Reels</title>
+<style>#grid a {{ display: block; width: 300px; height: 400px; }}</style></head>
+<body><nav>{nav}</nav><section><main><div id="grid"></div></main></section>
+<script>
+const username = {username_json};
+const grid = document.getElementById('grid');
+let page = 0, loading = false, more = true;
+
+async function loadPage() {{
+  if (loading || !more) return;
+  loading = true;
+  const response = await fetch(`/api/v1/clips/user/?username=${{username}}&page=${{page}}`);
+  const data = await response.json();
+  page += 1;
+  more = data.more_available;
+  for (const item of data.items) {{
+    const a = document.createElement('a');
+    a.href = `/${{username}}/reel/${{item.media.code}}/`;
+    a.innerHTML = `<img src="/static/thumb/${{item.media.code}}.jpg" width="300" height="400">`;
+    grid.appendChild(a);
+  }}
+  loading = false;
+}}
+
+function maybeLoad() {{
+  if (window.innerHeight + window.scrollY >= document.body.offsetHeight - 2000) loadPage();
+}}
+window.addEventListener('scroll', maybeLoad);
+window.addEventListener('wheel', maybeLoad);
+loadPage();
+</script></body></html>"""
+
+
+def make_shortcode(username, index):
+    """Stable, Instagram-looking shortcode for the index-th reel of a user."""
+    digest = hashlib.sha1(f"{username}:{index}".encode()).hexdigest()
+    return 'B' + digest[:10]
+
+
+class FakeInstagram:
+    """Fake Instagram server running on a background thread."""
+
+    def __init__(self, reel_count=10, page_size=12, latency=0.0, page_weight=20_000,
+                 two_factor=False, host='127.0.0.1', port=0):
+        self.reel_count = reel_count
+        self.page_size = page_size
+        self.latency = latency
+        self.page_weight = page_weight
+        self.two_factor = two_factor
+        self.counters = {'requests': 0, 'grid_pages': 0, 'bytes_sent': 0, 'logins': 0}
+        self.counters_lock = threading.Lock()
+        self.server = ThreadingHTTPServer((host, port), self._make_handler())
+        self.server.daemon_threads = True
+        self.thread = None
+
+    @property
+    def base_url(self):
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def count(self, key, amount=1):
+        with self.counters_lock:
+            self.counters[key] += amount
+
+    def clips_page(self, username, page):
+        """JSON page of the Reels grid, newest reel first."""
+        start = page * self.page_size
+        end = min(start + self.page_size, self.reel_count)
+        now = int(time.time())
+        items = []
+        for index in range(start, end):
+            items.append({'media': {
+                'code': make_shortcode(username, index),
+                'taken_at': now - index * 3600,
+                'like_count': 1000 - index % 1000,
+                'comment_count': index % 50,
+                'play_count': 10_000 + index,
+                'product_type': 'clips',
+            }})
+        return {'items': items, 'more_available': end < self.reel_count}
+
+    def _make_handler(self):
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, format, *args):
+                pass
+
+            def send_body(self, status, body, content_type='text/html; charset=utf-8', headers=None):
+                if isinstance(body, str):
+                    body = body.encode('utf-8')
+                self.send_response(status)
+                self.send_header('Content-Type', content_type)
+                self.send_header('Content-Length', str(len(body)))
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(body)
+                fake.count('bytes_sent', len(body))
+
+            def redirect(self, location, headers=None):
+                self.send_response(302)
+                self.send_header('Location', location)
+                self.send_header('Content-Length', '0')
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.end_headers()
+
+            def logged_in(self):
+                return SESSION_COOKIE in self.headers.get('Cookie', '')
+
+            def nav(self):
+                return SEARCH_ICON if self.logged_in() else ''
+
+            def do_GET(self):
+                fake.count('requests')
+                if fake.latency:
+                    time.sleep(fake.latency)
+
+                url = urlparse(self.path)
+                parts = [part for part in url.path.split('/') if part]
+
+                if url.path == '/':
+                    self.send_body(200, HOME_PAGE.format(nav=self.nav()))
+                elif url.path == '/accounts/login/':
+                    self.send_body(200, LOGIN_PAGE)
+                elif url.path == '/accounts/edit/':
+                    # Session probe: logged-out visitors are sent to the login page
+                    if self.logged_in():
+                        self.send_body(200, HOME_PAGE.format(nav=self.nav()))
+                    else:
+                        self.redirect('/accounts/login/')
+                elif url.path == '/api/v1/clips/user/':
+                    query = parse_qs(url.query)
+                    username = query.get('username', [''])[0]
+                    page = int(query.get('page', ['0'])[0])
+                    fake.count('grid_pages')
+                    self.send_body(200, json.dumps(fake.clips_page(username, page)), 'application/json')
+                elif url.path.startswith('/static/thumb/'):
+                    self.send_body(200, b'\0' * fake.page_weight, 'image/jpeg')
+                elif len(parts) == 2 and parts[1] == 'reels':
+                    username = parts[0]
+                    self.send_body(200, REELS_PAGE.format(
+                        username=username, username_json=json.dumps(username), nav=self.nav()
+                    ))
+                else:
+                    self.send_body(404, 'Not found', 'text/plain')
+
+            def do_POST(self):
+                fake.count('requests')
+                length = int(self.headers.get('Content-Length', 0))
+                form = parse_qs(self.rfile.read(length).decode())
+                session_headers = {'Set-Cookie': f"{SESSION_COOKIE}; Path=/; Max-Age=31536000"}
+
+                if self.path == '/accounts/login/':
+                    fake.count('logins')
+                    if fake.two_factor:
+                        self.send_body(200, TWO_FACTOR_PAGE)
+                    else:
+                        self.redirect('/', session_headers)
+                elif self.path == '/accounts/login/two_factor/':
+                    if form.get('verificationCode', [''])[0] == VERIFICATION_CODE:
+                        self.redirect('/', session_headers)
+                    else:
+                        self.send_body(200, TWO_FACTOR_PAGE)
+                else:
+                    self.send_body(404, 'Not found', 'text/plain')
+
+        return Handler
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Run a fake Instagram server')
+    parser.add_argument('--port', type=int, default=8100)
+    parser.add_argument('--reels', type=int, default=100, help='Reels per creator')
+    parser.add_argument('--latency', type=float, default=0.0, help='Seconds added to every request')
+    parser.add_argument('--page-weight', type=int, default=20_000, help='Bytes per thumbnail')
+    parser.add_argument('--two-factor', action='store_true', help=f"Ask for a 2FA code ({VERIFICATION_CODE})")
+    args = parser.parse_args()
+
+    fake = FakeInstagram(args.reels, latency=args.latency, page_weight=args.page_weight,
+                         two_factor=args.two_factor, port=args.port)
+    print(f"📸 Fake Instagram serving on {fake.base_url}")
+    fake.server.serve_forever()
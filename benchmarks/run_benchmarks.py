@@ -0,0 +1,419 @@
+#!/usr/bin/env python3
+"""
+Offline benchmarks - runs part_1, part_2, main.py, the sharded runner and the media archive against
+the fake Instagram, Apify and CDN servers and records wall time, peak memory and throughput.
+
+Every run happens in a throwaway working directory, so the real reel_urls/,
+data/ and instagram_session.json are never touched. Results are printed and
+saved to benchmarks/results/ tagged with the git commit they were measured on.
+"""
+
+import argparse
+import csv
+import json
+import os
+import re
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+from fake_apify import FakeApify
+from fake_cdn import FakeCDN
+from fake_instagram import VERIFICATION_CODE, FakeInstagram, make_shortcode
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(BENCH_DIR)
+RESULTS_DIR = os.path.join(BENCH_DIR, 'results')
+
+DEFAULT_REEL_COUNTS = [10, 1000, 10000]
+DEFAULT_STAGES = ['part1', 'part2', 'main']
+ALL_STAGES = DEFAULT_STAGES + ['sharded', 'memory', 'media']
+BENCH_USER = 'benchuser'
+PAGE_SIZE = 12
+# Sharded stage: creators split across this many fake accounts
+SHARDED_CREATORS = 25
+SHARDED_ACCOUNTS = 3
+# Memory stage: part_2's peak RSS for a small creator and a very large one
+MEMORY_REEL_COUNTS = (1000, 50000)
+# Media stage: size of every fake video, concurrent downloads, and every how many reels one is a repost
+MEDIA_VIDEO_SIZE = 1024 * 1024
+MEDIA_CONCURRENCY = 8
+MEDIA_DUPLICATE_EVERY = 10
+
+
+def git_sha():
+    """Commit the benchmarks ran against, with a marker for uncommitted changes."""
+    try:
+        sha = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=REPO_DIR,
+                             capture_output=True, text=True, check=True).stdout.strip()
+        dirty = subprocess.run(['git', 'status', '--porcelain', '--untracked-files=no'], cwd=REPO_DIR,
+                               capture_output=True, text=True).stdout.strip()
+        return f"{sha}-dirty" if dirty else sha
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+
+
+def run_script(args, workdir, env, stdin_text=''):
+    """Run a repo script in workdir and return (exit code, output, wall seconds, peak RSS in MB).
+
+    Peak RSS is the largest resident set of the script or of any child it
+    reaped itself (Linux wait4 semantics).
+    """
+    start = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, *args],
+        cwd=workdir,
+        env=env,
+        stdin=subprocess.PIPE,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.STDOUT,
+        text=True
+    )
+    if stdin_text:
+        process.stdin.write(stdin_text)
+    process.stdin.close()
+    output = process.stdout.read()
+    process.stdout.close()
+    # Reap the child ourselves to get its own rusage rather than the running total
+    _, status, rusage = os.wait4(process.pid, 0)
+    process.returncode = os.waitstatus_to_exitcode(status)
+    wall = time.perf_counter() - start
+    # Linux reports ru_maxrss in KB, macOS in bytes
+    peak_rss_mb = round(rusage.ru_maxrss / (1024 * 1024 if sys.platform == 'darwin' else 1024), 1)
+    return process.returncode, output, wall, peak_rss_mb
+
+
+def bench_env(instagram, apify):
+    env = dict(os.environ)
+    env['INSTAGRAM_BASE_URL'] = instagram.base_url
+    env['APIFY_API_URL'] = apify.api_url
+    env['PYTHONUNBUFFERED'] = '1'
+    return env
+
+
+def seed_follower_cache(workdir):
+    """Pre-fill the follower cache so part_2 never calls Instagram through Instaloader."""
+    os.makedirs(os.path.join(workdir, 'data'), exist_ok=True)
+    cache = {BENCH_USER: {'followers': 12345, 'fetched_at': datetime.now(timezone.utc).isoformat()}}
+    with open(os.path.join(workdir, 'data', 'follower_cache.json'), 'w', encoding='utf-8') as f:
+        json.dump(cache, f)
+
+
+def seed_reel_urls(workdir, base_url, reel_count):
+    """Write the reel URL list part_1 would have produced."""
+    os.makedirs(os.path.join(workdir, 'reel_urls'), exist_ok=True)
+    with open(os.path.join(workdir, 'reel_urls', f"{BENCH_USER}_reels.txt"), 'w', encoding='utf-8') as f:
+        for index in range(reel_count):
+            f.write(f"{base_url}/reel/{make_shortcode(BENCH_USER, index)}/\n")
+
+
+def report_failure(name, code, output):
+    print(f"❌ {name} exited with code {code}, last output:")
+    for line in output.splitlines()[-15:]:
+        print(f"   {line}")
+
+
+def bench_part1(reel_count, page_size, latency, two_factor):
+    """Scrape the fake Reels grid and measure URLs per second and scroll iterations."""
+    instagram = FakeInstagram(reel_count, page_size=page_size, latency=latency, two_factor=two_factor).start()
+    apify = FakeApify().start()
+    try:
+        with tempfile.TemporaryDirectory(prefix='reels-bench-') as workdir:
+            max_scrolls = reel_count // page_size * 2 + 20
+            code, output, wall, rss = run_script(
+                [os.path.join(REPO_DIR, 'part_1_scrape_urls.py'), '--users', BENCH_USER,
+                 '--max-scroll-attempts', str(max_scrolls)],
+                workdir, bench_env(instagram, apify),
+                stdin_text=f"{VERIFICATION_CODE}\n" if two_factor else ''
+            )
+    finally:
+        instagram.stop()
+        apify.stop()
+
+    if code != 0:
+        report_failure('part_1', code, output)
+        return None
+
+    match = re.search(r"Total Reels found: (\d+) \(after (\d+) scroll attempts\)", output)
+    urls = int(match.group(1)) if match else 0
+    scrolls = int(match.group(2)) if match else None
+    return {
+        'wall_seconds': round(wall, 2),
+        'peak_rss_mb': rss,
+        'urls': urls,
+        'urls_per_second': round(urls / wall, 2) if wall else None,
+        'scroll_iterations': scrolls,
+        'grid_pages': instagram.counters['grid_pages'],
+        'requests': instagram.counters['requests'],
+        'mb_served': round(instagram.counters['bytes_sent'] / 1_000_000, 2),
+    }
+
+
+def bench_part2(reel_count, run_latency, part2_args):
+    """Fetch metrics for a seeded URL list and measure rows per second."""
+    instagram = FakeInstagram(reel_count).start()
+    apify = FakeApify(run_latency).start()
+    try:
+        with tempfile.TemporaryDirectory(prefix='reels-bench-') as workdir:
+            seed_follower_cache(workdir)
+            seed_reel_urls(workdir, instagram.base_url, reel_count)
+            code, output, wall, rss = run_script(
+                [os.path.join(REPO_DIR, 'part_2_get_metrics.py'), '--users', BENCH_USER, *part2_args],
+                workdir, bench_env(instagram, apify)
+            )
+            rows = 0
+            metrics_file = os.path.join(workdir, 'data', f"{BENCH_USER}_reels_metrics.csv")
+            if os.path.exists(metrics_file):
+                with open(metrics_file, newline='', encoding='utf-8') as f:
+                    rows = sum(1 for _ in csv.DictReader(f))
+    finally:
+        instagram.stop()
+        apify.stop()
+
+    if code != 0:
+        report_failure('part_2', code, output)
+        return None
+
+    return {
+        'wall_seconds': round(wall, 2),
+        'peak_rss_mb': rss,
+        'rows': rows,
+        'rows_per_second': round(rows / wall, 2) if wall else None,
+        'apify_runs': apify.counters['runs'],
+        'dataset_pages': apify.counters['item_pages'],
+    }
+
+
+def bench_main(reel_count, page_size, run_latency, main_args):
+    """Run main.py end to end against both fakes."""
+    instagram = FakeInstagram(reel_count, page_size=page_size).start()
+    apify = FakeApify(run_latency).start()
+    try:
+        with tempfile.TemporaryDirectory(prefix='reels-bench-') as workdir:
+            seed_follower_cache(workdir)
+            code, output, wall, rss = run_script(
+                [os.path.join(REPO_DIR, 'main.py'), '--users', BENCH_USER, *main_args],
+                workdir, bench_env(instagram, apify)
+            )
+    finally:
+        instagram.stop()
+        apify.stop()
+
+    if code != 0:
+        report_failure('main.py', code, output)
+        return None
+
+    return {
+        'wall_seconds': round(wall, 2),
+        'peak_rss_mb': rss,
+        'reels_per_second': round(reel_count / wall, 2) if wall else None,
+    }
+
+
+def bench_sharded(reel_count, page_size, creators, accounts):
+    """Scrape reel_count Reels spread over many creators with sharded_runner.py and a pool of fake accounts."""
+    reels_per_creator = max(1, reel_count // creators)
+    instagram = FakeInstagram(reels_per_creator, page_size=page_size).start()
+    apify = FakeApify().start()
+    try:
+        with tempfile.TemporaryDirectory(prefix='reels-bench-') as workdir:
+            pool = [{'username': f"bench_account_{index}", 'password': 'bench'} for index in range(1, accounts + 1)]
+            with open(os.path.join(workdir, 'accounts.json'), 'w', encoding='utf-8') as f:
+                json.dump(pool, f)
+            usernames = [f"bench_creator_{index}" for index in range(1, creators + 1)]
+            max_scrolls = reels_per_creator // page_size * 2 + 20
+            code, output, wall, rss = run_script(
+                [os.path.join(REPO_DIR, 'sharded_runner.py'), '--urls-only', '--users', *usernames,
+                 '--part1-args', f"--max-scroll-attempts {max_scrolls}"],
+                workdir, bench_env(instagram, apify)
+            )
+            urls = 0
+            for username in usernames:
+                url_file = os.path.join(workdir, 'reel_urls', f"{username}_reels.txt")
+                if os.path.exists(url_file):
+                    with open(url_file, 'r', encoding='utf-8') as f:
+                        urls += sum(1 for line in f if line.strip())
+    finally:
+        instagram.stop()
+        apify.stop()
+
+    if code != 0:
+        report_failure('sharded_runner', code, output)
+        return None
+
+    return {
+        'wall_seconds': round(wall, 2),
+        'peak_rss_mb': rss,
+        'creators': creators,
+        'accounts': accounts,
+        'urls': urls,
+        'urls_per_second': round(urls / wall, 2) if wall else None,
+        'logins': instagram.counters['logins'],
+    }
+
+
+def bench_memory(run_latency, part2_args):
+    """Compare part_2's peak memory on MEMORY_REEL_COUNTS; streaming keeps the two close."""
+    small_reels, large_reels = MEMORY_REEL_COUNTS
+    small = bench_part2(small_reels, run_latency, part2_args)
+    large = bench_part2(large_reels, run_latency, part2_args)
+    if small is None or large is None:
+        return None
+    return {
+        'small_reels': small_reels,
+        'small_peak_rss_mb': small['peak_rss_mb'],
+        'large_reels': large_reels,
+        'large_peak_rss_mb': large['peak_rss_mb'],
+        'rss_growth_mb': round(large['peak_rss_mb'] - small['peak_rss_mb'], 1),
+        'large_wall_seconds': large['wall_seconds'],
+        'large_rows': large['rows'],
+    }
+
+
+def bench_media(reel_count, concurrency, video_size, latency):
+    """Archive the videos of a scraped creator, then run the archive again to measure skip-if-present.
+
+    The fake CDN cuts every first response off halfway, so each video is resumed with a Range request.
+    """
+    instagram = FakeInstagram(reel_count).start()
+    cdn = FakeCDN(video_size, duplicate_every=MEDIA_DUPLICATE_EVERY, drop_first=True, latency=latency).start()
+    apify = FakeApify(cdn_url=cdn.base_url).start()
+    try:
+        with tempfile.TemporaryDirectory(prefix='reels-bench-') as workdir:
+            env = bench_env(instagram, apify)
+            seed_follower_cache(workdir)
+            seed_reel_urls(workdir, instagram.base_url, reel_count)
+            code, output, _, _ = run_script(
+                [os.path.join(REPO_DIR, 'part_2_get_metrics.py'), '--users', BENCH_USER], workdir, env
+            )
+            if code != 0:
+                report_failure('part_2', code, output)
+                return None
+
+            archive = [os.path.join(REPO_DIR, 'media_archive.py'), '--users', BENCH_USER, '--concurrency', str(concurrency)]
+            code, output, wall, rss = run_script(archive, workdir, env)
+            if code != 0:
+                report_failure('media_archive', code, output)
+                return None
+            reels = len(os.listdir(os.path.join(workdir, 'media', 'reels')))
+            objects = sum(len(files) for _, _, files in os.walk(os.path.join(workdir, 'media', 'objects')))
+            served = cdn.counters['bytes_served']
+
+            code, output, rerun_wall, _ = run_script(archive, workdir, env)
+            if code != 0:
+                report_failure('media_archive (rerun)', code, output)
+                return None
+    finally:
+        instagram.stop()
+        apify.stop()
+        cdn.stop()
+
+    return {
+        'wall_seconds': round(wall, 2),
+        'peak_rss_mb': rss,
+        'reels_archived': reels,
+        'unique_videos': objects,
+        'megabytes': round(served / (1024 * 1024), 1),
+        'mb_per_second': round(served / (1024 * 1024) / wall, 1) if wall else None,
+        'resumed': cdn.counters['range_requests'],
+        'rerun_seconds': round(rerun_wall, 2),
+        'rerun_requests': cdn.counters['requests'] - reel_count - cdn.counters['range_requests'],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Run the offline scraper benchmarks')
+    parser.add_argument('--reels', type=int, nargs='+', default=DEFAULT_REEL_COUNTS,
+                        help='Reel counts per creator to benchmark (default: 10 1000 10000)')
+    parser.add_argument('--stages', nargs='+', choices=ALL_STAGES, default=DEFAULT_STAGES,
+                        help='Which benchmarks to run (default: part1 part2 main; memory ignores --reels)')
+    parser.add_argument('--page-size', type=int, default=PAGE_SIZE, help='Reels per grid page on the fake Instagram')
+    parser.add_argument('--latency', type=float, default=0.0,
+                        help='Seconds added to every fake Instagram (and, in the media stage, CDN) request')
+    parser.add_argument('--run-latency', type=float, default=0.0, help='Seconds every fake Apify run takes')
+    parser.add_argument('--two-factor', action='store_true', help='Make the fake Instagram ask for a 2FA code')
+    parser.add_argument('--part2-args', default='', help='Extra flags for part_2, e.g. "--batch-size 5"')
+    parser.add_argument('--main-args', default='', help='Extra flags for main.py, e.g. "--pipeline"')
+    parser.add_argument('--creators', type=int, default=SHARDED_CREATORS,
+                        help='Creators the sharded stage spreads the Reels over')
+    parser.add_argument('--accounts', type=int, default=SHARDED_ACCOUNTS,
+                        help='Fake accounts the sharded stage shards across')
+    parser.add_argument('--media-concurrency', type=int, default=MEDIA_CONCURRENCY,
+                        help='Concurrent downloads in the media stage')
+    parser.add_argument('--video-size', type=int, default=MEDIA_VIDEO_SIZE,
+                        help='Bytes per fake video in the media stage')
+    parser.add_argument('--no-save', action='store_true', help='Print results without writing them to benchmarks/results/')
+    args = parser.parse_args()
+
+    sha = git_sha()
+    started_at = datetime.now(timezone.utc)
+    results = {
+        'git_sha': sha,
+        'started_at': started_at.isoformat(timespec='seconds'),
+        'python': sys.version.split()[0],
+        'settings': {key: value for key, value in vars(args).items() if key != 'no_save'},
+        'runs': [],
+    }
+
+    per_count_stages = [stage for stage in args.stages if stage != 'memory']
+    for reel_count in args.reels if per_count_stages else []:
+        run = {'reels': reel_count}
+        if 'part1' in args.stages:
+            print(f"⏱️ part_1 with {reel_count} Reels...")
+            run['part1'] = bench_part1(reel_count, args.page_size, args.latency, args.two_factor)
+        if 'part2' in args.stages:
+            print(f"⏱️ part_2 with {reel_count} Reels...")
+            run['part2'] = bench_part2(reel_count, args.run_latency, args.part2_args.split())
+        if 'main' in args.stages:
+            print(f"⏱️ main.py with {reel_count} Reels...")
+            run['main'] = bench_main(reel_count, args.page_size, args.run_latency, args.main_args.split())
+        if 'sharded' in args.stages:
+            print(f"⏱️ sharded_runner with {reel_count} Reels over {args.creators} creators...")
+            run['sharded'] = bench_sharded(reel_count, args.page_size, args.creators, args.accounts)
+        if 'media' in args.stages:
+            print(f"⏱️ media_archive with {reel_count} Reels, {args.media_concurrency} connection(s)...")
+            run['media'] = bench_media(reel_count, args.media_concurrency, args.video_size, args.latency)
+        results['runs'].append(run)
+
+    if 'memory' in args.stages:
+        print(f"⏱️ part_2 peak memory at {' and '.join(str(count) for count in MEMORY_REEL_COUNTS)} Reels...")
+        results['memory'] = bench_memory(args.run_latency, args.part2_args.split())
+
+    print(f"\n{'='*70}")
+    print(f"📊 BENCHMARK RESULTS ({sha})")
+    print(f"{'='*70}")
+    for run in results['runs']:
+        print(f"\n🎬 {run['reels']} Reels")
+        for stage in ALL_STAGES:
+            if stage not in run:
+                continue
+            stats = run[stage]
+            if stats is None:
+                print(f"   {stage}: failed")
+            else:
+                print(f"   {stage}: " + ', '.join(f"{key}={value}" for key, value in stats.items()))
+    if 'memory' in results:
+        stats = results['memory']
+        print("\n🧠 Memory")
+        if stats is None:
+            print("   memory: failed")
+        else:
+            print("   memory: " + ', '.join(f"{key}={value}" for key, value in stats.items()))
+
+    if not args.no_save:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        results_file = os.path.join(RESULTS_DIR, f"{started_at.strftime('%Y%m%d-%H%M%S')}-{sha}.json")
+        with open(results_file, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+        print(f"\n💾 Results saved to {results_file}")
+
+    if any(run.get(stage) is None for run in results['runs'] for stage in per_count_stages):
+        sys.exit(1)
+    if 'memory' in results and results['memory'] is None:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,274 @@
+#!/usr/bin/env python3
+"""
+Browser worker - keeps a logged-in Chromium session warm and runs part_1 scrape
+jobs sent to it over a local socket.
+
+Launching Chromium, rebuilding the context from instagram_session.json and the
+homepage login check cost more than scraping a small profile, so the worker
+does them once and reuses the browser for every job. The session is checked
+again when it has not been for SESSION_RECHECK_SECONDS.
+
+Protocol: one JSON object per line. A client sends a job such as
+    {"usernames": ["user1", "user2"], "incremental": false}
+(usernames defaults to part_1's TARGET_USERS; see JOB_SETTINGS for the other options)
+and gets the job's output back as {"type": "log", "line": "..."} lines, then
+{"type": "result", "ok": true, "results": {"user1": 12, "user2": null}}
+(reels saved per user, null for failed users). {"command": "ping"} and
+{"command": "shutdown"} are answered with a single result. Jobs run one at a
+time; a client that connects while a job is running waits for its turn.
+
+The worker stays logged in as the account it was started with. A job may name
+the account it expects in "account"; when that is another account the job is
+refused with {"type": "result", "ok": false, "wrong_account": true, ...} so the
+caller can run part_1 itself with its own credentials.
+"""
+
+import argparse
+import asyncio
+import contextlib
+import json
+import os
+import socket
+import sys
+import time
+
+WORKER_HOST = '127.0.0.1'
+WORKER_PORT = int(os.environ.get('SCRAPER_WORKER_PORT', 8765))
+
+# Re-check the Instagram session before a job if the last check is older than this
+SESSION_RECHECK_SECONDS = 30 * 60
+
+# Job options that map onto part_1 settings
+JOB_SETTINGS = {
+    'incremental': 'INCREMENTAL',
+    'known_stop': 'KNOWN_REELS_STOP_THRESHOLD',
+    'concurrency': 'CONCURRENCY',
+    'max_scroll_attempts': 'MAX_SCROLL_ATTEMPTS',
+    'resume': 'RESUME',
+}
+
+
+class LineForwarder:
+    """File-like object that sends every printed line to the job's client as well as the worker's log."""
+
+    def __init__(self, send_line, echo):
+        self.send_line = send_line
+        self.echo = echo
+        self.buffer = ''
+
+    def write(self, text):
+        self.echo.write(text)
+        self.buffer += text
+        while '\n' in self.buffer:
+            line, self.buffer = self.buffer.split('\n', 1)
+            self.send_line(line)
+        return len(text)
+
+    def flush(self):
+        self.echo.flush()
+
+
+class BrowserWorker:
+    """A warm Playwright browser serving scrape jobs one at a time."""
+
+    def __init__(self, playwright):
+        self.playwright = playwright
+        self.browser = None
+        self.context = None
+        self.page = None
+        self.network_stats = None
+        self.last_session_check = 0.0
+        self.job_lock = asyncio.Lock()
+        self.stopped = asyncio.Event()
+
+    async def start(self):
+        """Launch the browser and log in; returns False if the login fails."""
+        import part_1_scrape_urls as part_1
+
+        self.browser, self.context, self.network_stats = await part_1.launch_browser(self.playwright)
+        self.page = await self.context.new_page()
+        if not await part_1.ensure_logged_in(self.context, self.page):
+            return False
+        self.last_session_check = time.monotonic()
+        return True
+
+    async def ensure_ready(self):
+        """Relaunch a crashed browser and re-check a session that has not been checked lately."""
+        import part_1_scrape_urls as part_1
+
+        if self.browser is None or not self.browser.is_connected():
+            print("🔄 Browser is gone, launching a new one...")
+            return await self.start()
+        if time.monotonic() - self.last_session_check > SESSION_RECHECK_SECONDS:
+            if not await part_1.ensure_logged_in(self.context, self.page):
+                return False
+            self.last_session_check = time.monotonic()
+        return True
+
+    async def run_job(self, job):
+        """Scrape the users of one job with the warm browser and return its result message."""
+        import part_1_scrape_urls as part_1
+
+        account = job.get('account')
+        if account and account != part_1.INSTAGRAM_USERNAME:
+            print(f"⚠️ Job is for {account}, but this worker is logged in as {part_1.INSTAGRAM_USERNAME}")
+            return {'type': 'result', 'ok': False, 'wrong_account': True,
+                    'error': f"worker is logged in as {part_1.INSTAGRAM_USERNAME}"}
+
+        usernames = job.get('usernames') or part_1.TARGET_USERS
+        if not part_1.check_target_users(usernames):
+            return {'type': 'result', 'ok': False, 'error': 'invalid user list'}
+
+        print(f"🎯 Will scrape {len(usernames)} user(s): {', '.join(usernames)}\n")
+        if not await self.ensure_ready():
+            return {'type': 'result', 'ok': False, 'error': 'Instagram login failed'}
+
+        # Apply the job's settings for this job only
+        saved_settings = {name: getattr(part_1, name) for name in JOB_SETTINGS.values()}
+        for option, name in JOB_SETTINGS.items():
+            if job.get(option) is not None:
+                setattr(part_1, name, job[option])
+        self.network_stats.reset()
+        try:
+            results = await part_1.scrape_usernames(self.context, self.page, usernames, self.network_stats)
+        finally:
+            for name, value in saved_settings.items():
+                setattr(part_1, name, value)
+
+        return {
+            'type': 'result',
+            'ok': True,
+            'results': {username: (len(urls) if urls is not None else None) for username, urls in results.items()}
+        }
+
+    async def handle_client(self, reader, writer):
+        """Serve the requests of one client connection."""
+        def send(message):
+            writer.write((json.dumps(message) + '\n').encode('utf-8'))
+
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                try:
+                    request = json.loads(line)
+                except ValueError:
+                    send({'type': 'result', 'ok': False, 'error': 'invalid JSON'})
+                    await writer.drain()
+                    continue
+
+                command = request.get('command', 'scrape')
+                if command == 'ping':
+                    send({'type': 'result', 'ok': True, 'busy': self.job_lock.locked()})
+                elif command == 'shutdown':
+                    send({'type': 'result', 'ok': True})
+                    self.stopped.set()
+                elif command == 'scrape':
+                    async with self.job_lock:
+                        forwarder = LineForwarder(lambda text: send({'type': 'log', 'line': text}), sys.__stdout__)
+                        with contextlib.redirect_stdout(forwarder):
+                            try:
+                                result = await self.run_job(request)
+                            except Exception as e:
+                                print(f"❌ Job failed: {e}")
+                                result = {'type': 'result', 'ok': False, 'error': str(e)}
+                        send(result)
+                else:
+                    send({'type': 'result', 'ok': False, 'error': f"unknown command: {command}"})
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def close(self):
+        if self.browser is not None:
+            await self.browser.close()
+
+
+async def serve(host=WORKER_HOST, port=WORKER_PORT):
+    """Run the worker until it is sent a shutdown command."""
+    from playwright.async_api import async_playwright
+
+    async with async_playwright() as p:
+        worker = BrowserWorker(p)
+        if not await worker.start():
+            await worker.close()
+            return False
+
+        server = await asyncio.start_server(worker.handle_client, host, port)
+        print(f"🔥 Browser worker ready on {host}:{port}")
+        async with server:
+            await worker.stopped.wait()
+        print("👋 Browser worker shutting down")
+        await worker.close()
+        return True
+
+
+def send_request(request, host=WORKER_HOST, port=WORKER_PORT, on_line=print):
+    """Send one request to a running worker and return its result message.
+
+    Log lines of the job are passed to on_line as they arrive. Returns None if
+    no worker is listening or it answers with something that is not JSON.
+    """
+    try:
+        connection = socket.create_connection((host, port), timeout=2)
+    except OSError:
+        return None
+
+    with connection:
+        # Jobs take as long as the profiles do, only the connect is time-limited
+        connection.settimeout(None)
+        connection.sendall((json.dumps(request) + '\n').encode('utf-8'))
+        with connection.makefile('r', encoding='utf-8') as responses:
+            for line in responses:
+                try:
+                    message = json.loads(line)
+                except ValueError:
+                    print(f"⚠️ Unreadable message from the browser worker: {line.strip()[:200]}")
+                    return None
+                if message.get('type') == 'log':
+                    on_line(message['line'])
+                else:
+                    return message
+    return {'type': 'result', 'ok': False, 'error': 'worker closed the connection'}
+
+
+def submit_job(usernames, host=WORKER_HOST, port=WORKER_PORT, on_line=print, **options):
+    """Scrape usernames on a running worker. Returns its result, or None if no worker is listening."""
+    return send_request({'usernames': usernames, **options}, host, port, on_line)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Keep a logged-in browser warm and serve scrape jobs')
+    parser.add_argument('action', nargs='?', choices=['serve', 'submit', 'ping', 'shutdown'], default='serve',
+                        help='Run the worker (default), send it a job, check it is up, or stop it')
+    parser.add_argument('--users', nargs='+', help='Usernames to scrape (submit)')
+    parser.add_argument('--incremental', action='store_true',
+                        help='Stop scrolling at already-saved reels (submit)')
+    parser.add_argument('--known-stop', type=int,
+                        help='With --incremental, already-saved reels in a row that end the scroll (submit)')
+    parser.add_argument('--resume', action='store_true',
+                        help='Skip users whose URLs the interrupted run already saved (submit)')
+    parser.add_argument('--host', default=WORKER_HOST)
+    parser.add_argument('--port', type=int, default=WORKER_PORT)
+    args = parser.parse_args()
+
+    if args.action == 'serve':
+        sys.exit(0 if asyncio.run(serve(args.host, args.port)) else 1)
+
+    if args.action == 'submit':
+        result = submit_job(args.users or [], args.host, args.port, incremental=args.incremental or None,
+                            known_stop=args.known_stop, resume=args.resume or None)
+    else:
+        result = send_request({'command': args.action}, args.host, args.port)
+
+    if result is None:
+        print(f"❌ No browser worker listening on {args.host}:{args.port}")
+        sys.exit(2)
+    if args.action == 'ping':
+        print(f"✅ Browser worker is up{' (busy)' if result.get('busy') else ''}")
+    if not result.get('ok'):
+        print(f"❌ {result.get('error', 'Job failed')}")
+        sys.exit(1)
@@ -1,12 +1,25 @@
 #!/usr/bin/env python3
 """
 Instagram Reel Scraper - Main Entry Point
-Runs both part 1 (URL scraping) and part 2 (metrics scraping) in sequence.
+Runs both part 1 (URL scraping) and part 2 (metrics scraping) in sequence,
+or as one streaming in-process pipeline with --pipeline.
 """
 
+import os
 import subprocess
 import sys
 import argparse
+import asyncio
+from datetime import datetime
+
+import browser_worker
+import run_timing
+
+# Run the scripts from next to this file, whatever the working directory is
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Where --profile keeps the timing events of both steps
+TIMING_DIR = "data/timing"
 
 def run_command(command, description):
     """Run a shell command and stream output."""
@@ -39,6 +52,128 @@ def run_command(command, description):
         print(f"\n❌ Error running {description}: {e}")
         return False
 
+async def run_pipeline(usernames=None, resume=False, known_stop=None):
+    """Scrape URLs and fetch metrics in one process.
+
+    part_1 hands each creator's URLs to a queue as soon as they are saved, and a
+    consumer fetches that creator's metrics while the browser moves on.
+    """
+    import part_1_scrape_urls as part_1
+    import part_2_get_metrics as part_2
+
+    if usernames:
+        part_1.TARGET_USERS = usernames
+    part_1.RESUME = part_2.RESUME = resume
+    if known_stop:
+        part_1.INCREMENTAL = True
+        part_1.KNOWN_REELS_STOP_THRESHOLD = known_stop
+
+    queue = asyncio.Queue()
+    results = []
+
+    async def on_user_scraped(username, urls):
+        await queue.put((username, urls))
+
+    async def fetch_metrics():
+        while True:
+            item = await queue.get()
+            if item is None:
+                return
+            username, urls = item
+            result = part_2.load_finished_metrics(username)
+            if result:
+                results.append(result)
+                continue
+            urls = part_2.normalize_reel_urls(urls)
+            if not urls:
+                print(f"⚠️ No valid URLs found for {username}, skipping...")
+                continue
+            # Apify and Instaloader are blocking, keep them off the browser's event loop
+            result = await asyncio.to_thread(part_2.scrape_user_metrics, username, urls)
+            if result:
+                results.append(result)
+
+    consumer = asyncio.create_task(fetch_metrics())
+    try:
+        scrape_results = await part_1.scrape_reels(on_user_scraped)
+    finally:
+        await queue.put(None)
+        await consumer
+
+    if scrape_results is None:
+        return False
+
+    history_file = part_2.append_scrape_history(results)
+    part_2.update_analytics_summary()
+    part_2.print_final_summary(results, history_file)
+    return True
+
+def run_on_worker(usernames, description, resume=False, known_stop=None):
+    """Send the URL scrape to a running browser worker.
+
+    Returns None when no worker is listening, it sends something unreadable or
+    it is logged in as another account, otherwise whether the job succeeded.
+    """
+    if browser_worker.send_request({'command': 'ping'}) is None:
+        return None
+
+    print(f"\n{'='*70}")
+    print(f"  {description} (warm browser worker)")
+    print(f"{'='*70}\n")
+    
+    result = browser_worker.submit_job(usernames or [], resume=resume or None,
+                                       incremental=True if known_stop else None, known_stop=known_stop,
+                                       account=os.environ.get('INSTAGRAM_USERNAME'))
+    if result is None or result.get('wrong_account'):
+        error = result.get('error') if result else 'no readable reply'
+        print(f"\n⚠️  Browser worker cannot run {description} ({error}), starting a fresh browser")
+        return None
+    if not result.get('ok'):
+        error = result.get('error')
+        print(f"\n❌ {description} failed on the browser worker: {error}")
+        return False
+    
+    print(f"\n✅ {description} completed successfully!")
+    return True
+
+def run_steps(usernames=None, use_worker=True, resume=False, known_stop=None):
+    """Run part 1 and part 2 one after the other.
+
+    Part 1 goes to the warm browser worker when one is running (see
+    browser_worker.py) and to a fresh subprocess otherwise; part 2 always runs
+    as a subprocess. With resume, both steps skip what the run journal says an
+    interrupted run already finished. With known_stop, step 1 only scrolls
+    until that many already-saved reels show up in a row.
+    """
+    resume_args = ['--resume'] if resume else []
+    known_stop_args = ['--incremental', '--known-stop', str(known_stop)] if known_stop else []
+
+    # Step 1: Scrape URLs
+    step1_cmd = [sys.executable, os.path.join(SCRIPT_DIR, 'part_1_scrape_urls.py'), *resume_args, *known_stop_args]
+    if usernames:
+        step1_cmd.extend(['--users'] + usernames)
+    
+    with run_timing.phase('step_1_urls') as timing:
+        ok = run_on_worker(usernames, "STEP 1: Scraping Reel URLs", resume, known_stop) if use_worker else None
+        timing['worker'] = ok is not None
+        timing['ok'] = ok if ok is not None else run_command(step1_cmd, "STEP 1: Scraping Reel URLs")
+    if not timing['ok']:
+        print("\n⚠️  Scraping stopped due to error in Step 1")
+        print("💡 Run again with --resume to continue where it stopped")
+        sys.exit(1)
+    
+    # Step 2: Get Metrics
+    step2_cmd = [sys.executable, os.path.join(SCRIPT_DIR, 'part_2_get_metrics.py'), *resume_args]
+    if usernames:
+        step2_cmd.extend(['--users'] + usernames)
+    
+    with run_timing.phase('step_2_metrics') as timing:
+        timing['ok'] = run_command(step2_cmd, "STEP 2: Fetching Reel Metrics")
+    if not timing['ok']:
+        print("\n⚠️  Scraping stopped due to error in Step 2")
+        print("💡 Run again with --resume to continue where it stopped")
+        sys.exit(1)
+
 def main():
     parser = argparse.ArgumentParser(description='Run Instagram Reel Scraper')
     parser.add_argument(
@@ -46,28 +181,67 @@ def main():
         nargs='+',
         help='Instagram usernames to scrape (e.g., --users user1 user2 user3)'
     )
+    parser.add_argument(
+        '--pipeline',
+        action='store_true',
+        help='Run both steps in one process, fetching metrics for each user as soon as its URLs are ready'
+    )
+    parser.add_argument(
+        '--no-worker',
+        action='store_true',
+        help='Always start a fresh browser for step 1, even if a browser worker is running'
+    )
+    parser.add_argument(
+        '--resume',
+        action='store_true',
+        help='Continue an interrupted run: skip finished users and re-attach to its Apify runs'
+    )
+    parser.add_argument(
+        '--known-stop',
+        type=int,
+        metavar='N',
+        help='Only look for new Reels: stop scrolling a profile after N already-saved Reels in a row'
+    )
+    parser.add_argument(
+        '--timing-log',
+        help='Append JSON-lines timing events from both steps to this file'
+    )
+    parser.add_argument(
+        '--profile',
+        action='store_true',
+        help='Print where both steps spent their time at the end'
+    )
     
     args = parser.parse_args()
     
+    # Both steps append to one timing log, the subprocesses find it through the environment
+    timing_log = args.timing_log
+    if args.profile and not timing_log:
+        timing_log = os.path.join(TIMING_DIR, f"run_{datetime.now().strftime('%Y%m%d_%H%M%S')}.jsonl")
+    if timing_log:
+        run_timing.set_log_file(timing_log)
+    
     print("╔═══════════════════════════════════════════════════════════════════╗")
     print("║        Instagram Reel Scraper - Automated Workflow               ║")
     print("╚═══════════════════════════════════════════════════════════════════╝")
     
-    # Step 1: Scrape URLs
-    step1_cmd = [sys.executable, 'part_1_scrape_urls.py']
-    if args.users:
-        step1_cmd.extend(['--users'] + args.users)
+    if args.pipeline:
+        print(f"\n{'='*70}")
+        print("  PIPELINE: Scraping Reel URLs and Fetching Metrics")
+        print(f"{'='*70}\n")
+        with run_timing.phase('pipeline') as timing:
+            timing['ok'] = asyncio.run(run_pipeline(args.users, args.resume, args.known_stop))
+        if not timing['ok']:
+            print("\n⚠️  Scraping stopped due to error in the pipeline")
+            print("💡 Run again with --resume to continue where it stopped")
+            sys.exit(1)
+    else:
+        run_steps(args.users, use_worker=not args.no_worker, resume=args.resume,
+                  known_stop=args.known_stop)
     
-    if not run_command(step1_cmd, "STEP 1: Scraping Reel URLs"):
-        print("\n⚠️  Scraping stopped due to error in Step 1")
-        sys.exit(1)
-    
-    # Step 2: Get Metrics
-    step2_cmd = [sys.executable, 'part_2_get_metrics.py']
-    
-    if not run_command(step2_cmd, "STEP 2: Fetching Reel Metrics"):
-        print("\n⚠️  Scraping stopped due to error in Step 2")
-        sys.exit(1)
+    if args.profile:
+        run_timing.print_profile(run_timing.load_events(timing_log))
+        print(f"⏱️ Timing events saved to: {timing_log}")
     
     print("\n" + "="*70)
     print("🎉 ALL SCRAPING COMPLETED SUCCESSFULLY!")
@@ -0,0 +1,301 @@
+#!/usr/bin/env python3
+"""
+Media archive - downloads reel videos before their signed CDN links expire.
+
+The video_url values part_2 writes are signed links carrying an `oe=` expiry
+(a hex Unix timestamp), so they stop working a few days after a scrape. This
+stage reads the metrics CSVs and saves every reel that is not archived yet to
+media/reels/{shortcode}.mp4.
+
+- Downloads run on a bounded thread pool. Each worker keeps one keep-alive
+  connection per host.
+- A download is written to media/.partial/ and continued with an HTTP Range
+  request when a connection drops or an earlier run was interrupted.
+- Finished files are stored once by SHA-256 under media/objects/. The
+  shortcode name is a hard link to that object, so reposted videos are kept
+  once.
+- Reels that already have a file are skipped, and links whose expiry has
+  passed are not requested.
+"""
+
+import argparse
+import csv
+import glob
+import hashlib
+import http.client
+import os
+import shutil
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from urllib.parse import parse_qs, urljoin, urlsplit
+
+import run_timing
+
+MEDIA_DIR = "media"
+METRICS_FILE_PATTERN = "data/*_reels_metrics.csv"
+MEDIA_EXTENSION = ".mp4"
+
+MEDIA_CONCURRENCY = 8
+CHUNK_SIZE = 1024 * 1024
+DOWNLOAD_TIMEOUT = 60
+# Attempts per reel; every retry continues from the bytes already on disk
+DOWNLOAD_ATTEMPTS = 3
+MAX_REDIRECTS = 3
+
+# Held while a download is moved into objects/, so two reels with the same video cannot both store it
+store_lock = threading.Lock()
+
+
+class DownloadError(Exception):
+    """A download that failed; retryable is False when asking again cannot help (e.g. HTTP 404)."""
+
+    def __init__(self, message, retryable=True):
+        super().__init__(message)
+        self.retryable = retryable
+
+
+def reel_path(shortcode, media_dir=MEDIA_DIR):
+    return os.path.join(media_dir, 'reels', f"{shortcode}{MEDIA_EXTENSION}")
+
+
+def object_path(digest, media_dir=MEDIA_DIR):
+    return os.path.join(media_dir, 'objects', digest[:2], f"{digest}{MEDIA_EXTENSION}")
+
+
+def partial_path(shortcode, media_dir=MEDIA_DIR):
+    return os.path.join(media_dir, '.partial', f"{shortcode}{MEDIA_EXTENSION}.part")
+
+
+def url_expiry(url):
+    """Unix time a signed CDN link stops working (its hex `oe` parameter), or None if unsigned."""
+    values = parse_qs(urlsplit(url).query).get('oe')
+    try:
+        return int(values[0], 16) if values else None
+    except ValueError:
+        return None
+
+
+class ConnectionPool:
+    """Keep-alive HTTP connections, one per worker thread and host."""
+
+    def __init__(self, timeout=DOWNLOAD_TIMEOUT):
+        self.timeout = timeout
+        self.local = threading.local()
+
+    def get(self, scheme, netloc):
+        connections = self.local.__dict__.setdefault('connections', {})
+        key = (scheme, netloc)
+        if key not in connections:
+            connection_class = http.client.HTTPSConnection if scheme == 'https' else http.client.HTTPConnection
+            connections[key] = connection_class(netloc, timeout=self.timeout)
+        return connections[key]
+
+    def discard(self, scheme, netloc):
+        """Drop a connection after an error, so the next request opens a fresh one."""
+        connection = self.local.__dict__.get('connections', {}).pop((scheme, netloc), None)
+        if connection is not None:
+            connection.close()
+
+
+class DownloadStats:
+    """Counters for the final report, shared by the download threads."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.counts = {'downloaded': 0, 'deduplicated': 0, 'skipped': 0, 'expired': 0, 'failed': 0, 'resumed': 0}
+        self.bytes = 0
+
+    def add(self, key, count=1):
+        with self.lock:
+            self.counts[key] += count
+
+    def add_bytes(self, count):
+        with self.lock:
+            self.bytes += count
+
+
+def open_response(pool, url, offset):
+    """GET url (following redirects) asking for the bytes from offset on."""
+    headers = {'Range': f"bytes={offset}-"} if offset else {}
+    for _ in range(MAX_REDIRECTS + 1):
+        parts = urlsplit(url)
+        target = parts.path or '/'
+        if parts.query:
+            target += f"?{parts.query}"
+        connection = pool.get(parts.scheme, parts.netloc)
+        try:
+            connection.request('GET', target, headers=headers)
+            response = connection.getresponse()
+        except (OSError, http.client.HTTPException):
+            pool.discard(parts.scheme, parts.netloc)
+            raise
+
+        if response.status in (301, 302, 303, 307, 308):
+            location = response.getheader('Location')
+            response.read()
+            if not location:
+                raise DownloadError(f"HTTP {response.status} without a Location")
+            url = urljoin(url, location)
+            continue
+        return parts, response
+    raise DownloadError('too many redirects')
+
+
+def fetch_to_partial(pool, url, part_file, stats):
+    """Download url into part_file, continuing from its current size. Returns the SHA-256 of the file."""
+    digest = hashlib.sha256()
+    offset = 0
+    if os.path.exists(part_file):
+        with open(part_file, 'rb') as f:
+            for chunk in iter(lambda: f.read(CHUNK_SIZE), b''):
+                digest.update(chunk)
+                offset += len(chunk)
+
+    parts, response = open_response(pool, url, offset)
+    try:
+        if response.status == 416 and offset:
+            # The partial file already holds every byte
+            response.read()
+            return digest.hexdigest()
+        if response.status == 200 and offset:
+            # The server ignored the Range header, start over
+            digest = hashlib.sha256()
+            offset = 0
+        elif response.status not in (200, 206):
+            response.read()
+            raise DownloadError(f"HTTP {response.status}", retryable=response.status >= 500)
+        elif response.status == 206:
+            stats.add('resumed')
+
+        received = 0
+        with open(part_file, 'ab' if offset else 'wb') as f:
+            for chunk in iter(lambda: response.read(CHUNK_SIZE), b''):
+                f.write(chunk)
+                digest.update(chunk)
+                received += len(chunk)
+                stats.add_bytes(len(chunk))
+
+        expected = response.getheader('Content-Length')
+        if expected and received != int(expected):
+            raise DownloadError('connection closed before the whole file arrived')
+    except (OSError, http.client.HTTPException, DownloadError):
+        pool.discard(parts.scheme, parts.netloc)
+        raise
+    finally:
+        response.close()
+    return digest.hexdigest()
+
+
+def link_or_copy(source, destination):
+    """Point destination at source without a second copy where the filesystem allows it."""
+    tmp_path = f"{destination}.tmp"
+    if os.path.exists(tmp_path):
+        os.remove(tmp_path)
+    try:
+        os.link(source, tmp_path)
+    except OSError:
+        shutil.copyfile(source, tmp_path)
+    os.replace(tmp_path, destination)
+
+
+def archive_reel(pool, shortcode, url, stats, media_dir=MEDIA_DIR):
+    """Download one reel into the archive. Returns True when it ends up on disk."""
+    part_file = partial_path(shortcode, media_dir)
+    digest = None
+    last_error = None
+    for _ in range(DOWNLOAD_ATTEMPTS):
+        try:
+            digest = fetch_to_partial(pool, url, part_file, stats)
+            break
+        except (OSError, http.client.HTTPException, DownloadError) as e:
+            last_error = e
+            if isinstance(e, DownloadError) and not e.retryable:
+                break
+
+    if digest is None:
+        print(f"⚠️  Could not download {shortcode}: {last_error}")
+        stats.add('failed')
+        return False
+
+    stored = object_path(digest, media_dir)
+    with store_lock:
+        if os.path.exists(stored):
+            os.remove(part_file)
+            stats.add('deduplicated')
+        else:
+            os.makedirs(os.path.dirname(stored), exist_ok=True)
+            os.replace(part_file, stored)
+            stats.add('downloaded')
+        link_or_copy(stored, reel_path(shortcode, media_dir))
+    return True
+
+
+def iter_media_jobs(usernames=None):
+    """(username, shortcode, video_url) for every reel in the metrics CSVs."""
+    if usernames:
+        metrics_files = [f"data/{username}_reels_metrics.csv" for username in usernames]
+    else:
+        metrics_files = sorted(glob.glob(METRICS_FILE_PATTERN))
+    for metrics_file in metrics_files:
+        if not os.path.exists(metrics_file):
+            continue
+        username = os.path.basename(metrics_file)[:-len('_reels_metrics.csv')]
+        with open(metrics_file, 'r', newline='', encoding='utf-8') as f:
+            for row in csv.DictReader(f):
+                if row.get('shortcode') and row.get('video_url'):
+                    yield username, row['shortcode'], row['video_url']
+
+
+def download_media(usernames=None, concurrency=MEDIA_CONCURRENCY, media_dir=MEDIA_DIR):
+    """Archive the videos of the given creators (default: every creator). Returns the stats counters."""
+    for folder in ('reels', 'objects', '.partial'):
+        os.makedirs(os.path.join(media_dir, folder), exist_ok=True)
+
+    stats = DownloadStats()
+    now = time.time()
+    jobs = {}
+    for _, shortcode, url in iter_media_jobs(usernames):
+        if shortcode in jobs or os.path.exists(reel_path(shortcode, media_dir)):
+            stats.add('skipped')
+            continue
+        expiry = url_expiry(url)
+        if expiry is not None and expiry <= now:
+            stats.add('expired')
+            continue
+        jobs[shortcode] = url
+
+    print(f"🎞️ Archiving {len(jobs)} Reel video(s) with {concurrency} connection(s) "
+          f"({stats.counts['skipped']} already archived, {stats.counts['expired']} with expired links)")
+
+    pool = ConnectionPool()
+    start = time.perf_counter()
+    with run_timing.phase('media_download', reels=len(jobs), concurrency=concurrency) as timing:
+        with ThreadPoolExecutor(max_workers=max(1, concurrency)) as executor:
+            futures = [
+                executor.submit(archive_reel, pool, shortcode, url, stats, media_dir)
+                for shortcode, url in jobs.items()
+            ]
+            for future in as_completed(futures):
+                future.result()
+        timing['bytes'] = stats.bytes
+    elapsed = time.perf_counter() - start
+
+    counts = stats.counts
+    megabytes = stats.bytes / (1024 * 1024)
+    rate = megabytes / elapsed if elapsed else 0
+    print(f"🎞️ Media: {counts['downloaded']} downloaded, {counts['deduplicated']} duplicate(s), "
+          f"{counts['failed']} failed, {counts['resumed']} resumed | "
+          f"{megabytes:.1f} MB in {elapsed:.1f}s ({rate:.1f} MB/s) -> {os.path.join(media_dir, 'reels')}")
+    return {**counts, 'bytes': stats.bytes, 'seconds': round(elapsed, 2)}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Archive reel videos from the metrics CSVs')
+    parser.add_argument('--users', nargs='+', help='Only these creators (default: every metrics file in data/)')
+    parser.add_argument('--concurrency', type=int, default=MEDIA_CONCURRENCY,
+                        help=f"Downloads in flight at the same time (default: {MEDIA_CONCURRENCY})")
+    parser.add_argument('--media-dir', default=MEDIA_DIR, help=f"Archive folder (default: {MEDIA_DIR})")
+    args = parser.parse_args()
+
+    download_media(args.users, max(1, args.concurrency), args.media_dir)
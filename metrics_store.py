@@ -0,0 +1,180 @@
+"""
+Local metrics store - SQLite database holding one snapshot row per reel per scrape.
+
+Each run only inserts the rows it fetched, so the history of every reel is kept
+without copying whole CSV files. The per-user CSVs in data/ are exported from
+the latest snapshot of each reel (see write_csv_atomic).
+"""
+
+import csv
+import sqlite3
+import threading
+
+import run_journal
+
+METRICS_DB = "data/metrics.db"
+
+# Rows fetched from SQLite at a time when exporting a creator's latest snapshots
+ITER_BATCH_SIZE = 500
+
+SNAPSHOT_FIELDS = [
+    'shortcode', 'creator', 'scraped_at', 'date', 'likes', 'views', 'comments',
+    'estimated_saves', 'estimated_shares', 'engagement_rate', 'video_url',
+    'caption', 'hashtags', 'mentions'
+]
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS reel_snapshots (
+    shortcode TEXT NOT NULL,
+    creator TEXT NOT NULL,
+    scraped_at TEXT NOT NULL,
+    date TEXT,
+    likes INTEGER,
+    views INTEGER,
+    comments INTEGER,
+    estimated_saves INTEGER,
+    estimated_shares INTEGER,
+    engagement_rate NUMERIC,
+    video_url TEXT,
+    caption TEXT,
+    hashtags TEXT,
+    mentions TEXT,
+    PRIMARY KEY (shortcode, scraped_at)
+);
+CREATE INDEX IF NOT EXISTS idx_snapshots_creator ON reel_snapshots (creator, shortcode, scraped_at);
+CREATE INDEX IF NOT EXISTS idx_snapshots_date ON reel_snapshots (date);
+
+CREATE TABLE IF NOT EXISTS reel_tags (
+    shortcode TEXT PRIMARY KEY,
+    manual_tags TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS reel_refresh (
+    shortcode TEXT PRIMARY KEY,
+    last_fetched TEXT NOT NULL,
+    posted_at TEXT
+);
+"""
+
+
+class MetricsStore:
+    """Snapshot store for reel metrics, safe to share between worker threads."""
+
+    def __init__(self, path=METRICS_DB):
+        self.path = path
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+
+    def add_snapshots(self, creator, scraped_at, rows):
+        """Upsert one snapshot per row for the given scrape time."""
+        placeholders = ', '.join('?' for _ in SNAPSHOT_FIELDS)
+        updates = ', '.join(f"{field} = excluded.{field}" for field in SNAPSHOT_FIELDS[3:])
+        values = [
+            tuple({**row, 'creator': creator, 'scraped_at': scraped_at}.get(field) for field in SNAPSHOT_FIELDS)
+            for row in rows
+        ]
+        with self.lock, self.conn:
+            self.conn.executemany(
+                f"INSERT INTO reel_snapshots ({', '.join(SNAPSHOT_FIELDS)}) VALUES ({placeholders}) "
+                f"ON CONFLICT (shortcode, scraped_at) DO UPDATE SET {updates}",
+                values
+            )
+
+    def known_shortcodes(self, creator):
+        """Shortcodes that have at least one snapshot for the creator."""
+        with self.lock:
+            cursor = self.conn.execute(
+                "SELECT DISTINCT shortcode FROM reel_snapshots WHERE creator = ?", (creator,)
+            )
+            return {row['shortcode'] for row in cursor}
+
+    def set_tags(self, tags):
+        """Save manual tags keyed by shortcode; an empty tag deletes the reel's tag."""
+        with self.lock, self.conn:
+            self.conn.executemany(
+                "INSERT INTO reel_tags (shortcode, manual_tags) VALUES (?, ?) "
+                "ON CONFLICT (shortcode) DO UPDATE SET manual_tags = excluded.manual_tags",
+                [(shortcode, tag) for shortcode, tag in tags.items() if tag]
+            )
+            self.conn.executemany(
+                "DELETE FROM reel_tags WHERE shortcode = ?",
+                [(shortcode,) for shortcode, tag in tags.items() if not tag]
+            )
+
+    def set_refresh_times(self, entries):
+        """Record (shortcode, last_fetched, posted_at) for reels that were just fetched."""
+        with self.lock, self.conn:
+            self.conn.executemany(
+                "INSERT INTO reel_refresh (shortcode, last_fetched, posted_at) VALUES (?, ?, ?) "
+                "ON CONFLICT (shortcode) DO UPDATE SET "
+                "last_fetched = excluded.last_fetched, posted_at = COALESCE(excluded.posted_at, posted_at)",
+                entries
+            )
+
+    def get_refresh_times(self, shortcodes):
+        """Return shortcode -> {last_fetched, posted_at} for the given reels that were fetched before."""
+        shortcodes = list(shortcodes)
+        entries = {}
+        with self.lock:
+            for start in range(0, len(shortcodes), ITER_BATCH_SIZE):
+                chunk = shortcodes[start:start + ITER_BATCH_SIZE]
+                cursor = self.conn.execute(
+                    f"SELECT * FROM reel_refresh WHERE shortcode IN ({', '.join('?' for _ in chunk)})", chunk
+                )
+                for row in cursor:
+                    entries[row['shortcode']] = {'last_fetched': row['last_fetched'], 'posted_at': row['posted_at']}
+        return entries
+
+    def iter_latest(self, creator):
+        """Yield the latest snapshot of each of the creator's reels, newest post first.
+
+        Rows are read ITER_BATCH_SIZE at a time over a connection of their own,
+        so memory stays flat for large creators and other threads can keep
+        writing (WAL readers see a consistent snapshot).
+        """
+        conn = sqlite3.connect(self.path)
+        conn.row_factory = sqlite3.Row
+        try:
+            cursor = conn.execute(
+                """
+                SELECT s.*, COALESCE(t.manual_tags, '') AS manual_tags
+                FROM reel_snapshots s
+                JOIN (
+                    SELECT shortcode, MAX(scraped_at) AS scraped_at
+                    FROM reel_snapshots WHERE creator = ? GROUP BY shortcode
+                ) latest USING (shortcode, scraped_at)
+                LEFT JOIN reel_tags t USING (shortcode)
+                ORDER BY s.date DESC, s.shortcode
+                """,
+                (creator,)
+            )
+            while True:
+                rows = cursor.fetchmany(ITER_BATCH_SIZE)
+                if not rows:
+                    return
+                for row in rows:
+                    yield dict(row)
+        finally:
+            conn.close()
+
+    def close(self):
+        self.conn.close()
+
+
+def write_csv_atomic(csv_path, fieldnames, rows):
+    """Write rows to csv_path with run_journal.atomic_write.
+
+    Readers never see a half-written CSV. Returns the number of rows written.
+    """
+    count = 0
+    with run_journal.atomic_write(csv_path, newline='', encoding='utf-8') as f:
+        writer = csv.DictWriter(f, fieldnames=fieldnames, extrasaction='ignore')
+        writer.writeheader()
+        for row in rows:
+            writer.writerow(row)
+            count += 1
+    return count
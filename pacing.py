@@ -0,0 +1,132 @@
+"""
+Pacing - shared rate limiting for the requests the scrapers make.
+
+Every account/host pair gets a token bucket that browser navigations, scrolls,
+profile lookups and Apify runs draw from. Requests go out as fast as the bucket
+allows while the site answers normally; when a response looks throttled (HTTP
+429 or Instagram's "wait a few minutes" page) the bucket pauses with an
+exponentially growing backoff, and the backoff resets after a run of normal
+responses. Buckets are thread-safe and can be awaited from asyncio code.
+"""
+
+import asyncio
+import threading
+import time
+
+# Default bucket shape: sustained requests per second and the burst allowed on top
+DEFAULT_RATE = 1.0
+DEFAULT_BURST = 5
+
+# Backoff after a throttled response, doubled on every further one once the pause is over
+BACKOFF_INITIAL = 30.0
+BACKOFF_MAX = 15 * 60.0
+# Normal responses in a row before the backoff starts from BACKOFF_INITIAL again
+BACKOFF_RESET_AFTER = 10
+
+THROTTLE_STATUS_CODES = (429,)
+THROTTLE_TEXT_PATTERNS = (
+    'please wait a few minutes',
+    'try again later',
+    'too many requests',
+    'rate limit',
+)
+
+
+def looks_throttled(status=None, text=''):
+    """Whether a response status or page/error text says we are being rate limited."""
+    if status in THROTTLE_STATUS_CODES:
+        return True
+    text = (text or '').lower()
+    return any(pattern in text for pattern in THROTTLE_TEXT_PATTERNS)
+
+
+class TokenBucket:
+    """Token bucket with exponential backoff on throttling."""
+
+    def __init__(self, name, rate=DEFAULT_RATE, burst=DEFAULT_BURST):
+        self.name = name
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+        self.backoff = BACKOFF_INITIAL
+        self.successes = 0
+        self.throttled = 0
+        self.waited = 0.0
+        self.lock = threading.Lock()
+
+    def reserve(self, cost=1):
+        """Take cost tokens and return how many seconds the caller must wait before acting."""
+        with self.lock:
+            now = time.monotonic()
+            # During a pause `updated` is its end (see record_throttled), so no tokens accrue
+            if now > self.updated:
+                self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+            self.tokens -= cost
+            # Token debt is paid off from the end of the pause, spacing the requests queued during it
+            wait = max(0.0, self.updated - now) + max(0.0, -self.tokens / self.rate)
+            self.waited += wait
+            return wait
+
+    async def acquire(self, cost=1):
+        """Wait (asynchronously) until the bucket allows the next request."""
+        wait = self.reserve(cost)
+        if wait > 0:
+            await asyncio.sleep(wait)
+        return wait
+
+    def acquire_sync(self, cost=1):
+        """Block the calling thread until the bucket allows the next request."""
+        wait = self.reserve(cost)
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+    def record_success(self):
+        with self.lock:
+            self.successes += 1
+            if self.successes >= BACKOFF_RESET_AFTER:
+                self.backoff = BACKOFF_INITIAL
+
+    def record_throttled(self):
+        """Pause the bucket for the current backoff and double it. Returns the pause in seconds.
+
+        Throttled responses that arrive while the bucket is already paused
+        (requests that were in flight when the first one came back) do not
+        escalate the backoff; they return the pause still remaining.
+        """
+        with self.lock:
+            now = time.monotonic()
+            if now < self.paused_until:
+                return self.paused_until - now
+            pause = self.backoff
+            self.paused_until = now + pause
+            # Resume at the sustained rate rather than with a full burst
+            self.tokens = min(self.tokens, 1.0)
+            self.updated = max(self.updated, self.paused_until)
+            self.backoff = min(self.backoff * 2, BACKOFF_MAX)
+            self.successes = 0
+            self.throttled += 1
+        print(f"🐢 {self.name} is throttling us, pausing requests for {pause:.0f}s")
+        return pause
+
+
+buckets_lock = threading.Lock()
+buckets = {}
+
+
+def get_bucket(name, rate=DEFAULT_RATE, burst=DEFAULT_BURST):
+    """Return the shared bucket for name (e.g. 'instagram:account'), creating it on first use."""
+    with buckets_lock:
+        if name not in buckets:
+            buckets[name] = TokenBucket(name, rate, burst)
+        return buckets[name]
+
+
+def print_summary():
+    """Report time spent waiting on each bucket and how often we were throttled."""
+    for bucket in buckets.values():
+        if bucket.waited or bucket.throttled:
+            print(f"🚦 {bucket.name}: waited {bucket.waited:.1f}s for pacing, throttled {bucket.throttled} time(s)")
@@ -1,12 +1,20 @@
 import time
 import json
 import os
+import csv
 import asyncio
 import sys
 import io
+import re
+import contextlib
+from urllib.parse import urlparse
 
 from playwright.async_api import async_playwright
 
+import pacing
+import run_journal
+import run_timing
+
 # Fix Unicode encoding for Windows compatibility
 if sys.platform == 'win32':
     sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
@@ -14,22 +22,77 @@ if sys.platform == 'win32':
 
 # CONFIGURATION - HARDCODED FOR LOCAL USE
 # WARNING: These credentials are hardcoded. Do not share this file or commit to public repositories.
-INSTAGRAM_USERNAME = 'zebra.4500860'
-INSTAGRAM_PASSWORD = 'Meshack@7474'
+# The environment can override them, e.g. for one account of sharded_runner.py's pool
+INSTAGRAM_USERNAME = os.environ.get('INSTAGRAM_USERNAME') or 'zebra.4500860'
+INSTAGRAM_PASSWORD = os.environ.get('INSTAGRAM_PASSWORD') or 'Meshack@7474'
 
-# LIST OF TARGET USERS (Maximum 10) - can be passed as argument
+# LIST OF TARGET USERS (Maximum 10 per run, use sharded_runner.py for more) - can be passed as argument
 import argparse
 
+MAX_TARGET_USERS = 10
+
 TARGET_USERS = [
     'she_is_ada_',
     '_olasubomi_',
     '5thkind_'
 ]
 
-SESSION_FILE = 'instagram_session.json'
+SESSION_FILE = os.environ.get('INSTAGRAM_SESSION_FILE') or 'instagram_session.json'
+
+# Cached result of the last session check, trusted for SESSION_CHECK_TTL seconds
+# as long as the session file has not changed
+SESSION_CHECK_FILE = f"{os.path.splitext(SESSION_FILE)[0]}_check.json"
+SESSION_CHECK_TTL = 10 * 60
+# Fetched without rendering to confirm the session: logged-out requests get redirected to the login page
+SESSION_PROBE_PATH = '/accounts/edit/'
+
+# Site to scrape - can point at a local stand-in (see benchmarks/)
+INSTAGRAM_BASE_URL = os.environ.get('INSTAGRAM_BASE_URL', 'https://www.instagram.com').rstrip('/')
 
 MAX_SCROLL_ATTEMPTS = 50
-SCROLL_WAIT_TIME = 2
+# Longest wait for new reels after a scroll; the wait ends as soon as they arrive
+SCROLL_WAIT_TIME = 3
+# Longest wait for the network to go quiet after a navigation or login step
+SETTLE_TIMEOUT = 5
+
+# Pacing of Instagram requests for this account (token bucket, see pacing.py):
+# sustained actions per second and burst, where a scroll costs one token and a
+# profile navigation NAVIGATION_COST
+INSTAGRAM_RATE = 1.0
+INSTAGRAM_BURST = 5
+NAVIGATION_COST = 3
+# Extra attempts at a profile that answers with a throttling page
+NAVIGATION_RETRIES = 2
+
+# Number of profiles scraped at the same time (one browser page each)
+CONCURRENCY = 1
+# Cap on simultaneous page navigations against instagram.com
+MAX_NAVIGATIONS_PER_HOST = 2
+
+# Incremental mode: keep existing URL files and stop scrolling once this many
+# already-known reels show up in a row
+INCREMENTAL = False
+KNOWN_REELS_STOP_THRESHOLD = 12
+
+# Resume mode: skip creators whose URLs were already saved by the interrupted run (see run_journal.py)
+RESUME = False
+
+# Responses that carry the Reels grid data (see ReelFeedCapture)
+FEED_RESPONSE_PATTERNS = ('/graphql', '/api/v1/clips/user', '/api/v1/feed/user')
+
+# Resource groups that can be aborted with --block. We only read reel links, so
+# none of these are needed for scraping.
+BLOCKABLE_RESOURCES = {
+    'images': ('image',),
+    'media': ('media',),
+    'fonts': ('font',),
+    'stylesheets': ('stylesheet',),
+}
+ANALYTICS_URL_PATTERNS = (
+    '/logging/', '/ajax/bz', '/falco', 'graph.instagram.com/logging_client_events',
+    'connect.facebook.net', 'facebook.com/tr', 'google-analytics.com', 'googletagmanager.com',
+)
+BLOCKED_RESOURCES = []
 
 # Create output folder for URLs
 os.makedirs("reel_urls", exist_ok=True)
@@ -37,20 +100,114 @@ os.makedirs("reel_urls", exist_ok=True)
 async def save_storage_state(context):
     """Saves the entire browser storage state (cookies, localStorage, etc.) to a file."""
     state = await context.storage_state()
+    os.makedirs(os.path.dirname(SESSION_FILE) or '.', exist_ok=True)
     with open(SESSION_FILE, "w") as f:
         json.dump(state, f)
     print(f"💾 Session state saved to {SESSION_FILE}")
+    save_session_check(valid=True)
+
+def load_session_check():
+    """Read the cached session verdict (empty if there is none)."""
+    if not os.path.exists(SESSION_CHECK_FILE):
+        return {}
+    try:
+        with open(SESSION_CHECK_FILE, "r") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def save_session_check(**fields):
+    """Update the cached session verdict for the current session file."""
+    check = load_session_check()
+    check.update(fields)
+    check['checked_at'] = time.time()
+    check['session_mtime'] = os.path.getmtime(SESSION_FILE) if os.path.exists(SESSION_FILE) else None
+    with open(SESSION_CHECK_FILE, "w") as f:
+        json.dump(check, f)
+
+def session_cookie_status():
+    """Return 'valid', 'expired' or 'missing' for the sessionid cookie in the saved storage state."""
+    if not os.path.exists(SESSION_FILE):
+        return 'missing'
+    try:
+        with open(SESSION_FILE, "r") as f:
+            cookies = json.load(f).get('cookies', [])
+    except (OSError, ValueError):
+        return 'missing'
+
+    host = urlparse(INSTAGRAM_BASE_URL).hostname or ''
+    for cookie in cookies:
+        domain = cookie.get('domain', '').lstrip('.')
+        if cookie.get('name') != 'sessionid' or not cookie.get('value') or not host.endswith(domain):
+            continue
+        # -1 marks a cookie without an expiry date
+        expires = cookie.get('expires', -1)
+        if expires != -1 and expires < time.time() + 60:
+            return 'expired'
+        return 'valid'
+    return 'missing'
+
+async def probe_session(context):
+    """Confirm the session with one authenticated request.
+
+    Returns True if logged in, False if Instagram sends us to the login page,
+    and None if the response does not tell.
+    """
+    try:
+        response = await context.request.get(
+            f"{INSTAGRAM_BASE_URL}{SESSION_PROBE_PATH}", max_redirects=0, timeout=15000
+        )
+    except Exception as e:
+        print(f"⚠️ Session probe failed: {e}")
+        return None
+
+    if response.status == 200:
+        return True
+    if response.status in (301, 302, 303, 307, 308):
+        return False if '/accounts/login' in response.headers.get('location', '') else None
+    if response.status in (401, 403):
+        return False
+    return None
+
+async def check_session_fast(context):
+    """Decide whether the saved session is valid without loading the homepage.
+
+    Looks at the sessionid cookie expiry first, then at the cached verdict, and
+    only then makes one lightweight request. Returns (verdict, reason), where
+    verdict is True, False, or None when the fast checks cannot tell.
+    """
+    status = session_cookie_status()
+    if status != 'valid':
+        return False, f"session cookie {status}"
+
+    check = load_session_check()
+    if (check.get('valid')
+            and check.get('session_mtime') == os.path.getmtime(SESSION_FILE)
+            and time.time() - check.get('checked_at', 0) < SESSION_CHECK_TTL):
+        return True, "checked in the last few minutes"
+
+    verdict = await probe_session(context)
+    if verdict is not None:
+        save_session_check(valid=verdict)
+    if verdict is False:
+        return False, "authenticated request was sent to the login page"
+    return verdict, "authenticated request"
 
 async def login_with_2fa(page):
     """Handles the Instagram login process, including 2FA."""
     print("🔐 Attempting to log in to Instagram...")
-    await page.goto("https://www.instagram.com/accounts/login/", wait_until="domcontentloaded", timeout=45000)
+    await page.goto(f"{INSTAGRAM_BASE_URL}/accounts/login/", wait_until="domcontentloaded", timeout=45000)
     await page.wait_for_selector("input[name='username']", timeout=20000)
     await page.fill("input[name='username']", INSTAGRAM_USERNAME)
     await page.fill("input[name='password']", INSTAGRAM_PASSWORD)
     await page.click("button[type='submit']")
     print("⏳ Waiting for login to process...")
-    await page.wait_for_timeout(5000)
+    try:
+        await page.wait_for_selector(
+            "input[name='verificationCode'], svg[aria-label='Search']", timeout=SETTLE_TIMEOUT * 1000
+        )
+    except Exception:
+        pass
 
     # --- Check for 2FA ---
     print("🔍 Checking for 2FA requirement...")
@@ -65,7 +222,6 @@ async def login_with_2fa(page):
         await page.fill("input[name='verificationCode']", verification_code)
         await page.click("button[type='submit']")
         print("⏳ Verifying 2FA code...")
-        await page.wait_for_timeout(5000)
         
         # Check if 2FA was successful
         try:
@@ -77,13 +233,15 @@ async def login_with_2fa(page):
 
     # --- After 2FA or regular login, navigate to Instagram homepage ---
     print("🔍 Navigating to Instagram homepage after login...")
-    await page.goto("https://www.instagram.com/", wait_until="domcontentloaded", timeout=30000)
-    await page.wait_for_timeout(3000)
+    await page.goto(f"{INSTAGRAM_BASE_URL}/", wait_until="domcontentloaded", timeout=30000)
     print("✅ Successfully navigated to Instagram homepage.")
 
     # --- Final check to confirm login was successful ---
     print("🔍 Performing final check for login success...")
-    await page.wait_for_timeout(3000)
+    try:
+        await page.wait_for_selector('svg[aria-label="Search"]', timeout=2 * SETTLE_TIMEOUT * 1000)
+    except Exception:
+        pass
     search_icon = page.locator('svg[aria-label="Search"]').first
     if await search_icon.is_visible():
         print("✅ Logged in successfully.")
@@ -92,103 +250,413 @@ async def login_with_2fa(page):
         print("❌ Login failed. The search bar is not visible.")
         return False
 
-async def scroll_to_collect_reel_urls(page):
-    """Scrolls the Reels tab to collect all unique Reel URLs."""
+def get_instagram_bucket():
+    """Token bucket shared by every Instagram request made for this account."""
+    return pacing.get_bucket(f"instagram:{INSTAGRAM_USERNAME}", INSTAGRAM_RATE, INSTAGRAM_BURST)
+
+async def wait_for_network_quiet(page, timeout=SETTLE_TIMEOUT):
+    """Wait until the page's network goes idle, giving up after timeout seconds."""
+    try:
+        await page.wait_for_load_state("networkidle", timeout=timeout * 1000)
+    except Exception:
+        pass
+
+async def page_looks_throttled(page, response=None):
+    """Whether a navigation landed on a 429 or Instagram's "wait a few minutes" page."""
+    status = response.status if response is not None else None
+    try:
+        text = await page.evaluate("() => document.body ? document.body.innerText.slice(0, 2000) : ''")
+    except Exception:
+        text = ''
+    # The throttling page is a short notice; a full profile page never is
+    return pacing.looks_throttled(status, text if len(text) < 2000 else '')
+
+def get_reel_shortcode(url):
+    """Extract the reel shortcode from a URL like '/username/reel/ABC123/'."""
+    match = re.search(r"/reel/([A-Za-z0-9_-]+)", url)
+    return match.group(1) if match else None
+
+def load_existing_reel_urls(username):
+    """Load the Reel URLs saved for a user by a previous run."""
+    output_file = f"reel_urls/{username}_reels.txt"
+    if not os.path.exists(output_file):
+        return []
+    with open(output_file, "r") as f:
+        return [line.strip() for line in f if line.strip()]
+
+class NetworkStats:
+    """Counts the requests and bytes the browser context used during a run."""
+
+    def __init__(self):
+        self.requests = 0
+        self.bytes = 0
+        self.blocked = {}
+
+    async def on_request_finished(self, request):
+        self.requests += 1
+        try:
+            sizes = await request.sizes()
+            self.bytes += sizes['responseHeadersSize'] + sizes['responseBodySize']
+        except Exception:
+            pass
+
+    def record_blocked(self, group):
+        self.blocked[group] = self.blocked.get(group, 0) + 1
+
+    def reset(self):
+        """Start counting from zero, e.g. for the next job of a long-lived browser."""
+        self.requests = 0
+        self.bytes = 0
+        self.blocked = {}
+
+    def print_summary(self):
+        blocked_total = sum(self.blocked.values())
+        print(f"🌐 Network: {self.requests} requests, {self.bytes / (1024 * 1024):.1f} MB downloaded")
+        if blocked_total:
+            details = ', '.join(f"{group}: {count}" for group, count in sorted(self.blocked.items()))
+            print(f"🚫 Blocked {blocked_total} requests ({details})")
+
+async def apply_block_policy(context, groups, stats):
+    """Abort requests for the given resource groups on every page of the context."""
+    # Playwright resource type -> the --block group it belongs to, so blocks are counted per group
+    resource_groups = {rtype: group for group in groups for rtype in BLOCKABLE_RESOURCES.get(group, ())}
+    block_analytics = 'analytics' in groups
+
+    async def handle_route(route):
+        request = route.request
+        if request.resource_type in resource_groups:
+            stats.record_blocked(resource_groups[request.resource_type])
+            await route.abort()
+        elif block_analytics and any(pattern in request.url for pattern in ANALYTICS_URL_PATTERNS):
+            stats.record_blocked('analytics')
+            await route.abort()
+        else:
+            await route.continue_()
+
+    await context.route("**/*", handle_route)
+    print(f"🚫 Blocking resources: {', '.join(groups)}")
+
+class ReelFeedCapture:
+    """Collects reel data from the JSON responses that feed the Reels grid.
+
+    Instagram loads the grid from feed/GraphQL endpoints whose payloads already
+    carry the shortcode, post time and counts of every reel, so listening to
+    those responses saves reading the DOM anchor by anchor. The same endpoints
+    also serve suggested accounts and photo/carousel posts, so only the
+    creator's own clips are kept.
+    """
+
+    def __init__(self, page, username):
+        self.page = page
+        self.username = username
+        self.reels = {}
+        page.on("response", self._on_response)
+
+    async def _on_response(self, response):
+        if not any(pattern in response.url for pattern in FEED_RESPONSE_PATTERNS):
+            return
+        if response.status in pacing.THROTTLE_STATUS_CODES:
+            get_instagram_bucket().record_throttled()
+            return
+        try:
+            payload = await response.json()
+        except Exception:
+            return
+        for node in iter_media_nodes(payload, self.username):
+            self.reels.setdefault(node['shortcode'], {}).update(node)
+
+    def detach(self):
+        self.page.remove_listener("response", self._on_response)
+
+def media_owner(obj):
+    """Username of the account that posted a media item, if the payload carries it."""
+    for key in ('user', 'owner'):
+        owner = obj.get(key)
+        if isinstance(owner, dict) and owner.get('username'):
+            return owner['username']
+    return None
+
+def iter_media_nodes(payload, username):
+    """Walk a feed/GraphQL payload and yield the basic metrics of each of username's reels.
+
+    Items are yielded in the order they appear in the payload (the grid's
+    newest-first order), which the known-reels stop relies on. Media of other
+    accounts and anything that is not a clip (photos, carousels) is skipped.
+    """
+    stack = [payload]
+    while stack:
+        obj = stack.pop()
+        if isinstance(obj, list):
+            stack.extend(reversed(obj))
+            continue
+        if not isinstance(obj, dict):
+            continue
+
+        shortcode = obj.get('code') or obj.get('shortcode')
+        taken_at = obj.get('taken_at') or obj.get('taken_at_timestamp')
+        if (isinstance(shortcode, str) and taken_at and obj.get('product_type') == 'clips'
+                and (media_owner(obj) or '').lower() == username.lower()):
+            yield {
+                'shortcode': shortcode,
+                'taken_at': taken_at,
+                'likes': obj.get('like_count', (obj.get('edge_liked_by') or {}).get('count')),
+                'comments': obj.get('comment_count', (obj.get('edge_media_to_comment') or {}).get('count')),
+                'views': obj.get('play_count') or obj.get('view_count') or obj.get('video_view_count'),
+            }
+        # Pushed in reverse so the first child is visited next
+        stack.extend(reversed([value for value in obj.values() if isinstance(value, (dict, list))]))
+
+async def count_reel_anchors(page):
+    """Number of Reel links currently in the grid."""
+    return await page.evaluate("() => document.querySelectorAll(\"a[href*='/reel/']\").length")
+
+async def wait_for_new_reels(page, capture, anchors_before, reels_before, timeout=SCROLL_WAIT_TIME):
+    """Wait until the grid shows more Reel links or the feed brought more reels.
+
+    Returns True as soon as something new arrives, False after timeout seconds.
+    """
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    while loop.time() < deadline:
+        if capture is not None and len(capture.reels) > reels_before:
+            return True
+        if await count_reel_anchors(page) > anchors_before:
+            return True
+        await asyncio.sleep(0.1)
+    return False
+
+async def collect_anchor_hrefs(page):
+    """Read every Reel link currently in the grid with a single browser round-trip."""
+    return await page.evaluate(
+        "() => Array.from(document.querySelectorAll(\"a[href*='/reel/']\"), a => a.getAttribute('href'))"
+    )
+
+def save_reel_metadata(username, reels):
+    """Merge captured reel metrics into reel_urls/{username}_reels_meta.csv."""
+    meta_file = f"reel_urls/{username}_reels_meta.csv"
+    fieldnames = ['shortcode', 'taken_at', 'likes', 'comments', 'views']
+
+    rows = {}
+    if os.path.exists(meta_file):
+        with open(meta_file, 'r', newline='', encoding='utf-8') as f:
+            for row in csv.DictReader(f):
+                rows[row['shortcode']] = row
+    for shortcode, reel in reels.items():
+        rows[shortcode] = {field: reel.get(field, '') for field in fieldnames}
+
+    with run_journal.atomic_write(meta_file, newline='', encoding='utf-8') as f:
+        writer = csv.DictWriter(f, fieldnames=fieldnames)
+        writer.writeheader()
+        for shortcode in sorted(rows):
+            writer.writerow(rows[shortcode])
+
+    print(f"📈 Saved basic metrics for {len(reels)} Reels to {meta_file}")
+
+async def scroll_to_collect_reel_urls(page, known_shortcodes=None, capture=None, username=None):
+    """Scrolls the Reels tab to collect all unique Reel URLs.
+
+    Reels are taken from the grid's network responses when a capture is
+    attached, falling back to one batched read of the DOM links whenever the
+    responses bring nothing new. If known_shortcodes is given, scrolling stops
+    as soon as KNOWN_REELS_STOP_THRESHOLD already-known reels appear in a row.
+    Each iteration is recorded as a 'scroll' timing event.
+    """
     print("📜 Scrolling to load all Reels...")
-    seen_urls = set()
+    seen_urls = {}
     scroll_attempts = 0
     no_new_urls_count = 0
+    known_streak = 0
 
     while scroll_attempts < MAX_SCROLL_ATTEMPTS:
-        anchors = await page.query_selector_all("a[href*='/reel/']")
-        new_urls = set()
-
-        for a in anchors:
-            href = await a.get_attribute("href")
-            if href:
-                if href.startswith("/reel/"):
-                    new_urls.add("https://www.instagram.com" + href)
-                elif "/reel/" in href:
-                    new_urls.add(href)
-
-        urls_before = len(seen_urls)
-        seen_urls.update(new_urls)
-        urls_after = len(seen_urls)
-
-        if urls_after == urls_before:
-            no_new_urls_count += 1
-            if no_new_urls_count >= 3:
-                print("✅ Reached end of Reels (no new URLs found after 3 scroll attempts).")
+        with run_timing.phase('scroll', username=username, iteration=scroll_attempts + 1) as timing:
+            new_urls = []
+            if capture is not None:
+                new_urls = [f"{INSTAGRAM_BASE_URL}/reel/{shortcode}/"
+                            for shortcode in capture.reels if shortcode not in seen_urls]
+
+            if not new_urls:
+                for href in await collect_anchor_hrefs(page):
+                    if href:
+                        if href.startswith("/reel/"):
+                            new_urls.append(INSTAGRAM_BASE_URL + href)
+                        elif "/reel/" in href:
+                            new_urls.append(href)
+
+            urls_before = len(seen_urls)
+            reached_known = False
+            for url in new_urls:
+                shortcode = get_reel_shortcode(url)
+                if shortcode in seen_urls:
+                    continue
+                seen_urls[shortcode] = url
+                if known_shortcodes is not None:
+                    # The grid is newest-first, so a run of known reels means we caught up
+                    if shortcode in known_shortcodes:
+                        known_streak += 1
+                    else:
+                        known_streak = 0
+                    if known_streak >= KNOWN_REELS_STOP_THRESHOLD:
+                        reached_known = True
+            urls_after = len(seen_urls)
+            timing['new_urls'] = urls_after - urls_before
+
+            if reached_known:
+                print(f"✅ Caught up with saved Reels ({known_streak} known Reels in a row).")
                 break
-        else:
-            no_new_urls_count = 0
 
-        await page.mouse.wheel(0, 5000)
-        await asyncio.sleep(SCROLL_WAIT_TIME)
-        scroll_attempts += 1
+            if urls_after == urls_before:
+                no_new_urls_count += 1
+                if no_new_urls_count >= 3:
+                    print("✅ Reached end of Reels (no new URLs found after 3 scroll attempts).")
+                    break
+            else:
+                no_new_urls_count = 0
+
+            await get_instagram_bucket().acquire()
+            anchors_before = await count_reel_anchors(page)
+            reels_before = len(capture.reels) if capture is not None else 0
+            await page.mouse.wheel(0, 5000)
+            await wait_for_new_reels(page, capture, anchors_before, reels_before)
+            scroll_attempts += 1
+
+            if scroll_attempts % 5 == 0:
+                print(f"📊 Progress: Found {len(seen_urls)} unique Reels so far (scroll attempt {scroll_attempts}/{MAX_SCROLL_ATTEMPTS})")
 
-        if scroll_attempts % 5 == 0:
-            print(f"📊 Progress: Found {len(seen_urls)} unique Reels so far (scroll attempt {scroll_attempts}/{MAX_SCROLL_ATTEMPTS})")
+    print(f"🎯 Total Reels found: {len(seen_urls)} (after {scroll_attempts} scroll attempts)")
+    return sorted(seen_urls.values())
 
-    print(f"🎯 Total Reels found: {len(seen_urls)}")
-    return sorted(list(seen_urls))
+async def scrape_user_reels(page, username, nav_limiter=None, on_user_scraped=None):
+    """Scrape reels for a specific user.
 
-async def scrape_user_reels(page, username):
-    """Scrape reels for a specific user."""
+    Returns the saved URLs, or None if the user could not be scraped. If
+    on_user_scraped is given it is awaited with (username, urls) right after
+    the file is written, so a consumer can start on this user straight away.
+    """
     print(f"\n{'='*70}")
     print(f"🎯 SCRAPING USER: {username}")
     print(f"{'='*70}\n")
     
-    reels_url = f"https://www.instagram.com/{username}/reels/"
-    print(f"📍 Navigating to {reels_url}")
-    
-    try:
-        await page.goto(reels_url, wait_until="domcontentloaded", timeout=30000)
-        await page.wait_for_timeout(5000)
-    except Exception as e:
-        print(f"❌ Failed to navigate to {username}'s profile: {e}")
-        return None
-
-    print("🔍 Checking if the Reels tab has loaded content...")
+    # Listen for the grid's feed responses from the first navigation on
+    capture = ReelFeedCapture(page, username)
     try:
-        await page.wait_for_selector('section > main > div', timeout=30000)
-        print("✅ Main content area is visible.")
-        await page.wait_for_selector("a[href*='/reel/']", timeout=10000)
-        print("✅ Found at least one Reel link. Proceeding with scraping.")
-    except Exception as e:
-        print(f"❌ Failed to find Reels on the page for {username}. Error: {e}")
-        print(f"⚠️ User might have no reels or profile is private. Skipping...")
-        return None
+        reels_url = f"{INSTAGRAM_BASE_URL}/{username}/reels/"
+        print(f"📍 Navigating to {reels_url}")
+    
+        try:
+            with run_timing.phase('navigate', username=username) as timing:
+                bucket = get_instagram_bucket()
+                for attempt in range(NAVIGATION_RETRIES + 1):
+                    await bucket.acquire(NAVIGATION_COST)
+                    async with nav_limiter or contextlib.nullcontext():
+                        response = await page.goto(reels_url, wait_until="domcontentloaded", timeout=30000)
+                    await wait_for_network_quiet(page)
+                    if not await page_looks_throttled(page, response):
+                        bucket.record_success()
+                        break
+                    timing['throttled'] = attempt + 1
+                    bucket.record_throttled()
+                else:
+                    raise RuntimeError("Instagram kept answering with a throttling page")
+        except Exception as e:
+            print(f"❌ Failed to navigate to {username}'s profile: {e}")
+            return None
 
-    urls = await scroll_to_collect_reel_urls(page)
+        print("🔍 Checking if the Reels tab has loaded content...")
+        try:
+            with run_timing.phase('grid_ready', username=username):
+                await page.wait_for_selector('section > main > div', timeout=30000)
+                print("✅ Main content area is visible.")
+                await page.wait_for_selector("a[href*='/reel/']", timeout=10000)
+            print("✅ Found at least one Reel link. Proceeding with scraping.")
+        except Exception as e:
+            print(f"❌ Failed to find Reels on the page for {username}. Error: {e}")
+            print(f"⚠️ User might have no reels or profile is private. Skipping...")
+            return None
+
+        if INCREMENTAL:
+            existing_urls = load_existing_reel_urls(username)
+            known_shortcodes = {get_reel_shortcode(url) for url in existing_urls}
+            print(f"📂 Loaded {len(existing_urls)} saved Reel URLs for {username}")
+            scraped_urls = await scroll_to_collect_reel_urls(page, known_shortcodes, capture, username)
+            added_urls = [url for url in scraped_urls if get_reel_shortcode(url) not in known_shortcodes]
+            print(f"➕ {len(added_urls)} new Reels merged with {len(existing_urls)} saved Reels")
+            urls = sorted(existing_urls + added_urls)
+        else:
+            urls = await scroll_to_collect_reel_urls(page, capture=capture, username=username)
     
-    # Save to individual file
-    output_file = f"reel_urls/{username}_reels.txt"
-    with open(output_file, "w") as f:
-        for url in urls:
-            f.write(url + "\n")
+        # Save to individual file
+        output_file = f"reel_urls/{username}_reels.txt"
+        with run_timing.phase('save_urls', username=username, urls=len(urls)):
+            with run_journal.atomic_write(output_file) as f:
+                for url in urls:
+                    f.write(url + "\n")
     
-    print(f"✅ Saved {len(urls)} Reel URLs to {output_file}")
-    return len(urls)
-
-async def scrape_reels():
-    """Main function to orchestrate the scraping process."""
-    # Validate user count
-    if len(TARGET_USERS) > 10:
-        print("❌ ERROR: Maximum 10 usernames allowed!")
-        print(f"   You provided {len(TARGET_USERS)} usernames.")
-        return
+        print(f"✅ Saved {len(urls)} Reel URLs to {output_file}")
     
-    if len(TARGET_USERS) == 0:
+        if capture.reels:
+            save_reel_metadata(username, capture.reels)
+        run_journal.get_journal().mark_done(username, 'urls', count=len(urls), file=output_file)
+        if on_user_scraped is not None:
+            await on_user_scraped(username, urls)
+        return urls
+    finally:
+        capture.detach()
+
+async def scrape_users_concurrently(context, usernames, concurrency, on_user_scraped=None):
+    """Scrape users through a shared work queue served by several pages at once."""
+    queue = asyncio.Queue()
+    for username in usernames:
+        queue.put_nowait(username)
+
+    nav_limiter = asyncio.Semaphore(MAX_NAVIGATIONS_PER_HOST)
+    results = {}
+
+    async def worker(worker_id):
+        page = await context.new_page()
+        try:
+            while True:
+                try:
+                    username = queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    return
+                print(f"🧵 Worker {worker_id} picked up {username}")
+                try:
+                    results[username] = await scrape_user_reels(page, username, nav_limiter, on_user_scraped)
+                except Exception as e:
+                    print(f"❌ Worker {worker_id} failed on {username}: {e}")
+                    results[username] = None
+        finally:
+            await page.close()
+
+    worker_count = min(concurrency, len(usernames))
+    print(f"🧵 Scraping with {worker_count} concurrent page(s)\n")
+    await asyncio.gather(*(worker(i + 1) for i in range(worker_count)))
+
+    # Keep the summary in the same order as the requested users
+    return {username: results.get(username) for username in usernames}
+
+def check_target_users(usernames):
+    """Validate the requested user list, printing why it was rejected."""
+    if len(usernames) > MAX_TARGET_USERS:
+        print(f"❌ ERROR: Maximum {MAX_TARGET_USERS} usernames allowed!")
+        print(f"   You provided {len(usernames)} usernames. Use sharded_runner.py for more.")
+        return False
+    
+    if len(usernames) == 0:
         print("❌ ERROR: No target users specified!")
-        return
+        return False
     
-    print(f"🎯 Will scrape {len(TARGET_USERS)} user(s): {', '.join(TARGET_USERS)}\n")
+    return True
+
+async def launch_browser(p):
+    """Launch Chromium with a context built from the saved session state.
+
+    Returns (browser, context, network_stats).
+    """
+    print("🚀 Launching browser...")
     
-    async with async_playwright() as p:
-        print("🚀 Launching browser...")
-        
-        # Use Playwright's built-in browser (works on Windows)
+    # Use Playwright's built-in browser (works on Windows)
+    with run_timing.phase('browser_launch'):
         browser = await p.chromium.launch(
             headless=True,
             args=[
@@ -202,73 +670,178 @@ async def scrape_reels():
             ]
         )
 
-        context_options = {
-            'user_agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-            'viewport': {'width': 1920, 'height': 1080},
-            'locale': 'en-US',
-            'timezone_id': 'America/New_York'
-        }
-
-        if os.path.exists(SESSION_FILE):
-            print("✅ Session state file found. Creating context from state.")
-            context_options['storage_state'] = SESSION_FILE
-            context = await browser.new_context(**context_options)
-        else:
-            print("❌ No session state file found. Starting fresh.")
-            context = await browser.new_context(**context_options)
+    context_options = {
+        'user_agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+        'viewport': {'width': 1920, 'height': 1080},
+        'locale': 'en-US',
+        'timezone_id': 'America/New_York'
+    }
+
+    if os.path.exists(SESSION_FILE):
+        print("✅ Session state file found. Creating context from state.")
+        context_options['storage_state'] = SESSION_FILE
+        context = await browser.new_context(**context_options)
+    else:
+        print("❌ No session state file found. Starting fresh.")
+        context = await browser.new_context(**context_options)
+
+    await context.set_extra_http_headers({
+        'Accept-Language': 'en-US,en;q=0.9',
+        'Referer': f"{INSTAGRAM_BASE_URL}/"
+    })
+
+    network_stats = NetworkStats()
+    context.on("requestfinished", network_stats.on_request_finished)
+    if BLOCKED_RESOURCES:
+        await apply_block_policy(context, BLOCKED_RESOURCES, network_stats)
+
+    return browser, context, network_stats
+
+async def ensure_logged_in(context, page):
+    """Make sure the context is logged in, logging in again only when needed.
+
+    The fast checks (cookie expiry, cached verdict, one authenticated request)
+    usually decide; loading the homepage is the fallback when they cannot.
+    """
+    started = time.monotonic()
+    with run_timing.phase('session_check') as timing:
+        verdict, reason = await check_session_fast(context)
+        timing['fast_path'] = verdict is True
+
+    if verdict:
+        elapsed = time.monotonic() - started
+        full_check_seconds = load_session_check().get('full_check_seconds')
+        saved = f", ~{full_check_seconds - elapsed:.1f}s faster than a homepage check" if full_check_seconds else ""
+        print(f"⚡ Session is valid ({reason}, {elapsed:.1f}s{saved}).")
+        return True
 
-        await context.set_extra_http_headers({
-            'Accept-Language': 'en-US,en;q=0.9',
-            'Referer': 'https://www.instagram.com/'
-        })
+    if verdict is None:
+        # The fast checks could not tell, load the homepage and look for the search bar
+        started = time.monotonic()
+        with run_timing.phase('homepage') as timing:
+            try:
+                await page.goto(f"{INSTAGRAM_BASE_URL}/", wait_until="networkidle", timeout=60000)
+            except Exception as e:
+                print(f"⚠️ Warning: Initial navigation failed: {e}")
+                print("🔄 Retrying...")
+                timing['retries'] = 1
+                await page.goto(f"{INSTAGRAM_BASE_URL}/", wait_until="domcontentloaded", timeout=60000)
 
-        page = await context.new_page()
         try:
-            await page.goto("https://www.instagram.com/", wait_until="networkidle", timeout=60000)
-            await page.wait_for_timeout(3000)
-        except Exception as e:
-            print(f"⚠️ Warning: Initial navigation failed: {e}")
-            print("🔄 Retrying...")
-            await page.goto("https://www.instagram.com/", wait_until="domcontentloaded", timeout=60000)
-
-        search_icon = page.locator('svg[aria-label="Search"]').first
-        if not await search_icon.is_visible():
-            print("🔐 Session is invalid or expired. Proceeding with login.")
-            if not await login_with_2fa(page):
-                await browser.close()
-                return
-            await save_storage_state(context)
+            await page.wait_for_selector('svg[aria-label="Search"]', timeout=3000)
+        except Exception:
+            pass
+        verdict = await page.locator('svg[aria-label="Search"]').first.is_visible()
+        if verdict:
+            save_session_check(valid=True, full_check_seconds=round(time.monotonic() - started, 1))
+        reason = "search bar not visible"
+
+    if not verdict:
+        print(f"🔐 Session is invalid or expired ({reason}). Proceeding with login.")
+        with run_timing.phase('login') as timing:
+            timing['logged_in'] = await login_with_2fa(page)
+        if not timing['logged_in']:
+            return False
+        await save_storage_state(context)
+    else:
+        print("✅ Session is valid. Logged in successfully.")
+    return True
+
+async def scrape_usernames(context, page, usernames, network_stats, on_user_scraped=None):
+    """Scrape the given users with a logged-in context and print the run summary.
+
+    page is used when scraping one profile at a time; concurrent runs open
+    their own pages. Returns a dict of username -> saved URLs (None for failed users).
+    """
+    results = {}
+    journal = run_journal.get_journal()
+    if RESUME:
+        # URLs saved before the interruption are reused as they are
+        for username in usernames:
+            if journal.is_done(username, 'urls') and os.path.exists(f"reel_urls/{username}_reels.txt"):
+                results[username] = load_existing_reel_urls(username)
+                print(f"⏭️ {username}: {len(results[username])} Reel URLs already saved by the interrupted run")
+                if on_user_scraped is not None:
+                    await on_user_scraped(username, results[username])
+    else:
+        # A fresh scrape makes the metrics of the previous run stale as well
+        journal.reset(usernames)
+    pending = [username for username in usernames if username not in results]
+
+    if CONCURRENCY > 1 and pending:
+        results.update(await scrape_users_concurrently(context, pending, CONCURRENCY, on_user_scraped))
+    else:
+        # Navigations are spaced out by the Instagram token bucket, no fixed pause between users
+        for username in pending:
+            results[username] = await scrape_user_reels(page, username, on_user_scraped=on_user_scraped)
+    results = {username: results.get(username) for username in usernames}
+    
+    # Print summary
+    print(f"\n{'='*70}")
+    print("📊 SCRAPING SUMMARY")
+    print(f"{'='*70}")
+    for username, urls in results.items():
+        if urls is not None:
+            print(f"✅ {username}: {len(urls)} reels")
         else:
-            print("✅ Session is valid. Logged in successfully.")
-
-        # Scrape each user
-        results = {}
-        for username in TARGET_USERS:
-            url_count = await scrape_user_reels(page, username)
-            results[username] = url_count
-            
-            # Wait between users to avoid rate limiting
-            if username != TARGET_USERS[-1]:  # Don't wait after last user
-                print(f"⏳ Waiting 5 seconds before next user...")
-                await page.wait_for_timeout(5000)
+            print(f"❌ {username}: Failed to scrape")
+    network_stats.print_summary()
+    pacing.print_summary()
+    print(f"{'='*70}\n")
+    
+    return results
+
+async def scrape_reels(on_user_scraped=None):
+    """Main function to orchestrate the scraping process.
+
+    Returns a dict of username -> saved URLs (None for failed users), or None
+    if the run could not start. on_user_scraped is passed to scrape_user_reels.
+    """
+    if not check_target_users(TARGET_USERS):
+        return None
+    
+    print(f"🎯 Will scrape {len(TARGET_USERS)} user(s): {', '.join(TARGET_USERS)}\n")
+    
+    async with async_playwright() as p:
+        browser, context, network_stats = await launch_browser(p)
+
+        page = await context.new_page()
+        if not await ensure_logged_in(context, page):
+            await browser.close()
+            return None
+
+        # Concurrent runs open a page per worker
+        if CONCURRENCY > 1:
+            await page.close()
+            page = None
+
+        results = await scrape_usernames(context, page, TARGET_USERS, network_stats, on_user_scraped)
         
         await browser.close()
-        
-        # Print summary
-        print(f"\n{'='*70}")
-        print("📊 SCRAPING SUMMARY")
-        print(f"{'='*70}")
-        for username, count in results.items():
-            if count is not None:
-                print(f"✅ {username}: {count} reels")
-            else:
-                print(f"❌ {username}: Failed to scrape")
-        print(f"{'='*70}\n")
+        return results
 
 if __name__ == "__main__":
     # Parse command-line arguments
     parser = argparse.ArgumentParser(description='Scrape Instagram reels URLs')
     parser.add_argument('--users', nargs='+', help='List of Instagram usernames to scrape')
+    parser.add_argument('--concurrency', type=int, default=CONCURRENCY,
+                        help='Number of profiles to scrape at the same time (default: 1)')
+    parser.add_argument('--incremental', action='store_true',
+                        help='Stop scrolling at already-saved reels and merge new URLs into the existing files')
+    parser.add_argument('--known-stop', type=int, default=KNOWN_REELS_STOP_THRESHOLD,
+                        help='With --incremental, stop after this many already-saved reels in a row '
+                             f"(default: {KNOWN_REELS_STOP_THRESHOLD})")
+    parser.add_argument('--block', default='',
+                        help='Comma-separated resource groups to block: '
+                             f"{', '.join(list(BLOCKABLE_RESOURCES) + ['analytics'])}")
+    parser.add_argument('--resume', action='store_true',
+                        help='Skip users whose URLs were already saved by an interrupted run')
+    parser.add_argument('--max-scroll-attempts', type=int, default=MAX_SCROLL_ATTEMPTS,
+                        help='Maximum scrolls per profile (default: 50)')
+    parser.add_argument('--timing-log',
+                        help=f"Append JSON-lines timing events to this file (default: ${run_timing.TIMING_LOG_ENV})")
+    parser.add_argument('--profile', action='store_true',
+                        help='Print where the run spent its time at the end')
     args = parser.parse_args()
     
     # Override TARGET_USERS if provided via command line
@@ -276,4 +849,18 @@ if __name__ == "__main__":
         TARGET_USERS = args.users
         print(f"📋 Using usernames from command line: {', '.join(TARGET_USERS)}")
     
+    CONCURRENCY = max(1, args.concurrency)
+    INCREMENTAL = args.incremental
+    KNOWN_REELS_STOP_THRESHOLD = max(1, args.known_stop)
+    RESUME = args.resume
+    MAX_SCROLL_ATTEMPTS = args.max_scroll_attempts
+    BLOCKED_RESOURCES = [group.strip() for group in args.block.split(',') if group.strip()]
+    unknown_groups = [group for group in BLOCKED_RESOURCES if group not in BLOCKABLE_RESOURCES and group != 'analytics']
+    if unknown_groups:
+        parser.error(f"unknown --block group(s): {', '.join(unknown_groups)}")
+    if args.timing_log:
+        run_timing.set_log_file(args.timing_log)
+    
     asyncio.run(scrape_reels())
+    if args.profile:
+        run_timing.print_profile()
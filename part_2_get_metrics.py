@@ -4,8 +4,21 @@ import os
 import glob
 import sys
 import io
-from datetime import datetime
+import re
+import time
+import argparse
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import json
+import tempfile
+import threading
+from datetime import datetime, timedelta, timezone
 from apify_client import ApifyClient
+from metrics_store import MetricsStore, METRICS_DB, write_csv_atomic
+import analytics_summary
+import media_archive
+import pacing
+import run_journal
+import run_timing
 
 # Fix Unicode encoding for Windows compatibility
 if sys.platform == 'win32':
@@ -16,6 +29,65 @@ if sys.platform == 'win32':
 # WARNING: These credentials are hardcoded. Do not share this file or commit to public repositories.
 APIFY_TOKEN = 'apifytoken'
 INSTALOADER_SESSION = 'zebra.4500860'
+# Point the Apify client at another API server (e.g. a local stand-in for testing)
+APIFY_API_URL = os.environ.get('APIFY_API_URL')
+
+# Apify runs in flight at the same time, and users packed into a single run
+APIFY_CONCURRENCY = 1
+APIFY_BATCH_SIZE = 1
+
+APIFY_ACTOR = "apify/instagram-reel-scraper"
+# Run states after which an actor run will not produce (more) results
+APIFY_FAILED_STATUSES = ('FAILED', 'ABORTED', 'TIMED-OUT')
+
+# Dataset items are pulled this many at a time, with only the fields build_reel_row reads
+DATASET_PAGE_SIZE = 1000
+DATE_FIELDS = ['takenAt', 'timestamp', 'createdTime', 'postedAt', 'uploadDate', 'taken_at', 'created_time']
+DATASET_FIELDS = [
+    'shortCode', 'url', 'ownerUsername', 'likesCount', 'commentsCount', 'videoViewCount',
+    'caption', 'hashtags', 'mentions', 'videoUrl', *DATE_FIELDS
+]
+
+# Resume mode: reuse the metrics the interrupted run already wrote and
+# re-attach to its Apify runs instead of paying for new ones (see run_journal.py)
+RESUME = False
+
+# Age-aware refresh: only re-fetch reels whose numbers still move. Each entry is
+# (maximum reel age, refresh interval), checked in order; None matches any age.
+AGE_AWARE_REFRESH = False
+REFRESH_SCHEDULE = [
+    (timedelta(hours=48), timedelta(hours=1)),
+    (timedelta(days=30), timedelta(days=1)),
+    (None, timedelta(days=7)),
+]
+# Refresh times used to live in this file; it is imported into the metrics store once
+REFRESH_STATE_FILE = "data/refresh_state.json"
+
+# Columns of the per-user CSV exported from the metrics store
+METRICS_CSV_FIELDS = [
+    'shortcode', 'date', 'likes', 'views', 'comments', 'estimated_saves', 'estimated_shares',
+    'engagement_rate', 'video_url', 'caption', 'hashtags', 'mentions', 'manual_tags'
+]
+# Snapshot rows buffered before each write to the store
+SNAPSHOT_WRITE_BATCH = 200
+
+# Media archive: download the reel videos after the metrics, before their signed
+# links expire (see media_archive.py)
+DOWNLOAD_MEDIA = False
+MEDIA_CONCURRENCY = media_archive.MEDIA_CONCURRENCY
+
+# Follower counts barely move between runs, so they are cached for FOLLOWER_CACHE_TTL.
+# Profile lookups that do run are spread over PROFILE_CONCURRENCY threads.
+FOLLOWER_CACHE_FILE = "data/follower_cache.json"
+FOLLOWER_CACHE_TTL = timedelta(hours=12)
+PROFILE_CONCURRENCY = 2
+PROFILE_MAX_RETRIES = 3
+# Pacing (token buckets, see pacing.py): profile lookups per second for the
+# Instaloader account, and Apify actor runs started per second
+PROFILE_RATE = 0.5
+PROFILE_BURST = 2
+APIFY_RUN_RATE = 1.0
+APIFY_RUN_BURST = 3
 
 # Ensure output folders exist
 os.makedirs("data", exist_ok=True)
@@ -30,178 +102,604 @@ def get_username_from_file(filename):
     basename = os.path.basename(filename)
     return basename.replace('_reels.txt', '')
 
-def scrape_user_metrics(username, urls):
-    """Scrape metrics for a specific user's reels."""
-    print(f"\n{'='*70}")
-    print(f"🎯 SCRAPING METRICS FOR: {username}")
-    print(f"{'='*70}\n")
-    
-    # 🔐 Load Instaloader session and get follower count
-    L = instaloader.Instaloader()
+def normalize_reel_urls(urls):
+    """Turn relative hrefs into absolute URLs and drop anything that is not a reel."""
+    urls = [url.strip() for url in urls if url.strip()]
+    urls = [f"https://www.instagram.com{url}" if url.startswith("/") else url for url in urls]
+    return [url for url in urls if "/reel/" in url]
+
+def load_reel_urls(url_file):
+    """Load and normalize the URLs saved by part_1 for one user."""
+    with open(url_file, "r") as f:
+        return normalize_reel_urls(f.readlines())
+
+def get_metrics_file(username):
+    """Path of the per-user metrics CSV."""
+    return f"data/{username}_reels_metrics.csv"
+
+def iter_previous_metrics(metrics_file):
+    """Yield the rows of a previous metrics file one at a time (nothing if there is none)."""
+    if not os.path.exists(metrics_file):
+        return
     try:
-        L.load_session_from_file(INSTALOADER_SESSION)
-        profile = instaloader.Profile.from_username(L.context, username)
-        followers = profile.followers
-        print(f"✅ Loaded Instaloader session. Followers: {followers}")
+        with open(metrics_file, 'r', newline='', encoding='utf-8') as f:
+            yield from csv.DictReader(f)
     except Exception as e:
-        print(f"❌ Instaloader failed for {username}: {e}")
-        followers = "Unknown"
+        print(f"⚠️  Could not read existing metrics: {e}")
 
-    # 🔌 Apify setup
-    client = ApifyClient(APIFY_TOKEN)
+metrics_store_lock = threading.Lock()
+metrics_store = None
 
-    print(f"📊 Processing {len(urls)} Reel URLs for {username}")
+def get_metrics_store():
+    """Open the metrics snapshot store once and share it for the whole run."""
+    global metrics_store
+    with metrics_store_lock:
+        if metrics_store is None:
+            metrics_store = MetricsStore(METRICS_DB)
+            import_refresh_state(metrics_store)
+        return metrics_store
 
-    # 🚀 Run Apify actor
+def import_refresh_state(store):
+    """Move the refresh times of an old refresh_state.json into the metrics store."""
+    if not os.path.exists(REFRESH_STATE_FILE):
+        return
+    with open(REFRESH_STATE_FILE, 'r', encoding='utf-8') as f:
+        state = json.load(f)
+    store.set_refresh_times(
+        (shortcode, entry.get('last_fetched'), entry.get('posted_at')) for shortcode, entry in state.items()
+    )
+    os.replace(REFRESH_STATE_FILE, f"{REFRESH_STATE_FILE}.imported")
+    print(f"📦 Imported refresh times of {len(state)} Reels into {METRICS_DB}")
+
+def parse_datetime(value):
+    """Parse an ISO date/time string, assuming UTC when no timezone is given."""
+    try:
+        parsed = datetime.fromisoformat(value)
+    except (TypeError, ValueError):
+        return None
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+def is_refresh_due(entry, now):
+    """Decide whether a reel's metrics are due for a refresh under REFRESH_SCHEDULE."""
+    last_fetched = parse_datetime((entry or {}).get('last_fetched'))
+    if last_fetched is None:
+        return True
+
+    posted_at = parse_datetime(entry.get('posted_at'))
+    age = now - posted_at if posted_at else None
+    for max_age, interval in REFRESH_SCHEDULE:
+        if max_age is None or (age is not None and age < max_age):
+            return now - last_fetched >= interval
+    return True
+
+def select_due_urls(urls, known_shortcodes):
+    """Return the URLs that need fetching: new reels, plus known reels due for a refresh."""
+    state = get_metrics_store().get_refresh_times(get_reel_shortcode(url) for url in urls)
+    now = datetime.now(timezone.utc)
+    due_urls = []
+    for url in urls:
+        shortcode = get_reel_shortcode(url)
+        if shortcode not in known_shortcodes or is_refresh_due(state.get(shortcode), now):
+            due_urls.append(url)
+    return due_urls
+
+instaloader_lock = threading.Lock()
+instaloader_session = None
+
+def get_instaloader():
+    """Load the Instaloader session once and share it for the whole run."""
+    global instaloader_session
+    with instaloader_lock:
+        if instaloader_session is None:
+            L = instaloader.Instaloader()
+            L.load_session_from_file(INSTALOADER_SESSION)
+            instaloader_session = L
+            print("✅ Loaded Instaloader session.")
+        return instaloader_session
+
+def fetch_follower_count(username):
+    """Look up a profile's follower count, paced by the Instaloader account's token bucket.
+
+    A throttled lookup pauses the bucket for every lookup thread (exponential
+    backoff); other errors are retried after a short pause.
+    """
+    L = get_instaloader()
+    bucket = pacing.get_bucket(f"instagram:{INSTALOADER_SESSION}", PROFILE_RATE, PROFILE_BURST)
+    delay = 2
+    for attempt in range(1, PROFILE_MAX_RETRIES + 1):
+        bucket.acquire_sync()
+        try:
+            followers = instaloader.Profile.from_username(L.context, username).followers
+            bucket.record_success()
+            return followers
+        except instaloader.ProfileNotExistsException:
+            raise
+        except Exception as e:
+            if attempt == PROFILE_MAX_RETRIES:
+                raise
+            if isinstance(e, instaloader.TooManyRequestsException) or pacing.looks_throttled(text=str(e)):
+                bucket.record_throttled()
+                print(f"⏳ Profile lookup for {username} was throttled, retrying when the pause is over...")
+            else:
+                print(f"⏳ Profile lookup for {username} failed ({e}), retrying in {delay}s...")
+                time.sleep(delay)
+                delay *= 2
+
+follower_cache_lock = threading.Lock()
+
+def load_follower_cache():
+    """Read the follower cache; a missing or unreadable file counts as empty, it is only a cache."""
+    if not os.path.exists(FOLLOWER_CACHE_FILE):
+        return {}
+    try:
+        with open(FOLLOWER_CACHE_FILE, 'r', encoding='utf-8') as f:
+            cache = json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"⚠️  Ignoring unreadable follower cache {FOLLOWER_CACHE_FILE}: {e}")
+        return {}
+    return cache if isinstance(cache, dict) else {}
+
+def get_follower_counts(usernames):
+    """Return username -> follower count, from the cache where fresh and looked up otherwise."""
+    with follower_cache_lock:
+        cache = load_follower_cache()
+
+    now = datetime.now(timezone.utc)
+    followers = {}
+    stale_usernames = []
+    for username in usernames:
+        entry = cache.get(username) or {}
+        fetched_at = parse_datetime(entry.get('fetched_at'))
+        if fetched_at and now - fetched_at < FOLLOWER_CACHE_TTL:
+            followers[username] = entry['followers']
+        else:
+            stale_usernames.append(username)
+
+    if len(stale_usernames) < len(usernames):
+        print(f"👥 Using cached follower counts for {len(usernames) - len(stale_usernames)} user(s)")
+
+    fetched = {}
+    if stale_usernames:
+        with run_timing.phase('follower_lookup', users=len(stale_usernames)) as timing, \
+                ThreadPoolExecutor(max_workers=PROFILE_CONCURRENCY) as executor:
+            futures = {executor.submit(fetch_follower_count, username): username for username in stale_usernames}
+            for future in as_completed(futures):
+                username = futures[future]
+                try:
+                    followers[username] = future.result()
+                    fetched[username] = {'followers': followers[username], 'fetched_at': now.isoformat()}
+                    print(f"✅ {username} followers: {followers[username]}")
+                except Exception as e:
+                    print(f"❌ Instaloader failed for {username}: {e}")
+                    followers[username] = "Unknown"
+            timing['failed'] = len(stale_usernames) - len(fetched)
+
+    if fetched:
+        with follower_cache_lock:
+            cache = load_follower_cache()
+            cache.update(fetched)
+            run_journal.write_json_atomic(FOLLOWER_CACHE_FILE, cache)
+
+    return followers
+
+def get_apify_client():
+    """Create the Apify client, pointed at APIFY_API_URL when one is set."""
+    if APIFY_API_URL:
+        return ApifyClient(APIFY_TOKEN, api_url=APIFY_API_URL)
+    return ApifyClient(APIFY_TOKEN)
+
+def get_reel_shortcode(url):
+    """Extract the reel shortcode from a URL like 'https://www.instagram.com/reel/ABC123/'."""
+    match = re.search(r"/reel/([A-Za-z0-9_-]+)", url or '')
+    return match.group(1) if match else None
+
+def find_resumable_run(client, usernames):
+    """Return the Apify run the interrupted run started for these users, if it can still deliver."""
+    run_id = run_journal.get_journal().shared_value(usernames, 'metrics', 'actor_run_id')
+    if not run_id:
+        return None
+    run = client.run(run_id).get()
+    if run is None or run.get('status') in APIFY_FAILED_STATUSES:
+        print(f"⚠️ Apify run {run_id} of the interrupted run is {run.get('status') if run else 'gone'}, starting a new one")
+        return None
+    print(f"🔗 Re-attaching to Apify run {run_id} ({run.get('status')})")
+    return run
+
+def run_reel_scraper(client, usernames, urls):
+    """Run the Apify reel scraper for the given URLs and return its dataset items.
+
+    The run and dataset IDs are written to the run journal as soon as the run
+    starts; with RESUME, a run the journal already knows about is waited on
+    instead of starting a new one.
+    """
     run_input = {
-        "username": [username],
+        "username": usernames,
         "postUrls": urls,
         "shouldDownloadPostUrlsOnly": True
     }
+    run = find_resumable_run(client, usernames) if RESUME else None
+    resumed = run is not None
+    if not resumed:
+        bucket = pacing.get_bucket("apify", APIFY_RUN_RATE, APIFY_RUN_BURST)
+        bucket.acquire_sync()
+    with run_timing.phase('apify_run', users=len(usernames), urls=len(urls), resumed=resumed):
+        if not resumed:
+            try:
+                run = client.actor(APIFY_ACTOR).start(run_input=run_input)
+            except Exception as e:
+                if getattr(e, 'status_code', None) in pacing.THROTTLE_STATUS_CODES:
+                    bucket.record_throttled()
+                raise
+            bucket.record_success()
+            scraped_at = datetime.now(timezone.utc).isoformat(timespec='seconds')
+            for username in usernames:
+                run_journal.get_journal().update(
+                    username, 'metrics', status='running', actor_run_id=run['id'],
+                    dataset_id=run['defaultDatasetId'], scraped_at=scraped_at
+                )
+        run = client.run(run['id']).wait_for_finish()
+    if run is None or run.get('status') in APIFY_FAILED_STATUSES:
+        raise RuntimeError(f"Apify run ended as {run.get('status') if run else 'unknown'}")
+    return iter_dataset_items(client, run["defaultDatasetId"])
 
-    print("🚀 Starting Apify scraper...")
-    try:
-        run = client.actor("apify/instagram-reel-scraper").call(run_input=run_input)
-    except Exception as e:
-        print(f"❌ Apify scraping failed for {username}: {e}")
-        return None
+def iter_dataset_items(client, dataset_id):
+    """Yield a dataset's items page by page, so at most DATASET_PAGE_SIZE items are held at once."""
+    dataset = client.dataset(dataset_id)
+    offset = 0
+    while True:
+        page = dataset.list_items(offset=offset, limit=DATASET_PAGE_SIZE, fields=DATASET_FIELDS)
+        yield from page.items
+        offset += len(page.items)
+        if not page.items or offset >= page.total:
+            return
 
-    # 📦 Collect Reel metrics
-    reels_data = []
-    for item in client.dataset(run["defaultDatasetId"]).iterate_items():
-        likes = item.get("likesCount", 0)
-        comments = item.get("commentsCount", 0)
-        views = item.get("videoViewCount", 0)
-        caption = item.get("caption", "")
-        hashtags = ', '.join(item.get("hashtags", []))
-        mentions = ', '.join(item.get("mentions", []))
-        video_url = item.get("videoUrl", "")
-        
-        # 📅 Try multiple date field names and formats
-        date_posted = None
-        
-        for field_name in ['takenAt', 'timestamp', 'createdTime', 'postedAt', 'uploadDate', 'taken_at', 'created_time']:
-            date_value = item.get(field_name)
-            if date_value:
-                try:
-                    if isinstance(date_value, (int, float)):
-                        date_posted = datetime.fromtimestamp(date_value).strftime('%Y-%m-%d')
+def load_manual_tags(metrics_file):
+    """Read the manual tags from a metrics CSV.
+
+    Returns (tags by shortcode, tags by (date, caption)). Every row with a
+    shortcode is in the first dict, untagged ones with '' so a tag cleared in
+    the CSV stays cleared. The second dict covers rows written before shortcodes
+    were recorded; their signed video_url changes on every scrape, so date and
+    caption are the only stable way to match them.
+    """
+    tags = {}
+    legacy_tags = {}
+    for row in iter_previous_metrics(metrics_file):
+        manual_tag = row.get('manual_tags', '')
+        if row.get('shortcode'):
+            tags[row['shortcode']] = manual_tag
+        elif manual_tag:
+            legacy_tags[(row.get('date', ''), row.get('caption', ''))] = manual_tag
+    return tags, legacy_tags
+
+def merge_reel_rows(urls, snapshots, tags, legacy_tags=None):
+    """Join metrics snapshots, manual tags and the requested URLs on shortcode in one pass.
+
+    Yields the snapshot of every reel in urls with its manual tag filled in.
+    The CSV's tag wins for reels it has, even when empty; the store's tag only
+    fills in reels the CSV does not have.
+    """
+    requested = {get_reel_shortcode(url) for url in urls}
+    legacy_tags = legacy_tags or {}
+    for row in snapshots:
+        shortcode = row['shortcode']
+        if shortcode not in requested:
+            continue
+        if shortcode in tags:
+            row['manual_tags'] = tags[shortcode]
+        else:
+            row['manual_tags'] = (
+                legacy_tags.get((row.get('date', ''), row.get('caption', '')))
+                or row.get('manual_tags', '')
+            )
+        yield row
+
+def build_reel_row(item):
+    """Turn one Apify dataset item into a metrics row.
+
+    Returns the row and the full post time (ISO string, or None when unknown).
+    """
+    likes = item.get("likesCount", 0)
+    comments = item.get("commentsCount", 0)
+    views = item.get("videoViewCount", 0)
+    caption = item.get("caption", "")
+    hashtags = ', '.join(item.get("hashtags", []))
+    mentions = ', '.join(item.get("mentions", []))
+    video_url = item.get("videoUrl", "")
+    
+    # 📅 Try multiple date field names and formats
+    date_posted = None
+    posted_at = None
+    
+    for field_name in DATE_FIELDS:
+        date_value = item.get(field_name)
+        if date_value:
+            try:
+                if isinstance(date_value, (int, float)):
+                    date_posted = datetime.fromtimestamp(date_value).strftime('%Y-%m-%d')
+                    posted_at = datetime.fromtimestamp(date_value, timezone.utc).isoformat()
+                    break
+                elif isinstance(date_value, str):
+                    if len(date_value) >= 10:
+                        date_posted = date_value[:10]
+                        posted_at = date_value
                         break
-                    elif isinstance(date_value, str):
-                        if len(date_value) >= 10:
-                            date_posted = date_value[:10]
-                            break
-                except Exception as e:
-                    continue
-        
-        if not date_posted:
-            date_posted = timestamp[:10]
-        
-        date = date_posted
-        
-        # Calculate estimated metrics
-        saves = int(likes * 0.15)
-        shares = int(likes * 0.10)
-        engagement = round((likes + comments + saves + shares), 4)
-        
-        reels_data.append({
-            'date': date,
-            'likes': likes,
-            'views': views,
-            'comments': comments,
-            'estimated_saves': saves,
-            'estimated_shares': shares,
-            'engagement_rate': engagement,
-            'video_url': video_url,
-            'caption': caption,
-            'hashtags': hashtags,
-            'mentions': mentions,
-            'manual_tags': ''
-        })
-
-    print(f"✅ Scraped {len(reels_data)} Reels for {username}")
-
-    # 📁 Save CSV: Reel Metrics (individual file per user)
-    metrics_file = f"data/{username}_reels_metrics.csv"
-    fieldnames = [
-        'date', 'likes', 'views', 'comments', 'estimated_saves', 'estimated_shares',
-        'engagement_rate', 'video_url', 'caption', 'hashtags', 'mentions', 'manual_tags'
-    ]
+            except Exception as e:
+                continue
+    
+    if not date_posted:
+        date_posted = timestamp[:10]
+    
+    # Calculate estimated metrics
+    saves = int(likes * 0.15)
+    shares = int(likes * 0.10)
+    engagement = round((likes + comments + saves + shares), 4)
+    
+    row = {
+        'shortcode': item.get("shortCode") or get_reel_shortcode(item.get("url")) or '',
+        'date': date_posted,
+        'likes': likes,
+        'views': views,
+        'comments': comments,
+        'estimated_saves': saves,
+        'estimated_shares': shares,
+        'engagement_rate': engagement,
+        'video_url': video_url,
+        'caption': caption,
+        'hashtags': hashtags,
+        'mentions': mentions,
+        'manual_tags': ''
+    }
+    return row, posted_at
+
+def scrape_user_metrics(username, urls, items=None, followers=None):
+    """Scrape metrics for a specific user's reels.
+
+    If items is given (e.g. this user's share of a batched Apify run) they are
+    used as-is instead of starting a new actor run. followers is looked up
+    (through the follower cache) when not passed in.
+    """
+    print(f"\n{'='*70}")
+    print(f"🎯 SCRAPING METRICS FOR: {username}")
+    print(f"{'='*70}\n")
+    
+    # 🔐 Get follower count through the shared Instaloader session
+    if followers is None:
+        followers = get_follower_counts([username])[username]
+
+    print(f"📊 Processing {len(urls)} Reel URLs for {username}")
 
-    # Read existing manual tags if file exists
-    existing_tags = {}
-    if os.path.exists(metrics_file):
+    store = get_metrics_store()
+    metrics_file = get_metrics_file(username)
+
+    # ♻️ Only fetch reels that are new or due for a refresh
+    fetch_urls = urls
+    if AGE_AWARE_REFRESH and items is None:
+        fetch_urls = select_due_urls(urls, store.known_shortcodes(username))
+        print(f"♻️ {len(fetch_urls)} of {len(urls)} Reels due for a refresh")
+
+    # 🚀 Run Apify actor
+    if items is None and not fetch_urls:
+        items = []
+    elif items is None:
+        print("🚀 Starting Apify scraper...")
         try:
-            with open(metrics_file, 'r', newline='', encoding='utf-8') as f:
-                reader = csv.DictReader(f)
-                for row in reader:
-                    video_url = row.get('video_url', '')
-                    manual_tag = row.get('manual_tags', '')
-                    if video_url and manual_tag:
-                        existing_tags[video_url] = manual_tag
-            print(f"📋 Preserved {len(existing_tags)} existing manual tags")
+            items = run_reel_scraper(get_apify_client(), [username], fetch_urls)
         except Exception as e:
-            print(f"⚠️  Could not read existing tags: {e}")
-    
-    # Preserve manual tags for reels that already have them
-    for reel in reels_data:
-        if reel['video_url'] in existing_tags:
-            reel['manual_tags'] = existing_tags[reel['video_url']]
+            print(f"❌ Apify scraping failed for {username}: {e}")
+            return None
+
+    # 📋 Manual tags are edited in the CSV by the dashboard, so read them back by shortcode
+    tags, legacy_tags = load_manual_tags(metrics_file)
+
+    # 📦 Collect Reel metrics, writing snapshots to the store as the dataset streams in.
+    # A resumed Apify run keeps the scrape time it started with, so its snapshots are not duplicated.
+    journal = run_journal.get_journal()
+    fetched_at = (
+        journal.get(username, 'metrics').get('scraped_at')
+        or datetime.now(timezone.utc).isoformat(timespec='seconds')
+    )
+    fetched = 0
+    skipped = 0
+    pending = []
+    pending_refresh = []
+    with run_timing.phase('dataset_iteration', username=username) as timing:
+        for item in items:
+            row, posted_at = build_reel_row(item)
+            shortcode = row['shortcode']
+            if not shortcode:
+                skipped += 1
+                continue
+            
+            pending.append(row)
+            pending_refresh.append((shortcode, fetched_at, posted_at))
+            fetched += 1
+            if len(pending) >= SNAPSHOT_WRITE_BATCH:
+                store.add_snapshots(username, fetched_at, pending)
+                store.set_refresh_times(pending_refresh)
+                pending = []
+                pending_refresh = []
+        if pending:
+            store.add_snapshots(username, fetched_at, pending)
+            store.set_refresh_times(pending_refresh)
+        timing['items'] = fetched + skipped
+
+    print(f"✅ Scraped {fetched} Reels for {username}")
+    if skipped:
+        print(f"⚠️  Skipped {skipped} items without a reel shortcode")
+
+    store.set_tags(tags)
+    tagged = sum(1 for tag in tags.values() if tag) + len(legacy_tags)
+    if tagged:
+        print(f"📋 Preserved {tagged} existing manual tags")
 
-    with open(metrics_file, 'w', newline='', encoding='utf-8') as f:
-        writer = csv.DictWriter(f, fieldnames=fieldnames)
-        writer.writeheader()
-        for row in reels_data:
-            writer.writerow(row)
+    # 📁 Export CSV: latest snapshot of every requested reel (individual file per user)
+    with run_timing.phase('csv_write', username=username) as timing:
+        rows = merge_reel_rows(urls, store.iter_latest(username), tags, legacy_tags)
+        exported = write_csv_atomic(metrics_file, METRICS_CSV_FIELDS, rows)
+        timing['rows'] = exported
+    if exported > fetched:
+        print(f"♻️ Carried forward {exported - fetched} unchanged Reels from earlier runs")
 
     print(f"📁 Metrics saved to: {metrics_file}")
     
-    return {
+    result = {
         'username': username,
         'followers': followers,
-        'reels_scraped': len(reels_data),
+        'reels_scraped': exported,
         'csv_file': metrics_file
     }
+    journal.mark_done(username, 'metrics', rows=exported, result=result)
+    return result
+
+def load_finished_metrics(username):
+    """With RESUME, the result of a user whose metrics the interrupted run already wrote, else None."""
+    if not RESUME:
+        return None
+    entry = run_journal.get_journal().get(username, 'metrics')
+    if entry.get('status') != 'done':
+        return None
+    print(f"⏭️ {username}: {entry.get('rows', 0)} metrics rows already written by the interrupted run")
+    return entry['result']
+
+def scrape_metrics_parallel(user_urls, max_workers, followers):
+    """Scrape several users at once, one Apify run per user.
+
+    A failure for one user is reported and skipped without affecting the others.
+    """
+    results = {}
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {
+            executor.submit(scrape_user_metrics, username, urls, followers=followers.get(username)): username
+            for username, urls in user_urls.items()
+        }
+        for future in as_completed(futures):
+            username = futures[future]
+            try:
+                results[username] = future.result()
+            except Exception as e:
+                print(f"❌ Metrics scraping failed for {username}: {e}")
+
+    return [results[username] for username in user_urls if results.get(username)]
+
+def spool_items_by_user(items, user_urls):
+    """Split the items of a batched Apify run back out per user.
+
+    Items are matched on the shortcode of the requested URL, falling back to the
+    owner username reported by Apify. Each user's items are spooled to a
+    temporary JSON-lines file rather than kept in memory; read them back with
+    iter_spooled_items and close the files when done.
+    """
+    owner_by_shortcode = {
+        get_reel_shortcode(url): username
+        for username, urls in user_urls.items()
+        for url in urls
+    }
+    spools = {username: tempfile.TemporaryFile('w+', encoding='utf-8') for username in user_urls}
+    for item in items:
+        shortcode = item.get("shortCode") or get_reel_shortcode(item.get("url"))
+        username = owner_by_shortcode.get(shortcode) or item.get("ownerUsername")
+        if username in spools:
+            spools[username].write(json.dumps(item) + "\n")
+    return spools
+
+def iter_spooled_items(spool):
+    """Yield the items written to a spool file by spool_items_by_user."""
+    spool.seek(0)
+    for line in spool:
+        yield json.loads(line)
+
+def scrape_metrics_batch(user_urls, followers):
+    """Scrape several users with a single Apify run and split the results by owner.
+
+    If the batched run fails, each user falls back to a run of its own.
+    """
+    usernames = list(user_urls)
+    fetch_urls = user_urls
+    if AGE_AWARE_REFRESH:
+        fetch_urls = {}
+        for username, urls in user_urls.items():
+            fetch_urls[username] = select_due_urls(urls, get_metrics_store().known_shortcodes(username))
+            print(f"♻️ {username}: {len(fetch_urls[username])} of {len(urls)} Reels due for a refresh")
+    all_urls = [url for urls in fetch_urls.values() for url in urls]
+    print(f"🚀 Starting batched Apify scraper for {', '.join(usernames)} ({len(all_urls)} URLs)...")
+    try:
+        items = run_reel_scraper(get_apify_client(), usernames, all_urls) if all_urls else []
+        spools = spool_items_by_user(items, user_urls)
+    except Exception as e:
+        print(f"❌ Batched Apify run failed ({e}), retrying users one by one")
+        results = []
+        for username, urls in user_urls.items():
+            result = scrape_user_metrics(username, urls, followers=followers.get(username))
+            if result:
+                results.append(result)
+        return results
 
-def main():
-    """Main function to process all users."""
-    # Find all reel URL files
-    url_files = glob.glob("reel_urls/*_reels.txt")
-    
-    if not url_files:
-        print("❌ No reel URL files found in 'reel_urls/' folder!")
-        print("   Please run part_1_scrape_urls.py first.")
-        return
-    
-    print(f"📂 Found {len(url_files)} user(s) to process\n")
-    
     results = []
-    
-    for url_file in url_files:
-        username = get_username_from_file(url_file)
-        
-        # Load URLs
-        with open(url_file, "r") as f:
-            urls = [line.strip() for line in f if line.strip()]
-        
-        urls = [f"https://www.instagram.com{url}" if url.startswith("/") else url for url in urls]
-        urls = [url for url in urls if "/reel/" in url]
-        
-        if not urls:
-            print(f"⚠️ No valid URLs found for {username}, skipping...")
-            continue
-        
-        # Scrape metrics
-        result = scrape_user_metrics(username, urls)
-        if result:
-            results.append(result)
-    
-    # 📊 Save master scrape history
+    try:
+        for username, urls in user_urls.items():
+            items = iter_spooled_items(spools[username])
+            result = scrape_user_metrics(username, urls, items=items, followers=followers.get(username))
+            if result:
+                results.append(result)
+    finally:
+        for spool in spools.values():
+            spool.close()
+    return results
+
+def scrape_metrics_batched(user_urls, batch_size, max_workers, followers):
+    """Pack users into batches of batch_size and run up to max_workers batches at once."""
+    usernames = list(user_urls)
+    batches = [
+        {username: user_urls[username] for username in usernames[i:i + batch_size]}
+        for i in range(0, len(usernames), batch_size)
+    ]
+
+    results = {}
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {executor.submit(scrape_metrics_batch, batch, followers): batch for batch in batches}
+        for future in as_completed(futures):
+            try:
+                for result in future.result():
+                    results[result['username']] = result
+            except Exception as e:
+                print(f"❌ Metrics scraping failed for {', '.join(futures[future])}: {e}")
+
+    return [results[username] for username in usernames if username in results]
+
+def print_refresh_plan(user_urls):
+    """Report how many reels the age-aware schedule would fetch, without running Apify."""
+    print("🧪 DRY RUN: no Apify runs will be started\n")
+    total = 0
+    due_total = 0
+    for username, urls in user_urls.items():
+        due_urls = select_due_urls(urls, get_metrics_store().known_shortcodes(username))
+        total += len(urls)
+        due_total += len(due_urls)
+        print(f"   {username}: {len(due_urls)} of {len(urls)} Reels due for a refresh")
+
+    reduction = 100 * (1 - due_total / total) if total else 0
+    print(f"\n📉 {due_total} of {total} Reels would be sent to Apify ({reduction:.0f}% fewer than a full refresh)")
+
+def append_scrape_history(results):
+    """Append one row per scraped user to the master scrape history.
+
+    The file is rewritten through a temp file, so a crash never leaves a
+    partial row, and users the run journal has already logged are skipped.
+    """
     history_file = "data/scrape_history.csv"
     history_fields = ['timestamp', 'username', 'followers', 'reels_scraped', 'csv_file']
     history_exists = os.path.exists(history_file)
 
-    with open(history_file, 'a', newline='', encoding='utf-8') as f:
+    journal = run_journal.get_journal()
+    results = [result for result in results if not journal.is_done(result['username'], 'history')]
+    if not results:
+        return history_file
+
+    with run_journal.atomic_write(history_file, newline='', encoding='utf-8') as f:
+        if history_exists:
+            with open(history_file, 'r', newline='', encoding='utf-8') as existing:
+                f.writelines(existing)
         writer = csv.DictWriter(f, fieldnames=history_fields)
         if not history_exists:
             writer.writeheader()
@@ -213,15 +711,137 @@ def main():
                 'reels_scraped': result['reels_scraped'],
                 'csv_file': result['csv_file']
             })
+    for result in results:
+        journal.mark_done(result['username'], 'history')
 
-    # Print final summary
+    return history_file
+
+def archive_media(results):
+    """Download the videos of the scraped users that are not archived yet."""
+    try:
+        media_archive.download_media([result['username'] for result in results], MEDIA_CONCURRENCY)
+    except Exception as e:
+        print(f"⚠️  Media download failed: {e}")
+
+def update_analytics_summary():
+    """Recompute the dashboard's analytics summary for creators whose metrics changed."""
+    with run_timing.phase('analytics_summary') as timing:
+        try:
+            timing['recomputed'] = len(analytics_summary.update_summary(get_metrics_store()))
+        except Exception as e:
+            print(f"⚠️  Could not update the analytics summary: {e}")
+
+def print_final_summary(results, history_file):
+    """Print the per-user summary at the end of a run."""
     print(f"\n{'='*70}")
     print("📊 FINAL SUMMARY")
     print(f"{'='*70}")
     for result in results:
         print(f"✅ {result['username']}: {result['reels_scraped']} reels | {result['followers']} followers")
     print(f"\n📈 Master history logged to: {history_file}")
+    pacing.print_summary()
     print(f"{'='*70}\n")
 
+def main(usernames=None, apify_concurrency=APIFY_CONCURRENCY, batch_size=APIFY_BATCH_SIZE, dry_run=False):
+    """Main function to process all users, or only the given ones."""
+    # Find all reel URL files
+    if usernames:
+        url_files = [f"reel_urls/{username}_reels.txt" for username in usernames]
+        url_files = [url_file for url_file in url_files if os.path.exists(url_file)]
+    else:
+        url_files = glob.glob("reel_urls/*_reels.txt")
+    
+    if not url_files:
+        print("❌ No reel URL files found in 'reel_urls/' folder!")
+        print("   Please run part_1_scrape_urls.py first.")
+        return
+    
+    print(f"📂 Found {len(url_files)} user(s) to process\n")
+    
+    user_urls = {}
+    
+    for url_file in url_files:
+        username = get_username_from_file(url_file)
+        
+        # Load URLs
+        urls = load_reel_urls(url_file)
+        
+        if not urls:
+            print(f"⚠️ No valid URLs found for {username}, skipping...")
+            continue
+        
+        user_urls[username] = urls
+    
+    if dry_run:
+        print_refresh_plan(user_urls)
+        return
+    
+    # ⏭️ With --resume, users finished by the interrupted run keep their results
+    results = []
+    if RESUME:
+        for username in list(user_urls):
+            result = load_finished_metrics(username)
+            if result:
+                results.append(result)
+                del user_urls[username]
+    else:
+        run_journal.get_journal().reset(list(user_urls), steps=('metrics', 'history'))
+    
+    # 👥 Follower counts for every user up front (cached, looked up concurrently)
+    followers = get_follower_counts(list(user_urls)) if user_urls else {}
+    
+    # Scrape metrics
+    if batch_size > 1:
+        results += scrape_metrics_batched(user_urls, batch_size, apify_concurrency, followers)
+    elif apify_concurrency > 1:
+        results += scrape_metrics_parallel(user_urls, apify_concurrency, followers)
+    else:
+        for username, urls in user_urls.items():
+            result = scrape_user_metrics(username, urls, followers=followers.get(username))
+            if result:
+                results.append(result)
+    
+    # 🎞️ Archive the videos while their signed links still work
+    if DOWNLOAD_MEDIA and results:
+        archive_media(results)
+    
+    # 📊 Save master scrape history
+    history_file = append_scrape_history(results)
+    update_analytics_summary()
+
+    # Print final summary
+    print_final_summary(results, history_file)
+
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description='Fetch Instagram reel metrics')
+    parser.add_argument('--users', nargs='+', help='Only process these usernames (default: every file in reel_urls/)')
+    parser.add_argument('--apify-concurrency', type=int, default=APIFY_CONCURRENCY,
+                        help='Number of Apify runs in flight at the same time (default: 1)')
+    parser.add_argument('--batch-size', type=int, default=APIFY_BATCH_SIZE,
+                        help='Number of users packed into one Apify run (default: 1)')
+    parser.add_argument('--age-aware', action='store_true',
+                        help='Only re-fetch reels that are new or due under the age-based refresh schedule')
+    parser.add_argument('--dry-run', action='store_true',
+                        help='Report how many reels the age-aware schedule would fetch, without running Apify')
+    parser.add_argument('--resume', action='store_true',
+                        help='Skip users the interrupted run finished and re-attach to its Apify runs')
+    parser.add_argument('--download-media', action='store_true',
+                        help=f"Archive the reel videos to {media_archive.MEDIA_DIR}/ after fetching metrics")
+    parser.add_argument('--media-concurrency', type=int, default=MEDIA_CONCURRENCY,
+                        help=f"Video downloads in flight at the same time (default: {MEDIA_CONCURRENCY})")
+    parser.add_argument('--timing-log',
+                        help=f"Append JSON-lines timing events to this file (default: ${run_timing.TIMING_LOG_ENV})")
+    parser.add_argument('--profile', action='store_true',
+                        help='Print where the run spent its time at the end')
+    args = parser.parse_args()
+    
+    AGE_AWARE_REFRESH = args.age_aware
+    RESUME = args.resume
+    DOWNLOAD_MEDIA = args.download_media
+    MEDIA_CONCURRENCY = max(1, args.media_concurrency)
+    if args.timing_log:
+        run_timing.set_log_file(args.timing_log)
+    
+    main(args.users, max(1, args.apify_concurrency), max(1, args.batch_size), args.dry_run)
+    if args.profile:
+        run_timing.print_profile()
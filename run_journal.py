@@ -0,0 +1,150 @@
+"""
+Run journal - crash-safe record of how far a scrape run got for each creator.
+
+part_1 and part_2 note every step they finish per creator: the reel URLs that
+were collected, the Apify actor run (and its dataset) fetching the metrics, the
+rows written to the metrics CSV and the scrape history row. With --resume the
+scripts skip steps that are already done and re-attach to Apify runs that were
+still in flight, so an interrupted run does not re-scroll profiles or pay for
+the same actor runs twice.
+
+The journal is a JSON file (SCRAPER_RUN_JOURNAL, default data/run_journal.json)
+rewritten through a temp file and a rename on every update. Updates re-read the
+file under a lock file, so several processes (e.g. the shards of
+sharded_runner.py) can share one journal.
+"""
+
+import json
+import os
+import threading
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+try:
+    import fcntl
+except ImportError:  # Windows: only threads of one process are serialized
+    fcntl = None
+
+JOURNAL_ENV = 'SCRAPER_RUN_JOURNAL'
+JOURNAL_FILE = os.environ.get(JOURNAL_ENV) or 'data/run_journal.json'
+
+# Steps recorded per creator, in the order a run goes through them
+STEPS = ('urls', 'metrics', 'history')
+
+
+@contextmanager
+def atomic_write(path, mode='w', **open_args):
+    """Open a temp file next to path and rename it over path once the block completes.
+
+    Readers and a crashed run only ever see the old or the new file. The temp
+    file is removed if the block raises.
+    """
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    try:
+        with open(tmp_path, mode, **open_args) as f:
+            yield f
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def write_json_atomic(path, data):
+    with atomic_write(path, encoding='utf-8') as f:
+        json.dump(data, f)
+
+
+class RunJournal:
+    """Per-creator, per-step state of the current run, persisted after every change."""
+
+    def __init__(self, path=JOURNAL_FILE):
+        self.path = path
+        self.lock = threading.Lock()
+
+    @contextmanager
+    def locked(self):
+        """Hold the journal across threads and, where supported, across processes."""
+        with self.lock:
+            if fcntl is None:
+                yield
+                return
+            os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+            with open(f"{self.path}.lock", 'w') as lock_file:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+                try:
+                    yield
+                finally:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def read(self):
+        if not os.path.exists(self.path):
+            return {'users': {}}
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except ValueError:
+            print(f"⚠️ Run journal {self.path} is unreadable, starting a new one")
+            return {'users': {}}
+
+    def get(self, username, step):
+        """The recorded state of one step for one creator ({} if it never started)."""
+        with self.locked():
+            return dict(self.read()['users'].get(username, {}).get(step, {}))
+
+    def is_done(self, username, step):
+        return self.get(username, step).get('status') == 'done'
+
+    def update(self, username, step, **fields):
+        """Merge fields into a creator's step and persist the journal."""
+        with self.locked():
+            journal = self.read()
+            entry = journal['users'].setdefault(username, {}).setdefault(step, {})
+            entry.update(fields)
+            entry['updated_at'] = datetime.now(timezone.utc).isoformat(timespec='seconds')
+            journal['updated_at'] = entry['updated_at']
+            write_json_atomic(self.path, journal)
+
+    def mark_done(self, username, step, **fields):
+        self.update(username, step, status='done', **fields)
+
+    def reset(self, usernames, steps=STEPS):
+        """Forget the given steps of the given creators, so a fresh run redoes them."""
+        with self.locked():
+            journal = self.read()
+            changed = False
+            for username in usernames:
+                entry = journal['users'].get(username)
+                for step in steps:
+                    if entry and step in entry:
+                        del entry[step]
+                        changed = True
+                if entry == {}:
+                    del journal['users'][username]
+            if changed:
+                write_json_atomic(self.path, journal)
+
+    def shared_value(self, usernames, step, field):
+        """The value of field if every creator's step records the same one, else None.
+
+        Used to find the Apify run a batch of creators was waiting on.
+        """
+        values = {self.get(username, step).get(field) for username in usernames}
+        return values.pop() if len(values) == 1 else None
+
+
+journal_lock = threading.Lock()
+journal = None
+
+
+def get_journal():
+    """Open the run journal once and share it for the whole process."""
+    global journal
+    with journal_lock:
+        if journal is None:
+            journal = RunJournal(os.environ.get(JOURNAL_ENV) or JOURNAL_FILE)
+        return journal
+
@@ -0,0 +1,143 @@
+"""
+Run timing - machine-readable timing events for the scraper scripts.
+
+Each phase of a run (login, navigation, scroll iterations, Apify waits, CSV
+writes, ...) is recorded as one JSON event with monotonic start/end times, its
+duration and any counters attached to it. Events are kept in memory for the
+end-of-run profile and, when SCRAPER_TIMING_LOG names a file, appended to it
+as JSON lines so several processes (part_1 and part_2 under main.py) can share
+one log.
+"""
+
+import json
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+TIMING_LOG_ENV = 'SCRAPER_TIMING_LOG'
+
+# Which script the events came from, e.g. 'part_1_scrape_urls'
+SOURCE = os.path.splitext(os.path.basename(sys.argv[0] or 'python'))[0]
+
+# Numeric event fields that are not counters and should not be summed
+NON_COUNTER_FIELDS = ('pid', 'start', 'end', 'duration', 'iteration')
+
+events_lock = threading.Lock()
+events = []
+log_file = os.environ.get(TIMING_LOG_ENV)
+
+
+def set_log_file(path):
+    """Append events to path from now on, in this process and any it starts."""
+    global log_file
+    log_file = path
+    os.environ[TIMING_LOG_ENV] = path
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+
+
+def emit(event):
+    """Record one event and append it to the timing log, if there is one."""
+    event = {'source': SOURCE, 'pid': os.getpid(), **event}
+    with events_lock:
+        events.append(event)
+        if log_file:
+            with open(log_file, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(event) + '\n')
+
+
+@contextmanager
+def phase(name, **counters):
+    """Time the enclosed block as one event.
+
+    Yields a dict that the block can add counters to (e.g. rows written);
+    they are stored on the event next to its timings.
+    """
+    fields = dict(counters)
+    status = 'ok'
+    start = time.monotonic()
+    try:
+        yield fields
+    except BaseException:
+        status = 'error'
+        raise
+    finally:
+        end = time.monotonic()
+        emit({
+            'phase': name,
+            'start': round(start, 6),
+            'end': round(end, 6),
+            'duration': round(end - start, 6),
+            'status': status,
+            **fields
+        })
+
+
+def load_events(path):
+    """Read the events of a timing log, skipping lines that are not valid JSON."""
+    loaded = []
+    if not path or not os.path.exists(path):
+        return loaded
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            try:
+                loaded.append(json.loads(line))
+            except ValueError:
+                continue
+    return loaded
+
+
+def summarize(timing_events):
+    """Count, total and max duration per (source, phase), plus summed numeric counters."""
+    summary = {}
+    for event in timing_events:
+        key = (event.get('source', ''), event.get('phase', ''))
+        stats = summary.setdefault(key, {'count': 0, 'total': 0.0, 'max': 0.0, 'errors': 0, 'counters': {}})
+        duration = event.get('duration', 0.0)
+        stats['count'] += 1
+        stats['total'] += duration
+        stats['max'] = max(stats['max'], duration)
+        if event.get('status') == 'error':
+            stats['errors'] += 1
+        for field, value in event.items():
+            if field in NON_COUNTER_FIELDS or isinstance(value, bool):
+                continue
+            if isinstance(value, (int, float)):
+                stats['counters'][field] = stats['counters'].get(field, 0) + value
+    return summary
+
+
+def print_profile(timing_events=None):
+    """Print where the run spent its time, slowest phases first within each script."""
+    timing_events = events if timing_events is None else timing_events
+    if not timing_events:
+        return
+
+    print(f"\n{'='*70}")
+    print("⏱️ TIMING PROFILE")
+    print(f"{'='*70}")
+
+    summary = summarize(timing_events)
+    for source in sorted({source for source, _ in summary}):
+        source_events = [event for event in timing_events if event.get('source') == source]
+        wall = max(event['end'] for event in source_events) - min(event['start'] for event in source_events)
+        print(f"\n📜 {source} ({wall:.1f}s wall)")
+        phases = sorted(
+            ((name, stats) for (event_source, name), stats in summary.items() if event_source == source),
+            key=lambda item: item[1]['total'],
+            reverse=True
+        )
+        for name, stats in phases:
+            line = f"   {name:<20} {stats['total']:>9.2f}s total  {stats['count']:>5}x  max {stats['max']:.2f}s"
+            if stats['errors']:
+                line += f"  ({stats['errors']} failed)"
+            counters = ', '.join(f"{field}={value}" for field, value in sorted(stats['counters'].items()))
+            if counters:
+                line += f"  [{counters}]"
+            print(line)
+
+    if len({source for source, _ in summary}) > 1:
+        wall = max(event['end'] for event in timing_events) - min(event['start'] for event in timing_events)
+        print(f"\n🧮 All scripts: {wall:.1f}s wall")
+    print(f"{'='*70}\n")
@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+"""
+Sharded runner - scrapes large creator lists across a pool of Instagram accounts.
+
+The creators are split into one shard per account, balanced by how many reels
+each creator had in the previous run. Every shard runs in its own worker that
+calls part_1_scrape_urls.py with that account's credentials and session file,
+at most MAX_USERS_PER_RUN creators at a time. All shards write to the same
+reel_urls/ folder. part_2_get_metrics.py then runs once for every creator that
+was scraped, so data/ and the scrape history are written by a single process.
+Shards record finished creators in the shared run journal, and --resume passes
+on to both scripts so an interrupted sharded run continues where it stopped.
+
+The account pool is a JSON list in ACCOUNTS_FILE:
+    [{"username": "account1", "password": "...", "session_file": "sessions/account1.json"}, ...]
+session_file is optional (default: sessions/{username}.json). Without a pool
+file, everything runs as one shard under part_1's own account.
+"""
+
+import argparse
+import heapq
+import json
+import os
+import subprocess
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import run_journal
+import run_timing
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+ACCOUNTS_FILE = os.environ.get('SCRAPER_ACCOUNTS_FILE') or 'accounts.json'
+SESSIONS_DIR = 'sessions'
+
+# part_1 accepts at most this many creators per run
+MAX_USERS_PER_RUN = 10
+# Weight of a creator that has never been scraped
+DEFAULT_EXPECTED_REELS = 50
+
+print_lock = threading.Lock()
+
+
+def load_accounts(accounts_file=ACCOUNTS_FILE):
+    """Read the account pool; an empty list means part_1's default account."""
+    if not os.path.exists(accounts_file):
+        return []
+    with open(accounts_file, 'r', encoding='utf-8') as f:
+        accounts = json.load(f)
+    for account in accounts:
+        account.setdefault('session_file', os.path.join(SESSIONS_DIR, f"{account['username']}.json"))
+    return accounts
+
+
+def expected_reel_count(username):
+    """Reels saved for the creator by the last run, or DEFAULT_EXPECTED_REELS for new creators."""
+    url_file = f"reel_urls/{username}_reels.txt"
+    if not os.path.exists(url_file):
+        return DEFAULT_EXPECTED_REELS
+    with open(url_file, 'r', encoding='utf-8') as f:
+        return max(1, sum(1 for line in f if line.strip()))
+
+
+def plan_shards(usernames, shard_count):
+    """Split creators into shard_count lists with about the same expected reel count.
+
+    Biggest creators are placed first, each on the currently lightest shard.
+    """
+    weights = {username: expected_reel_count(username) for username in usernames}
+    shards = [[] for _ in range(shard_count)]
+    heap = [(0, index) for index in range(shard_count)]
+    for username in sorted(usernames, key=lambda name: weights[name], reverse=True):
+        load, index = heapq.heappop(heap)
+        shards[index].append(username)
+        heapq.heappush(heap, (load + weights[username], index))
+    return [(shard, sum(weights[username] for username in shard)) for shard in shards]
+
+
+def log(prefix, line):
+    with print_lock:
+        print(f"{prefix} {line}", flush=True)
+
+
+def run_shard(shard_id, usernames, account, part1_args):
+    """Scrape one shard's creators in runs of MAX_USERS_PER_RUN. Returns the creators that were saved."""
+    prefix = f"[shard {shard_id}]"
+    env = dict(os.environ)
+    if account:
+        env['INSTAGRAM_USERNAME'] = account['username']
+        env['INSTAGRAM_PASSWORD'] = account.get('password', '')
+        env['INSTAGRAM_SESSION_FILE'] = account['session_file']
+    env['PYTHONUNBUFFERED'] = '1'
+
+    scraped = []
+    for start in range(0, len(usernames), MAX_USERS_PER_RUN):
+        chunk = usernames[start:start + MAX_USERS_PER_RUN]
+        command = [sys.executable, os.path.join(SCRIPT_DIR, 'part_1_scrape_urls.py'), '--users', *chunk, *part1_args]
+        with run_timing.phase('shard_run', shard=shard_id, users=len(chunk)) as timing:
+            process = subprocess.Popen(command, env=env, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True)
+            for line in process.stdout:
+                log(prefix, line.rstrip())
+            process.wait()
+            timing['exit_code'] = process.returncode
+
+        if process.returncode != 0:
+            log(prefix, f"❌ part_1 exited with code {process.returncode} for {', '.join(chunk)}")
+        # part_1 marks every creator it saved URLs for in the run journal
+        scraped.extend(username for username in chunk if run_journal.get_journal().is_done(username, 'urls'))
+    return scraped
+
+
+def run_sharded(usernames, accounts, shard_count=None, part1_args=(), part2_args=(), fetch_metrics=True,
+                resume=False):
+    """Scrape usernames across the account pool, then fetch metrics for them in one part_2 run."""
+    usernames = list(dict.fromkeys(usernames))
+    if resume:
+        part1_args = [*part1_args, '--resume']
+        part2_args = [*part2_args, '--resume']
+    else:
+        run_journal.get_journal().reset(usernames)
+    shard_count = min(shard_count or max(1, len(accounts)), max(1, len(accounts)), len(usernames))
+    shards = plan_shards(usernames, shard_count)
+
+    print(f"🧩 {len(usernames)} creator(s) across {shard_count} shard(s):")
+    for shard_id, (shard, load) in enumerate(shards, start=1):
+        account = accounts[shard_id - 1]['username'] if accounts else 'default account'
+        print(f"   shard {shard_id} ({account}): {len(shard)} creator(s), ~{load} reels")
+    print()
+
+    with ThreadPoolExecutor(max_workers=shard_count) as executor:
+        futures = [
+            executor.submit(run_shard, shard_id, shard, accounts[shard_id - 1] if accounts else None, list(part1_args))
+            for shard_id, (shard, _) in enumerate(shards, start=1)
+        ]
+        scraped = set()
+        for future in futures:
+            scraped.update(future.result())
+
+    scraped = [username for username in usernames if username in scraped]
+    failed = [username for username in usernames if username not in scraped]
+
+    print(f"\n{'='*70}")
+    print("🧩 SHARDED SCRAPE SUMMARY")
+    print(f"{'='*70}")
+    print(f"✅ {len(scraped)} of {len(usernames)} creator(s) scraped")
+    if failed:
+        print(f"❌ Failed: {', '.join(failed)}")
+    print(f"{'='*70}\n")
+
+    if not fetch_metrics or not scraped:
+        return not failed
+
+    command = [sys.executable, os.path.join(SCRIPT_DIR, 'part_2_get_metrics.py'), '--users', *scraped, *part2_args]
+    with run_timing.phase('metrics_run', users=len(scraped)):
+        returncode = subprocess.call(command)
+    return returncode == 0 and not failed
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Scrape any number of creators across a pool of Instagram accounts')
+    parser.add_argument('--users', nargs='+', help='Creators to scrape')
+    parser.add_argument('--users-file', help='File with one creator per line')
+    parser.add_argument('--accounts-file', default=ACCOUNTS_FILE,
+                        help=f"JSON list of accounts to shard across (default: {ACCOUNTS_FILE})")
+    parser.add_argument('--shards', type=int, help='Number of shards (default: one per account)')
+    parser.add_argument('--urls-only', action='store_true', help='Only scrape reel URLs, skip part_2')
+    parser.add_argument('--resume', action='store_true',
+                        help='Continue an interrupted run, skipping creators and metrics it already finished')
+    parser.add_argument('--part1-args', default='', help='Extra flags for part_1, e.g. "--incremental"')
+    parser.add_argument('--part2-args', default='', help='Extra flags for part_2, e.g. "--batch-size 5"')
+    args = parser.parse_args()
+
+    usernames = list(args.users or [])
+    if args.users_file:
+        with open(args.users_file, 'r', encoding='utf-8') as f:
+            usernames.extend(line.strip() for line in f if line.strip() and not line.startswith('#'))
+    if not usernames:
+        parser.error('no creators given, use --users or --users-file')
+
+    accounts = load_accounts(args.accounts_file)
+    if not accounts:
+        print(f"⚠️ No account pool in {args.accounts_file}, running one shard with part_1's account\n")
+
+    ok = run_sharded(
+        usernames, accounts, args.shards,
+        args.part1_args.split(), args.part2_args.split(),
+        fetch_metrics=not args.urls_only, resume=args.resume
+    )
+    sys.exit(0 if ok else 1)
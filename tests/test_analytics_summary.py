@@ -0,0 +1,128 @@
+import csv
+import json
+import os
+
+import pytest
+
+import analytics_summary
+
+METRICS_FIELDS = ['shortcode', 'date', 'likes', 'views', 'comments', 'hashtags', 'caption']
+
+
+def write_metrics(username, rows):
+    with open(f"data/{username}_reels_metrics.csv", 'w', newline='', encoding='utf-8') as f:
+        writer = csv.DictWriter(f, fieldnames=METRICS_FIELDS)
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+def write_history(rows):
+    with open('data/scrape_history.csv', 'w', newline='', encoding='utf-8') as f:
+        writer = csv.DictWriter(f, fieldnames=['timestamp', 'username', 'followers', 'reels_scraped'])
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+def reel(shortcode, views, likes, comments, hashtags='', date='2025-03-03'):
+    return {'shortcode': shortcode, 'date': date, 'likes': likes, 'views': views,
+            'comments': comments, 'hashtags': hashtags, 'caption': f"caption {shortcode}"}
+
+
+def read_summary():
+    with open(analytics_summary.SUMMARY_FILE, encoding='utf-8') as f:
+        return json.load(f)
+
+
+@pytest.fixture(autouse=True)
+def workdir(tmp_path, monkeypatch):
+    # The summary reads and writes data/ relative to the working directory
+    monkeypatch.chdir(tmp_path)
+    os.makedirs('data')
+    write_metrics('alice', [reel('a1', 100, 10, 5, '#Fun, cat'), reel('a2', 50, -1, 1, 'fun')])
+    write_metrics('bob', [reel('b1', 1000, 100, 0, 'dog')])
+    write_history([
+        {'timestamp': '2025-03-01 10:00:00', 'username': 'alice', 'followers': '1000', 'reels_scraped': '2'},
+        {'timestamp': '2025-03-01 10:00:00', 'username': 'bob', 'followers': '500', 'reels_scraped': '1'},
+    ])
+
+
+def test_first_run_computes_every_creator():
+    assert analytics_summary.update_summary() == ['alice', 'bob']
+
+    summary = read_summary()
+    alice = summary['creators']['alice']
+    assert alice['reels'] == 2
+    assert alice['totals'] == {'views': 150, 'likes': 10, 'comments': 6}
+    assert alice['hashtags'] == [['fun', 2], ['cat', 1]]
+    assert alice['hashtag_metrics']['fun'] == {'reels': 2, 'views': 150, 'likes': 10, 'comments': 6}
+    assert alice['engagement']['rate_by_views'] == round(16 / 150 * 100, 4)
+    assert alice['engagement']['median_rate_by_followers'] == round((1.5 + 0.1) / 2, 4)
+    assert summary['overall']['reels'] == 3
+    assert summary['overall']['totals'] == {'views': 1150, 'likes': 110, 'comments': 6}
+
+
+def test_unchanged_creators_are_skipped():
+    analytics_summary.update_summary()
+    before = os.stat(analytics_summary.SUMMARY_FILE).st_mtime_ns
+    generated_at = read_summary()['generated_at']
+
+    assert analytics_summary.update_summary() == []
+    # Nothing changed, so the file is not even rewritten
+    assert os.stat(analytics_summary.SUMMARY_FILE).st_mtime_ns == before
+    assert read_summary()['generated_at'] == generated_at
+
+
+def test_rewritten_file_with_the_same_rows_is_not_recomputed():
+    analytics_summary.update_summary()
+    # part_2 re-exports every requested creator, giving the file a new mtime
+    stat = os.stat('data/alice_reels_metrics.csv')
+    write_metrics('alice', [reel('a1', 100, 10, 5, '#Fun, cat'), reel('a2', 50, -1, 1, 'fun')])
+    os.utime('data/alice_reels_metrics.csv', ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+    assert analytics_summary.update_summary() == []
+    source = read_summary()['creators']['alice']['source']
+    assert source['mtime_ns'] == os.stat('data/alice_reels_metrics.csv').st_mtime_ns
+
+
+def test_only_the_changed_metrics_file_is_recomputed():
+    analytics_summary.update_summary()
+    write_metrics('bob', [reel('b1', 1000, 100, 0, 'dog'), reel('b2', 10, 1, 1, 'dog')])
+
+    assert analytics_summary.update_summary() == ['bob']
+    assert read_summary()['creators']['bob']['reels'] == 2
+    assert read_summary()['overall']['reels'] == 4
+
+
+def test_follower_change_recomputes_the_creator():
+    analytics_summary.update_summary()
+    write_history([
+        {'timestamp': '2025-03-01 10:00:00', 'username': 'alice', 'followers': '1000', 'reels_scraped': '2'},
+        {'timestamp': '2025-03-01 10:00:00', 'username': 'bob', 'followers': '500', 'reels_scraped': '1'},
+        {'timestamp': '2025-03-02 10:00:00', 'username': 'alice', 'followers': '2000', 'reels_scraped': '2'},
+    ])
+
+    assert analytics_summary.update_summary() == ['alice']
+    assert read_summary()['creators']['alice']['followers'] == 2000
+
+
+def test_removed_creator_is_dropped():
+    analytics_summary.update_summary()
+    os.remove('data/bob_reels_metrics.csv')
+
+    assert analytics_summary.update_summary() == []
+    assert list(read_summary()['creators']) == ['alice']
+
+
+def test_rebuild_recomputes_everything():
+    analytics_summary.update_summary()
+    assert analytics_summary.update_summary(rebuild=True) == ['alice', 'bob']
+
+
+def test_older_summary_version_is_recomputed():
+    analytics_summary.update_summary()
+    summary = read_summary()
+    summary['creators']['alice']['source']['version'] -= 1
+    with open(analytics_summary.SUMMARY_FILE, 'w', encoding='utf-8') as f:
+        json.dump(summary, f)
+
+    assert analytics_summary.update_summary() == ['alice']
@@ -0,0 +1,53 @@
+import socket
+import threading
+
+import pytest
+
+import browser_worker
+
+
+@pytest.fixture
+def worker_reply():
+    """A one-shot fake worker that answers the first request with the given raw lines."""
+    server = socket.create_server(('127.0.0.1', 0))
+    replies = []
+
+    def serve():
+        connection, _ = server.accept()
+        with connection:
+            connection.makefile('r').readline()
+            connection.sendall(''.join(replies).encode('utf-8'))
+
+    def start(*lines):
+        replies.extend(lines)
+        threading.Thread(target=serve, daemon=True).start()
+        return server.getsockname()[1]
+
+    yield start
+    server.close()
+
+
+def test_log_lines_are_passed_on_and_the_result_returned(worker_reply):
+    port = worker_reply('{"type": "log", "line": "scraping"}\n', '{"type": "result", "ok": true}\n')
+    lines = []
+    result = browser_worker.send_request({'command': 'ping'}, port=port, on_line=lines.append)
+
+    assert result == {'type': 'result', 'ok': True}
+    assert lines == ['scraping']
+
+
+def test_garbled_line_is_treated_like_no_worker(worker_reply):
+    port = worker_reply('{"type": "log", "line": "scraping"}\n', '{"type": "res\n')
+    assert browser_worker.send_request({'command': 'ping'}, port=port, on_line=lambda line: None) is None
+
+
+def test_closed_connection_is_a_failed_job(worker_reply):
+    port = worker_reply('{"type": "log", "line": "scraping"}\n')
+    result = browser_worker.send_request({'command': 'ping'}, port=port, on_line=lambda line: None)
+    assert result['ok'] is False
+
+
+def test_no_worker_listening():
+    with socket.create_server(('127.0.0.1', 0)) as server:
+        port = server.getsockname()[1]
+    assert browser_worker.send_request({'command': 'ping'}, port=port) is None
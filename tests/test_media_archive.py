@@ -0,0 +1,173 @@
+import hashlib
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+import media_archive
+from fake_cdn import FakeCDN
+from media_archive import ConnectionPool, DownloadError, DownloadStats, fetch_to_partial
+
+VIDEO_SIZE = 200 * 1024
+
+
+@pytest.fixture
+def cdn():
+    cdn = FakeCDN(VIDEO_SIZE).start()
+    yield cdn
+    cdn.stop()
+
+
+def video(cdn, shortcode):
+    return cdn.video_bytes(shortcode, 0, VIDEO_SIZE)
+
+
+def sha256(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+def test_download_from_scratch(cdn, tmp_path):
+    part_file = tmp_path / 'a.mp4.part'
+    stats = DownloadStats()
+    digest = fetch_to_partial(ConnectionPool(), f"{cdn.base_url}/a.mp4", str(part_file), stats)
+
+    assert part_file.read_bytes() == video(cdn, 'a')
+    assert digest == sha256(video(cdn, 'a'))
+    assert stats.bytes == VIDEO_SIZE
+    assert stats.counts['resumed'] == 0
+    assert cdn.counters['range_requests'] == 0
+
+
+def test_partial_file_is_resumed_with_a_range_request(cdn, tmp_path):
+    part_file = tmp_path / 'a.mp4.part'
+    part_file.write_bytes(video(cdn, 'a')[:1000])
+    stats = DownloadStats()
+    digest = fetch_to_partial(ConnectionPool(), f"{cdn.base_url}/a.mp4", str(part_file), stats)
+
+    assert part_file.read_bytes() == video(cdn, 'a')
+    assert digest == sha256(video(cdn, 'a'))
+    assert stats.bytes == VIDEO_SIZE - 1000
+    assert stats.counts['resumed'] == 1
+    assert cdn.counters['range_requests'] == 1
+
+
+def test_complete_partial_file_answered_with_416(cdn, tmp_path):
+    part_file = tmp_path / 'a.mp4.part'
+    part_file.write_bytes(video(cdn, 'a'))
+    stats = DownloadStats()
+    digest = fetch_to_partial(ConnectionPool(), f"{cdn.base_url}/a.mp4", str(part_file), stats)
+
+    assert digest == sha256(video(cdn, 'a'))
+    assert part_file.read_bytes() == video(cdn, 'a')
+    assert stats.bytes == 0
+
+
+def test_dropped_connection_resumes_on_the_next_attempt(tmp_path):
+    cdn = FakeCDN(VIDEO_SIZE, drop_first=True).start()
+    try:
+        part_file = tmp_path / 'a.mp4.part'
+        pool = ConnectionPool()
+        stats = DownloadStats()
+        with pytest.raises(DownloadError):
+            fetch_to_partial(pool, f"{cdn.base_url}/a.mp4", str(part_file), stats)
+        assert 0 < part_file.stat().st_size < VIDEO_SIZE
+
+        digest = fetch_to_partial(pool, f"{cdn.base_url}/a.mp4", str(part_file), stats)
+        assert digest == sha256(video(cdn, 'a'))
+        assert part_file.read_bytes() == video(cdn, 'a')
+        assert stats.counts['resumed'] == 1
+    finally:
+        cdn.stop()
+
+
+def test_server_ignoring_range_starts_over(tmp_path):
+    content = b'0123456789' * 1000
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def log_message(self, format, *args):
+            pass
+
+        def do_GET(self):
+            self.send_response(200)
+            self.send_header('Content-Length', str(len(content)))
+            self.end_headers()
+            self.wfile.write(content)
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        part_file = tmp_path / 'a.mp4.part'
+        part_file.write_bytes(b'stale bytes')
+        stats = DownloadStats()
+        host, port = server.server_address[:2]
+        digest = fetch_to_partial(ConnectionPool(), f"http://{host}:{port}/a.mp4", str(part_file), stats)
+
+        assert part_file.read_bytes() == content
+        assert digest == sha256(content)
+        assert stats.counts['resumed'] == 0
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def test_missing_video_is_not_retried(cdn, tmp_path):
+    with pytest.raises(DownloadError) as error:
+        fetch_to_partial(ConnectionPool(), f"{cdn.base_url}/not-a-video", str(tmp_path / 'x.part'), DownloadStats())
+    assert not error.value.retryable
+
+
+def test_url_expiry():
+    assert media_archive.url_expiry('https://cdn.example/v.mp4?oe=65A1B2C3&x=1') == 0x65A1B2C3
+    assert media_archive.url_expiry('https://cdn.example/v.mp4') is None
+    assert media_archive.url_expiry('https://cdn.example/v.mp4?oe=zz') is None
+
+
+def write_metrics(username, rows):
+    with open(f"data/{username}_reels_metrics.csv", 'w', encoding='utf-8') as f:
+        f.write('shortcode,video_url\n')
+        f.writelines(f"{shortcode},{url}\n" for shortcode, url in rows)
+
+
+@pytest.fixture
+def archive(tmp_path, monkeypatch):
+    """A data/ folder with one creator: a reel, its repost and a reel whose link expired in 2020."""
+    cdn = FakeCDN(VIDEO_SIZE, duplicate_every=2).start()
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / 'data').mkdir()
+    write_metrics('creator', [
+        ('a', f"{cdn.base_url}/a.mp4?i=1"),
+        ('b', f"{cdn.base_url}/b.mp4?i=2"),
+        ('c', f"{cdn.base_url}/c.mp4?i=3&oe=5F5E1000"),
+    ])
+    yield cdn, tmp_path / 'media'
+    cdn.stop()
+
+
+def test_repost_is_stored_once_and_expired_links_are_not_requested(archive):
+    cdn, media_dir = archive
+    counts = media_archive.download_media(['creator'], concurrency=2, media_dir=str(media_dir))
+
+    assert counts['downloaded'] + counts['deduplicated'] == 2
+    assert counts['deduplicated'] == 1
+    assert counts['expired'] == 1
+    objects = [path for path in (media_dir / 'objects').rglob('*') if path.is_file()]
+    assert len(objects) == 1
+    assert objects[0].read_bytes() == cdn.video_bytes('1', 0, VIDEO_SIZE)
+    assert sorted(path.name for path in (media_dir / 'reels').iterdir()) == ['a.mp4', 'b.mp4']
+    assert (media_dir / 'reels' / 'a.mp4').samefile(objects[0])
+    assert (media_dir / 'reels' / 'b.mp4').samefile(objects[0])
+    assert cdn.requested == {'a', 'b'}
+    assert cdn.counters['requests'] == 2
+
+
+def test_archived_reels_are_skipped_on_the_next_run(archive):
+    cdn, media_dir = archive
+    media_archive.download_media(['creator'], media_dir=str(media_dir))
+    requests = cdn.counters['requests']
+
+    counts = media_archive.download_media(['creator'], media_dir=str(media_dir))
+    assert counts['skipped'] == 2
+    assert counts['downloaded'] == counts['deduplicated'] == 0
+    assert cdn.counters['requests'] == requests
@@ -0,0 +1,56 @@
+import pytest
+
+import metrics_store
+from metrics_store import MetricsStore
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = MetricsStore(str(tmp_path / 'metrics.db'))
+    yield store
+    store.close()
+
+
+def reel(shortcode, date='2025-01-01', **fields):
+    return {'shortcode': shortcode, 'date': date, 'likes': 1, 'views': 10, 'comments': 0, **fields}
+
+
+def test_snapshot_of_the_same_scrape_is_upserted(store):
+    store.add_snapshots('alice', '2025-01-02T00:00:00+00:00', [reel('a', likes=1)])
+    store.add_snapshots('alice', '2025-01-02T00:00:00+00:00', [reel('a', likes=5)])
+
+    rows = list(store.iter_latest('alice'))
+    assert [(row['shortcode'], row['likes']) for row in rows] == [('a', 5)]
+    count = store.conn.execute("SELECT COUNT(*) FROM reel_snapshots").fetchone()[0]
+    assert count == 1
+
+
+def test_iter_latest_yields_the_newest_snapshot_of_each_reel(store):
+    store.add_snapshots('alice', '2025-01-02T00:00:00+00:00', [reel('a', likes=1), reel('b', '2025-01-05', likes=2)])
+    store.add_snapshots('alice', '2025-01-03T00:00:00+00:00', [reel('a', likes=7)])
+    store.add_snapshots('bob', '2025-01-03T00:00:00+00:00', [reel('c')])
+
+    rows = list(store.iter_latest('alice'))
+    # Newest post first, each reel with the likes of its latest scrape
+    assert [(row['shortcode'], row['likes']) for row in rows] == [('b', 2), ('a', 7)]
+    assert store.known_shortcodes('alice') == {'a', 'b'}
+
+
+def test_iter_latest_reads_in_batches_and_fills_in_tags(store, monkeypatch):
+    monkeypatch.setattr(metrics_store, 'ITER_BATCH_SIZE', 3)
+    store.add_snapshots('alice', '2025-01-02T00:00:00+00:00',
+                        [reel(f"r{n}", f"2025-01-{n + 10:02d}") for n in range(10)])
+    store.set_tags({'r3': 'tutorial'})
+
+    rows = list(store.iter_latest('alice'))
+    assert [row['shortcode'] for row in rows] == [f"r{n}" for n in reversed(range(10))]
+    assert {row['shortcode']: row['manual_tags'] for row in rows if row['manual_tags']} == {'r3': 'tutorial'}
+
+
+def test_refresh_times_keep_a_known_post_time(store):
+    store.set_refresh_times([('a', '2025-01-02T00:00:00+00:00', '2025-01-01T12:00:00+00:00')])
+    store.set_refresh_times([('a', '2025-01-03T00:00:00+00:00', None)])
+
+    assert store.get_refresh_times(['a', 'unknown']) == {
+        'a': {'last_fetched': '2025-01-03T00:00:00+00:00', 'posted_at': '2025-01-01T12:00:00+00:00'},
+    }
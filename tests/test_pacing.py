@@ -0,0 +1,91 @@
+import time
+
+import pytest
+
+import pacing
+from pacing import BACKOFF_INITIAL, BACKOFF_MAX, BACKOFF_RESET_AFTER, TokenBucket
+
+
+def end_pause(bucket):
+    bucket.paused_until = bucket.updated = time.monotonic() - 1
+
+
+def test_throttle_pauses_for_the_backoff_and_doubles_it():
+    bucket = TokenBucket('test')
+    assert bucket.record_throttled() == BACKOFF_INITIAL
+    assert bucket.paused_until > time.monotonic()
+    assert bucket.backoff == BACKOFF_INITIAL * 2
+    assert bucket.throttled == 1
+
+
+def test_throttles_during_a_pause_do_not_escalate():
+    bucket = TokenBucket('test')
+    bucket.record_throttled()
+    paused_until = bucket.paused_until
+
+    for _ in range(5):
+        remaining = bucket.record_throttled()
+        assert 0 < remaining <= BACKOFF_INITIAL
+
+    assert bucket.backoff == BACKOFF_INITIAL * 2
+    assert bucket.paused_until == paused_until
+    assert bucket.throttled == 1
+
+
+def test_throttle_after_the_pause_escalates():
+    bucket = TokenBucket('test')
+    bucket.record_throttled()
+    end_pause(bucket)
+    assert bucket.record_throttled() == BACKOFF_INITIAL * 2
+    assert bucket.backoff == BACKOFF_INITIAL * 4
+
+
+def test_backoff_is_capped():
+    bucket = TokenBucket('test')
+    for _ in range(20):
+        bucket.record_throttled()
+        end_pause(bucket)
+    assert bucket.backoff == BACKOFF_MAX
+    assert bucket.record_throttled() == BACKOFF_MAX
+
+
+def test_normal_responses_reset_the_backoff():
+    bucket = TokenBucket('test')
+    bucket.record_throttled()
+    end_pause(bucket)
+    bucket.record_throttled()
+    for _ in range(BACKOFF_RESET_AFTER - 1):
+        bucket.record_success()
+    assert bucket.backoff == BACKOFF_INITIAL * 4
+    bucket.record_success()
+    assert bucket.backoff == BACKOFF_INITIAL
+
+
+def test_reserve_waits_out_the_pause():
+    bucket = TokenBucket('test', rate=100, burst=5)
+    assert bucket.reserve() == 0
+    bucket.record_throttled()
+    assert BACKOFF_INITIAL - 1 < bucket.reserve() <= BACKOFF_INITIAL
+
+
+def test_reservations_during_a_pause_are_spaced_after_it():
+    bucket = TokenBucket('test', rate=2, burst=5)
+    bucket.record_throttled()
+    waits = [bucket.reserve() for _ in range(6)]
+
+    assert BACKOFF_INITIAL - 1 < waits[0] <= BACKOFF_INITIAL
+    for previous, current in zip(waits, waits[1:]):
+        assert current - previous == pytest.approx(1 / bucket.rate, abs=0.01)
+
+
+def test_reserve_waits_for_tokens_beyond_the_burst():
+    bucket = TokenBucket('test', rate=1, burst=2)
+    assert bucket.reserve() == 0
+    assert bucket.reserve() == 0
+    assert 0.9 < bucket.reserve() <= 1
+
+
+def test_looks_throttled():
+    assert pacing.looks_throttled(status=429)
+    assert pacing.looks_throttled(text='Please wait a few minutes before you try again.')
+    assert not pacing.looks_throttled(status=200, text='ok')
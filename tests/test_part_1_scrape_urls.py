@@ -0,0 +1,137 @@
+import asyncio
+import json
+import time
+
+import pytest
+
+pytest.importorskip('playwright')
+
+import part_1_scrape_urls as part_1
+
+
+def clip(shortcode, owner='alice', product_type='clips', **fields):
+    return {'code': shortcode, 'taken_at': 1700000000, 'product_type': product_type,
+            'user': {'username': owner}, 'like_count': 5, 'comment_count': 1, 'play_count': 100, **fields}
+
+
+def test_iter_media_nodes_keeps_the_creators_clips_in_payload_order():
+    payload = {'data': {'items': [
+        {'media': clip('r1')},
+        {'media': clip('photo', product_type='feed')},
+        {'media': clip('carousel', product_type='carousel_container')},
+        {'media': clip('suggested', owner='bob')},
+        {'media': clip('r2', owner='Alice')},
+        # GraphQL nodes name the owner and the shortcode differently
+        {'node': {'shortcode': 'r3', 'taken_at_timestamp': 1700000000, 'product_type': 'clips',
+                  'owner': {'username': 'alice'}, 'edge_liked_by': {'count': 7},
+                  'edge_media_to_comment': {'count': 2}, 'video_view_count': 70}},
+        {'media': {'code': 'no_owner', 'taken_at': 1700000000, 'product_type': 'clips'}},
+    ]}}
+
+    nodes = list(part_1.iter_media_nodes(payload, 'alice'))
+    assert [node['shortcode'] for node in nodes] == ['r1', 'r2', 'r3']
+    assert nodes[0] == {'shortcode': 'r1', 'taken_at': 1700000000, 'likes': 5, 'comments': 1, 'views': 100}
+    assert nodes[2] == {'shortcode': 'r3', 'taken_at': 1700000000, 'likes': 7, 'comments': 2, 'views': 70}
+
+
+class FakeMouse:
+    def __init__(self, grid):
+        self.grid = grid
+
+    async def wheel(self, x, y):
+        self.grid.load_next()
+
+
+class FakeGrid:
+    """A Reels page whose feed responses bring one batch of reels per scroll."""
+
+    def __init__(self, batches):
+        self.batches = list(batches)
+        self.reels = {}
+        self.scrolls = 0
+        self.mouse = FakeMouse(self)
+        self.load_next()
+
+    def load_next(self):
+        if self.batches:
+            for shortcode in self.batches.pop(0):
+                self.reels[shortcode] = {'shortcode': shortcode}
+        self.scrolls += 1
+
+    async def evaluate(self, script):
+        return 0 if '.length' in script else []
+
+
+class FreeBucket:
+    async def acquire(self, cost=1):
+        pass
+
+
+@pytest.fixture
+def grid_scroll(monkeypatch):
+    """Scroll a FakeGrid with no pacing and no waiting for new reels."""
+    async def no_wait(*args, **kwargs):
+        return True
+
+    monkeypatch.setattr(part_1, 'get_instagram_bucket', lambda: FreeBucket())
+    monkeypatch.setattr(part_1, 'wait_for_new_reels', no_wait)
+    monkeypatch.setattr(part_1, 'KNOWN_REELS_STOP_THRESHOLD', 3)
+
+    def scroll(grid, known_shortcodes=None):
+        urls = asyncio.run(part_1.scroll_to_collect_reel_urls(grid, known_shortcodes, capture=grid))
+        return {part_1.get_reel_shortcode(url) for url in urls}
+
+    return scroll
+
+
+def test_known_reels_in_a_row_stop_the_scroll(grid_scroll):
+    known = {f"k{n}" for n in range(10)}
+    grid = FakeGrid([['n0', 'n1'], ['n2', 'k0'], ['k1', 'n3'], ['k2', 'k3'], ['k4', 'k5'], ['k6', 'k7'], ['k8', 'k9']])
+
+    # k0 k1 is broken by n3, k2 k3 k4 is the first run of three
+    assert grid_scroll(grid, known) == {'n0', 'n1', 'n2', 'n3', 'k0', 'k1', 'k2', 'k3', 'k4', 'k5'}
+    assert grid.batches == [['k6', 'k7'], ['k8', 'k9']]
+
+
+def test_without_known_reels_the_scroll_reaches_the_end(grid_scroll):
+    grid = FakeGrid([['n0', 'k0'], ['k1', 'k2'], ['k3', 'k4']])
+    assert grid_scroll(grid) == {'n0', 'k0', 'k1', 'k2', 'k3', 'k4'}
+    assert grid.batches == []
+
+
+@pytest.fixture
+def session_file(tmp_path, monkeypatch):
+    path = tmp_path / 'instagram_session.json'
+    monkeypatch.setattr(part_1, 'SESSION_FILE', str(path))
+    monkeypatch.setattr(part_1, 'INSTAGRAM_BASE_URL', 'https://www.instagram.com')
+
+    def save(*cookies):
+        path.write_text(json.dumps({'cookies': list(cookies)}))
+
+    return save
+
+
+def sessionid(expires, domain='.instagram.com', value='abc'):
+    return {'name': 'sessionid', 'value': value, 'domain': domain, 'expires': expires}
+
+
+@pytest.mark.parametrize('cookies, status', [
+    ([sessionid(time.time() + 86400)], 'valid'),
+    # -1 is a cookie without an expiry date
+    ([sessionid(-1)], 'valid'),
+    ([sessionid(time.time() - 10)], 'expired'),
+    # Expiring within the next minute counts as expired
+    ([sessionid(time.time() + 30)], 'expired'),
+    ([sessionid(time.time() + 86400, value='')], 'missing'),
+    ([sessionid(time.time() + 86400, domain='.example.com')], 'missing'),
+    ([{'name': 'csrftoken', 'value': 'x', 'domain': '.instagram.com', 'expires': -1}], 'missing'),
+])
+def test_session_cookie_status(session_file, cookies, status):
+    session_file(*cookies)
+    assert part_1.session_cookie_status() == status
+
+
+def test_missing_or_unreadable_session_file(session_file, tmp_path):
+    assert part_1.session_cookie_status() == 'missing'
+    (tmp_path / 'instagram_session.json').write_text('{not json')
+    assert part_1.session_cookie_status() == 'missing'
@@ -0,0 +1,135 @@
+import json
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+import part_2_get_metrics as part_2
+from metrics_store import MetricsStore
+
+
+def reel_url(shortcode):
+    return f"https://www.instagram.com/reel/{shortcode}/"
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    store = MetricsStore(str(tmp_path / 'metrics.db'))
+    monkeypatch.setattr(part_2, 'get_metrics_store', lambda: store)
+    yield store
+    store.close()
+
+
+def fetched(store, shortcode, fetched_ago, posted_ago=None):
+    now = datetime.now(timezone.utc)
+    posted_at = (now - posted_ago).isoformat() if posted_ago is not None else None
+    store.set_refresh_times([(shortcode, (now - fetched_ago).isoformat(), posted_at)])
+
+
+@pytest.mark.parametrize('posted_ago, fetched_ago, due', [
+    # Under 48 hours old: hourly
+    (timedelta(hours=10), timedelta(minutes=30), False),
+    (timedelta(hours=10), timedelta(hours=2), True),
+    # Under 30 days old: daily
+    (timedelta(days=5), timedelta(hours=2), False),
+    (timedelta(days=5), timedelta(hours=25), True),
+    # Older: weekly
+    (timedelta(days=60), timedelta(days=3), False),
+    (timedelta(days=60), timedelta(days=8), True),
+    # Unknown post time: weekly
+    (None, timedelta(days=3), False),
+    (None, timedelta(days=8), True),
+])
+def test_known_reels_follow_the_age_schedule(store, posted_ago, fetched_ago, due):
+    fetched(store, 'known', fetched_ago, posted_ago)
+    urls = [reel_url('known')]
+    assert part_2.select_due_urls(urls, {'known'}) == (urls if due else [])
+
+
+def test_new_and_never_fetched_reels_are_always_due(store):
+    fetched(store, 'fresh', timedelta(minutes=1), timedelta(days=60))
+    urls = [reel_url('new'), reel_url('unfetched'), reel_url('fresh')]
+    # 'new' is not in the metrics file yet, 'unfetched' has no refresh time
+    assert part_2.select_due_urls(urls, {'unfetched', 'fresh'}) == urls[:2]
+
+
+def snapshot(shortcode, **fields):
+    return {'shortcode': shortcode, 'date': '2025-01-01', 'caption': f"caption {shortcode}", **fields}
+
+
+def test_merge_keeps_only_requested_reels_in_snapshot_order():
+    snapshots = [snapshot('c'), snapshot('a'), snapshot('stale'), snapshot('b')]
+    rows = part_2.merge_reel_rows([reel_url('a'), reel_url('b'), reel_url('c')], iter(snapshots), {})
+    assert [row['shortcode'] for row in rows] == ['c', 'a', 'b']
+
+
+def test_merge_fills_in_manual_tags_by_shortcode():
+    snapshots = [
+        snapshot('tagged', manual_tags='old'),
+        snapshot('legacy'),
+        snapshot('kept', manual_tags='from store'),
+        snapshot('cleared', manual_tags='from store'),
+        snapshot('untagged'),
+    ]
+    urls = [reel_url(row['shortcode']) for row in snapshots]
+    # 'cleared' is in the CSV with its tag removed, 'kept' is not in the CSV at all
+    tags = {'tagged': 'tutorial', 'cleared': ''}
+    # Tags of older CSVs were keyed on date and caption
+    legacy_tags = {('2025-01-01', 'caption legacy'): 'vlog', ('2025-01-01', 'caption tagged'): 'ignored'}
+
+    rows = {row['shortcode']: row['manual_tags'] for row in part_2.merge_reel_rows(urls, snapshots, tags, legacy_tags)}
+    assert rows == {'tagged': 'tutorial', 'legacy': 'vlog', 'kept': 'from store', 'cleared': '', 'untagged': ''}
+
+
+def test_tag_cleared_in_the_csv_stays_cleared(store, tmp_path):
+    metrics_file = tmp_path / 'creator_reels_metrics.csv'
+    store.add_snapshots('creator', '2025-01-02T00:00:00+00:00', [snapshot('a'), snapshot('b')])
+    store.set_tags({'a': 'tutorial', 'b': 'vlog'})
+
+    # The dashboard clears the tag of 'a'
+    part_2.write_csv_atomic(metrics_file, part_2.METRICS_CSV_FIELDS, [
+        {**snapshot('a'), 'manual_tags': ''}, {**snapshot('b'), 'manual_tags': 'vlog'},
+    ])
+    tags, legacy_tags = part_2.load_manual_tags(str(metrics_file))
+    store.set_tags(tags)
+
+    urls = [reel_url('a'), reel_url('b')]
+    rows = part_2.merge_reel_rows(urls, store.iter_latest('creator'), tags, legacy_tags)
+    assert {row['shortcode']: row['manual_tags'] for row in rows} == {'a': '', 'b': 'vlog'}
+    # The store forgot it too, so a run without the CSV does not bring it back
+    assert {row['shortcode']: row['manual_tags'] for row in store.iter_latest('creator')} == {'a': '', 'b': 'vlog'}
+
+
+@pytest.mark.parametrize('content', ['{"alice": {"followers": 1', 'not json', '[1, 2]'])
+def test_unreadable_follower_cache_is_treated_as_empty(tmp_path, monkeypatch, content):
+    cache_file = tmp_path / 'follower_cache.json'
+    cache_file.write_text(content)
+    monkeypatch.setattr(part_2, 'FOLLOWER_CACHE_FILE', str(cache_file))
+    monkeypatch.setattr(part_2, 'fetch_follower_count', lambda username: 1234)
+
+    assert part_2.get_follower_counts(['alice']) == {'alice': 1234}
+    assert json.loads(cache_file.read_text())['alice']['followers'] == 1234
+
+
+def test_batched_items_are_split_back_per_creator():
+    user_urls = {'alice': [reel_url('a1'), reel_url('a2')], 'bob': [reel_url('b1')]}
+    items = [
+        {'shortCode': 'b1', 'ownerUsername': 'someone_else'},
+        {'url': reel_url('a2')},
+        {'shortCode': 'a1', 'ownerUsername': 'alice'},
+        # Not requested, matched on the owner Apify reports
+        {'shortCode': 'b9', 'ownerUsername': 'bob'},
+        # Neither requested nor owned by a creator of the batch
+        {'shortCode': 'x1', 'ownerUsername': 'carol'},
+    ]
+
+    spools = part_2.spool_items_by_user(iter(items), user_urls)
+    try:
+        split = {username: list(part_2.iter_spooled_items(spool)) for username, spool in spools.items()}
+    finally:
+        for spool in spools.values():
+            spool.close()
+
+    assert split == {
+        'alice': [{'url': reel_url('a2')}, {'shortCode': 'a1', 'ownerUsername': 'alice'}],
+        'bob': [{'shortCode': 'b1', 'ownerUsername': 'someone_else'}, {'shortCode': 'b9', 'ownerUsername': 'bob'}],
+    }
@@ -0,0 +1,114 @@
+import json
+import multiprocessing
+import threading
+
+import pytest
+
+import part_2_get_metrics as part_2
+import run_journal
+from run_journal import RunJournal, atomic_write
+
+
+@pytest.fixture
+def journal(tmp_path, monkeypatch):
+    journal = RunJournal(str(tmp_path / 'data' / 'run_journal.json'))
+    monkeypatch.setattr(run_journal, 'journal', journal)
+    return journal
+
+
+def test_atomic_write_replaces_the_file(tmp_path):
+    path = tmp_path / 'out' / 'file.txt'
+    with atomic_write(str(path)) as f:
+        f.write('new')
+    assert path.read_text() == 'new'
+    assert not (tmp_path / 'out' / 'file.txt.tmp').exists()
+
+
+def test_failed_atomic_write_keeps_the_old_file(tmp_path):
+    path = tmp_path / 'file.txt'
+    path.write_text('old')
+    with pytest.raises(RuntimeError):
+        with atomic_write(str(path)) as f:
+            f.write('half')
+            raise RuntimeError('crash')
+    assert path.read_text() == 'old'
+    assert not (tmp_path / 'file.txt.tmp').exists()
+
+
+def test_concurrent_thread_updates_are_all_kept(journal):
+    def record(worker):
+        for step in run_journal.STEPS:
+            journal.update(f"user{worker}", step, worker=worker)
+
+    threads = [threading.Thread(target=record, args=(worker,)) for worker in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    users = journal.read()['users']
+    assert len(users) == 8
+    for worker in range(8):
+        assert all(users[f"user{worker}"][step]['worker'] == worker for step in run_journal.STEPS)
+
+
+def record_in_process(path, worker, count):
+    journal = RunJournal(path)
+    for n in range(count):
+        journal.update(f"user{worker}", 'urls', count=n + 1)
+        journal.update('shared', f"step{worker}-{n}")
+
+
+@pytest.mark.skipif(run_journal.fcntl is None, reason='processes are only serialized with fcntl')
+def test_concurrent_process_updates_are_all_kept(tmp_path):
+    path = str(tmp_path / 'run_journal.json')
+    context = multiprocessing.get_context('fork')
+    processes = [context.Process(target=record_in_process, args=(path, worker, 20)) for worker in range(4)]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+    assert all(process.exitcode == 0 for process in processes)
+
+    with open(path, encoding='utf-8') as f:
+        users = json.load(f)['users']
+    assert {users[f"user{worker}"]['urls']['count'] for worker in range(4)} == {20}
+    assert len(users['shared']) == 4 * 20
+
+
+def test_reset_forgets_only_the_given_steps(journal):
+    journal.mark_done('alice', 'urls')
+    journal.mark_done('alice', 'metrics')
+    journal.mark_done('bob', 'metrics')
+    journal.reset(['alice', 'bob'], steps=('metrics',))
+
+    assert journal.is_done('alice', 'urls')
+    assert not journal.is_done('alice', 'metrics')
+    assert 'bob' not in journal.read()['users']
+
+
+def test_resume_skips_finished_creators(journal, monkeypatch):
+    result = {'username': 'alice', 'reels_scraped': 3}
+    journal.mark_done('alice', 'metrics', rows=3, result=result)
+    journal.update('bob', 'metrics', actor_run_id='run1')
+
+    monkeypatch.setattr(part_2, 'RESUME', True)
+    assert part_2.load_finished_metrics('alice') == result
+    assert part_2.load_finished_metrics('bob') is None
+
+    monkeypatch.setattr(part_2, 'RESUME', False)
+    assert part_2.load_finished_metrics('alice') is None
+
+
+def test_history_rows_are_not_added_twice(journal, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    results = [
+        {'username': name, 'followers': 10, 'reels_scraped': 3, 'csv_file': f"data/{name}_reels_metrics.csv"}
+        for name in ('alice', 'bob')
+    ]
+    part_2.append_scrape_history(results[:1])
+    history_file = part_2.append_scrape_history(results)
+
+    with open(history_file, encoding='utf-8') as f:
+        usernames = [line.split(',')[1] for line in f.read().splitlines()[1:]]
+    assert usernames == ['alice', 'bob']
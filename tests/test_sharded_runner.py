@@ -0,0 +1,43 @@
+import pytest
+
+import sharded_runner
+
+
+@pytest.fixture
+def saved_reels(tmp_path, monkeypatch):
+    """Write reel_urls/{username}_reels.txt files with the given number of URLs."""
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / 'reel_urls').mkdir()
+
+    def save(**counts):
+        for username, count in counts.items():
+            urls = ''.join(f"https://www.instagram.com/reel/{username}{n}/\n" for n in range(count))
+            (tmp_path / 'reel_urls' / f"{username}_reels.txt").write_text(urls)
+
+    return save
+
+
+def test_expected_reel_count_falls_back_for_new_creators(saved_reels):
+    saved_reels(old=7, empty=0)
+    assert sharded_runner.expected_reel_count('old') == 7
+    assert sharded_runner.expected_reel_count('empty') == 1
+    assert sharded_runner.expected_reel_count('new') == sharded_runner.DEFAULT_EXPECTED_REELS
+
+
+def test_shards_are_balanced_by_expected_reels(saved_reels):
+    saved_reels(huge=400, big=200, mid=150, small1=30, small2=20, small3=10)
+    usernames = ['small1', 'huge', 'small2', 'big', 'mid', 'small3']
+
+    shards = sharded_runner.plan_shards(usernames, 2)
+    assert sorted(username for shard, _ in shards for username in shard) == sorted(usernames)
+    loads = [load for _, load in shards]
+    assert sum(loads) == 810
+    assert sorted(loads) == [400, 410]
+    # The two biggest creators never share a shard
+    assert not any({'huge', 'big'} <= set(shard) for shard, _ in shards)
+
+
+def test_more_shards_than_creators_leaves_some_empty(saved_reels):
+    saved_reels(a=5, b=3)
+    shards = sharded_runner.plan_shards(['a', 'b'], 3)
+    assert sorted(load for _, load in shards) == [0, 3, 5]